@@ -0,0 +1,143 @@
+from __future__ import annotations
+import math, re
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Bar kernels for Module 1: every bar type is a set of contiguous tick
+# segments over the sorted tick arrays, reduced with ufunc.reduceat.
+
+def segment_reduce(ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray, mid: np.ndarray,
+                   starts: np.ndarray, first_id: int = 0, volume: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    # starts: ascending offsets of non-empty segments, starts[0] == 0;
+    # first_id: positional id of tick 0, so tick ids index into raw_norm;
+    # v_sum is 0 without volume
+    starts = np.asarray(starts, dtype="int64")
+    if len(starts) == 0:
+        f = np.empty(0, dtype="float64"); i = np.empty(0, dtype="int64")
+        return {"t_open_ns": i, "t_close_ns": i, "o": f, "h": f, "l": f, "c": f,
+                "o_bid": f, "o_ask": f, "c_bid": f, "c_ask": f, "spread_mean": f,
+                "n_ticks": i.astype("int32"), "v_sum": f, "tick_first_id": i, "tick_last_id": i}
+    ends = np.append(starts[1:], len(mid)) - 1
+    n = (ends - starts + 1)
+    return {
+        "t_open_ns": ts_ns[starts],
+        "t_close_ns": ts_ns[ends],
+        "o": mid[starts],
+        "h": np.maximum.reduceat(mid, starts),
+        "l": np.minimum.reduceat(mid, starts),
+        "c": mid[ends],
+        "o_bid": bid[starts],
+        "o_ask": ask[starts],
+        "c_bid": bid[ends],
+        "c_ask": ask[ends],
+        "spread_mean": np.add.reduceat(ask - bid, starts) / n,
+        "n_ticks": n.astype("int32"),
+        "v_sum": np.add.reduceat(volume, starts) if volume is not None else np.zeros(len(starts)),
+        "tick_first_id": first_id + starts,
+        "tick_last_id": first_id + ends,
+    }
+
+def tick_starts(n: int, N: int) -> np.ndarray:
+    # fixed-N segmentation; the last segment may be partial
+    return np.arange(0, n, N, dtype="int64")
+
+_UNIT_NS = {"s": 1_000_000_000, "m": 60_000_000_000, "min": 60_000_000_000,
+            "h": 3_600_000_000_000, "d": 86_400_000_000_000}
+
+def parse_frame(unit: str) -> int:
+    # "1m", "5m", "15m", "1h", "4h", "1d" → bucket width in ns
+    m = re.fullmatch(r"\s*(\d+)\s*(s|min|m|h|d)\s*", str(unit))
+    if not m or int(m.group(1)) <= 0:
+        raise ValueError(f"unsupported time frame: {unit!r}")
+    return int(m.group(1)) * _UNIT_NS[m.group(2)]
+
+def bucket_starts(bucket: np.ndarray) -> np.ndarray:
+    # first tick of every run of equal bucket ids (ticks are sorted)
+    if len(bucket) == 0:
+        return np.empty(0, dtype="int64")
+    return np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+
+def fill_buckets(cols: Dict[str, np.ndarray], bucket_ids: np.ndarray, frame_ns: int) -> Dict[str, np.ndarray]:
+    # expand populated buckets to the full contiguous bucket range; empty buckets
+    # repeat the previous bar's prices and have zero ticks, i.e. the empty tick
+    # range tick_last_id + 1 .. tick_last_id after the previous bar
+    if len(bucket_ids) == 0:
+        return dict(cols, gap_flag=np.empty(0, dtype="int32"))
+    full = np.arange(bucket_ids[0], bucket_ids[-1] + 1, dtype="int64")
+    present = np.zeros(len(full), dtype=bool)
+    present[bucket_ids - bucket_ids[0]] = True
+    src = np.cumsum(present) - 1   # index of the last populated bucket at or before each bucket
+    out = {k: v[src] for k, v in cols.items()}
+    out["t_open_ns"] = full * frame_ns
+    out["t_close_ns"] = out["t_open_ns"] + frame_ns - 1
+    out["spread_mean"] = np.where(present, out["spread_mean"], 0.0)
+    out["v_sum"] = np.where(present, out["v_sum"], 0.0)
+    out["n_ticks"] = np.where(present, out["n_ticks"], 0).astype("int32")
+    out["tick_first_id"] = np.where(present, out["tick_first_id"], out["tick_last_id"] + 1)
+    out["gap_flag"] = (~present).astype("int32")
+    return out
+
+def cascade_reduce(bars: Dict[str, np.ndarray], starts: np.ndarray) -> Dict[str, np.ndarray]:
+    # combine runs of populated finer bars into coarser ones; spread_mean is tick-weighted
+    starts = np.asarray(starts, dtype="int64")
+    if len(starts) == 0:
+        return {k: v[:0] for k, v in bars.items()}
+    ends = np.append(starts[1:], len(bars["o"])) - 1
+    n = np.add.reduceat(bars["n_ticks"].astype("int64"), starts)
+    return {
+        "t_open_ns": bars["t_open_ns"][starts],
+        "t_close_ns": bars["t_close_ns"][ends],
+        "o": bars["o"][starts],
+        "h": np.maximum.reduceat(bars["h"], starts),
+        "l": np.minimum.reduceat(bars["l"], starts),
+        "c": bars["c"][ends],
+        "o_bid": bars["o_bid"][starts],
+        "o_ask": bars["o_ask"][starts],
+        "c_bid": bars["c_bid"][ends],
+        "c_ask": bars["c_ask"][ends],
+        "spread_mean": np.add.reduceat(bars["spread_mean"] * bars["n_ticks"], starts) / n,
+        "n_ticks": n.astype("int32"),
+        "v_sum": np.add.reduceat(bars["v_sum"], starts),
+        "tick_first_id": bars["tick_first_id"][starts],
+        "tick_last_id": bars["tick_last_id"][ends],
+    }
+
+def threshold_starts(points: np.ndarray, filled: int, size: int) -> np.ndarray:
+    # volume / dollar bars: ticks go to bar k while the running total before them,
+    # starting at filled, lies in [k * size, (k + 1) * size). Integer points keep the
+    # cumulative sum exact, so the bars do not depend on how the ticks were chunked.
+    before = np.cumsum(points) - points
+    return bucket_starts((filled + before) // size)
+
+def tick_signs(mid: np.ndarray, prev_mid: float | None, prev_sign: int) -> np.ndarray:
+    # tick rule: sign of the price change, the previous sign where the price is unchanged
+    ref = np.concatenate([[mid[0] if prev_mid is None else prev_mid], mid[:-1]])
+    d = np.sign(mid - ref).astype("int64")
+    last = np.maximum.accumulate(np.where(d != 0, np.arange(len(d)), -1))
+    return np.where(last >= 0, d[np.maximum(last, 0)], prev_sign)
+
+def imbalance_ends(sign: np.ndarray, e_t: float, e_b: float, alpha: float) -> Tuple[List[int], float, float]:
+    # tick imbalance bars: a bar closes at the first tick where |sum of signs| reaches
+    # max(E[T] * |E[b]|, sqrt(E[T])); E[T] (ticks per bar) and E[b] (mean sign) are
+    # EWMAs over the closed bars. The sqrt(E[T]) floor is the typical excursion of an
+    # unbiased sign walk after E[T] ticks and keeps the bar length stable when E[b]
+    # is near zero. → (exclusive ends of the closed bars, E[T], E[b])
+    cum = np.cumsum(sign)
+    ends, s, n = [], 0, len(sign)
+    while s < n:
+        thr = max(e_t * abs(e_b), math.sqrt(e_t))
+        base = int(cum[s - 1]) if s else 0
+        w = max(16, int(2 * e_t))
+        while True:
+            seg = np.abs(cum[s:s + w] - base) >= thr
+            if seg.any():
+                break
+            if s + w >= n:
+                return ends, e_t, e_b
+            w *= 2
+        t = int(seg.argmax()) + 1
+        e_t += alpha * (t - e_t)
+        e_b += alpha * ((int(cum[s + t - 1]) - base) / t - e_b)
+        s += t
+        ends.append(s)
+    return ends, e_t, e_b
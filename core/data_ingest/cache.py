@@ -0,0 +1,153 @@
+from __future__ import annotations
+import hashlib, json, os, pathlib, shutil, uuid
+from typing import Dict, Any, List
+
+from .ipc import IPC_DIR, ipc_enabled
+from .timeindex import weekend_rule
+from .util import sha256_of_file, write_json
+
+# Content-addressed cache of ingest results: one directory per key, where the key
+# hashes the input file and every config field that changes the outputs.
+
+MAX_MB = 10240
+
+def cache_dir(config: Dict[str, Any]) -> pathlib.Path | None:
+    cfg = config.get("cache") or {}
+    if not cfg.get("enabled", True) or not cfg.get("dir") or config.get("append", False):
+        return None
+    return pathlib.Path(cfg["dir"])
+
+def max_bytes(config: Dict[str, Any]) -> int:
+    return int(float((config.get("cache") or {}).get("max_mb") or MAX_MB) * 1024 * 1024)
+
+def input_sha256(path: pathlib.Path, root: pathlib.Path) -> str:
+    # sha256 of the input, memoized by (size, mtime) so a hit does not rehash gigabytes
+    st = path.stat()
+    index_path = root / "inputs.json"
+    index = json.loads(index_path.read_text(encoding="utf-8")) if index_path.exists() else {}
+    sig = [st.st_size, st.st_mtime_ns]
+    entry = index.get(str(path.resolve()))
+    if entry and entry["sig"] == sig:
+        return entry["sha256"]
+    digest = sha256_of_file(path)
+    index[str(path.resolve())] = {"sig": sig, "sha256": digest}
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_name(f"inputs.{uuid.uuid4().hex}.tmp")
+    write_json(tmp, index)
+    tmp.replace(index_path)
+    return digest
+
+def cache_key(input_sha: str, config: Dict[str, Any], versions: Dict[str, str]) -> str:
+    frames = []
+    for f in config.get("bar_frames", []):
+        if f.get("type") == "time":
+            frames.append({"type": "time", "unit": str(f.get("unit", "1m"))})
+        elif f.get("type") == "tick":
+            frames.append({"type": "tick", "count": int(f.get("count", 0))})
+        elif f.get("type") in ("volume", "dollar"):
+            frames.append({"type": f["type"], "size": float(f.get("size", 0))})
+        elif f.get("type") == "tick_imbalance":
+            frames.append({"type": "tick_imbalance", "expected_ticks": float(f.get("expected_ticks", 100)),
+                           "alpha": float(f.get("alpha", 0.1))})
+        else:
+            frames.append(f)
+    normalized = {
+        "input_sha256": input_sha,
+        "symbol": config.get("symbol", "EURUSD"),
+        "bar_frames": frames,
+        "price_basis": config.get("price_basis", "mid"),
+        "trim_weekend": weekend_rule(config),
+        "max_missing_gap_seconds": int(config.get("max_missing_gap_seconds", 60)),
+        "parquet": config.get("parquet") or {},
+        "quality": config.get("quality") or {},
+        "outlier_zscore": config.get("outlier_zscore"),
+        "compact_ticks": config.get("compact_ticks") or {},
+        "ipc": ipc_enabled(config),
+        "time_range": [(config.get("input") or {}).get(k) for k in ("start", "end")],
+        **versions,
+    }
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _copy(src: pathlib.Path, dst: pathlib.Path):
+    # a copy, never a hardlink: later runs rewrite their outputs in place, which
+    # would change a linked cache entry under its key
+    if src.is_dir():
+        dst.mkdir(parents=True, exist_ok=True)
+        for p in src.iterdir():
+            _copy(p, dst / p.name)
+        return
+    shutil.copy2(src, dst)
+
+def lookup(root: pathlib.Path, key: str) -> pathlib.Path | None:
+    entry = root / key
+    return entry if (entry / "manifest.json").exists() else None
+
+def _size(entry: pathlib.Path) -> int:
+    return sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+
+def _touch(entry: pathlib.Path):
+    # the manifest mtime is the entry's last use, the LRU order of evict()
+    try:
+        os.utime(entry / "manifest.json")
+    except OSError:
+        pass
+
+def evict(root: pathlib.Path, limit: int, keep: str | None = None):
+    # drop least recently used entries until the cache fits in limit bytes
+    entries = []
+    for entry in root.iterdir():
+        if entry.name.startswith(".") or not (entry / "manifest.json").exists():
+            continue
+        try:
+            entries.append(((entry / "manifest.json").stat().st_mtime_ns, entry, _size(entry)))
+        except OSError:
+            continue   # evicted by a concurrent run
+    total = sum(n for _, _, n in entries)
+    for _, entry, n in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        if entry.name == keep:
+            continue
+        # unpublish with one rename so no lookup sees a half-deleted entry
+        doomed = root / f".{entry.name}.{uuid.uuid4().hex}.del"
+        try:
+            entry.rename(doomed)
+        except OSError:
+            continue
+        shutil.rmtree(doomed, ignore_errors=True)
+        total -= n
+
+def store(root: pathlib.Path, key: str, out_dir: pathlib.Path, names: List[str], limit: int | None = None):
+    # build the entry next to its final place and publish it with one rename
+    if lookup(root, key) is None:
+        tmp = root / f".{key}.{uuid.uuid4().hex}.tmp"
+        tmp.mkdir(parents=True)
+        for name in names:
+            _copy(out_dir / name, tmp / name)
+        try:
+            tmp.rename(root / key)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)   # a concurrent run stored it first
+    _touch(root / key)
+    if limit is not None:
+        evict(root, limit, keep=key)
+
+def materialize(entry: pathlib.Path, out_dir: pathlib.Path) -> Dict[str, Any]:
+    # copy the cached outputs into out_dir and return the manifest with local paths
+    manifest = json.loads((entry / "manifest.json").read_text(encoding="utf-8"))
+    _touch(entry)
+    for p in entry.iterdir():
+        if p.name == "manifest.json":
+            continue
+        dst = out_dir / p.name
+        if dst.is_dir():
+            shutil.rmtree(dst)
+        elif dst.exists():
+            dst.unlink()
+        _copy(p, dst)
+    manifest["outputs"] = {name: str(out_dir / pathlib.Path(path).name) for name, path in manifest["outputs"].items()}
+    if "gaps" in manifest:
+        manifest["gaps"] = str(out_dir / pathlib.Path(manifest["gaps"]).name)
+    if manifest.get("ipc"):
+        manifest["ipc"] = {name: str(out_dir / IPC_DIR / pathlib.Path(path).name) for name, path in manifest["ipc"].items()}
+    return manifest
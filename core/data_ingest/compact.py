@@ -0,0 +1,60 @@
+from __future__ import annotations
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from . import errors as E
+from .schema import TICK_SCHEMA_COMPACT, PRICE_DECIMALS, DEFAULT_PRICE_DECIMALS
+
+# Lossless conversion between float prices and the compact int32 point layout.
+# points / 10**d is correctly rounded, so it returns exactly the double a decimal
+# price with at most d decimals was parsed to; to_points() refuses anything else.
+
+COMPACT_COLUMNS = list(TICK_SCHEMA_COMPACT)
+# Parquet encodings of the compact columns
+COMPACT_ENCODING = {"ts_ns": "DELTA_BINARY_PACKED"}
+
+def price_decimals(symbol: str, config: Dict[str, Any] | None = None) -> int:
+    cfg = (config or {}).get("compact_ticks") or {}
+    if cfg.get("price_decimals") is not None:
+        return int(cfg["price_decimals"])
+    return PRICE_DECIMALS.get(symbol, DEFAULT_PRICE_DECIMALS)
+
+def to_points(prices: np.ndarray, decimals: int) -> np.ndarray:
+    prices = np.asarray(prices, dtype="float64")
+    pts = np.rint(prices * 10.0 ** decimals)
+    bad = (pts / 10.0 ** decimals != prices) | (np.abs(pts) > np.iinfo("int32").max)
+    if bad.any():
+        raise ValueError(f"{E.PRICE_PRECISION}: {prices[bad][0]!r} is not a price with {decimals} decimals")
+    return pts.astype("int32")
+
+def from_points(points: np.ndarray, decimals: int) -> np.ndarray:
+    return np.asarray(points).astype("float64") / 10.0 ** decimals
+
+def encode_ticks(df: pd.DataFrame, decimals: int) -> pd.DataFrame:
+    # ts_ns/bid/ask → the compact columns, volume as is; the index is kept
+    out = pd.DataFrame({"ts_ns": df["ts_ns"].to_numpy(),
+                        "bid_pts": to_points(df["bid"].to_numpy(), decimals),
+                        "ask_pts": to_points(df["ask"].to_numpy(), decimals)}, index=df.index)
+    if "volume" in df.columns:
+        out["volume"] = df["volume"].to_numpy()
+    return out
+
+def decode_ticks(df: pd.DataFrame, decimals: int) -> pd.DataFrame:
+    # compact columns → ts_ns/bid/ask floats (plus any other columns); the index is kept
+    out = df.drop(columns=[c for c in ("bid_pts", "ask_pts") if c in df.columns])
+    if "bid_pts" in df.columns:
+        out["bid"] = from_points(df["bid_pts"].to_numpy(), decimals)
+    if "ask_pts" in df.columns:
+        out["ask"] = from_points(df["ask_pts"].to_numpy(), decimals)
+    return out
+
+def decode_table(table: pa.Table, decimals: int) -> pa.Table:
+    # compact columns → ts_ns/bid/ask floats (plus volume) as an Arrow table
+    cols = {"ts_ns": table.column("ts_ns")}
+    for side in ("bid", "ask"):
+        cols[side] = pa.array(from_points(table.column(f"{side}_pts").to_numpy(), decimals))
+    if "volume" in table.column_names:
+        cols["volume"] = table.column("volume")
+    return pa.table(cols)
@@ -1,55 +1,137 @@
 from __future__ import annotations
-import pathlib, json, datetime as dt
-from typing import Dict, Any, List, Tuple
+import abc, functools, pathlib, hashlib, json, os, datetime as dt
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Iterator, List, Tuple
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from . import errors as E
-from .schema import TICK_SCHEMA, BAR_COLUMNS, SCHEMA_VERSION, BAR_RULES_ID
+from . import errors as E, cache
+from .schema import TICK_SCHEMA, BAR_COLUMNS, GAP_COLUMNS, QUARANTINE_COLUMNS, SCHEMA_VERSION, BAR_RULES_ID
+from .timeparse import parse_iso_utc
+from .timeindex import TimeIndex, weekend_rule
+from .bars import segment_reduce, tick_starts, parse_frame, bucket_starts, fill_buckets, cascade_reduce, \
+    threshold_starts, tick_signs, imbalance_ends
+from .compact import COMPACT_COLUMNS, COMPACT_ENCODING, price_decimals, encode_ticks, decode_ticks
+from .sources import input_format, time_range, read_ticks, read_csv
+from .partition import day_index, read_range
+from .quality import QualityStats
+from .outliers import OutlierFilter
+from .merge import PEEK_ROWS, is_multi, expand_inputs, dedupe_sorted, kway_merge
+from .ipc import IPC_DIR, TICKS, ipc_enabled, ipc_path, write_ipc
+from .store import ROW_GROUP_ROWS, ParquetSink, DatasetSink, parquet_options, parts, as_parts, next_part, drop_tail_rows, read_rows_from, read_where, reset
 from .util import sha256_of_file, write_json
+from ..orchestrator.telemetry import Telemetry, open_telemetry
 
-MODULE_VERSION = "1.1"
+MODULE_VERSION = "1.2"
 
-def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
-    p = out_dir / "progress.jsonl"
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps({
-            "timestamp": dt.datetime.utcnow().isoformat(),
-            "module": "data_ingest",
-            "step": step,
-            "percent": pct,
-            "message": msg
-        }) + "\n")
+ENGINES = ("pandas", "polars")
+
+# volume and dollar bars count in integer points of 1 / FLOW_POINTS units
+FLOW_POINTS = 10_000
+
+# rough peak footprint of one parsed CSV row incl. the per-stage copies of a chunk
+ROW_BYTES_ESTIMATE = 256
+# stream mode: ticks this far behind the latest tick of a chunk wait for the next chunk
+REORDER_SECONDS = 5.0
 
 def _ensure_cols(df: pd.DataFrame):
     missing = [c for c in ["timestamp","bid","ask"] if c not in df.columns]
+    if "ts_ns" in df.columns and "timestamp" in missing:
+        missing.remove("timestamp")   # binary inputs may carry ts_ns instead of the text
     if missing:
         raise ValueError(f"{E.MISSING_COLUMN}: {missing}")
 
-def _normalize_time(df: pd.DataFrame) -> pd.DataFrame:
-    # assume ISO8601 UTC strings; convert to ns epoch
-    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    if ts.isna().any():
-        raise ValueError(E.TIMEZONE_ERROR)
-    df = df.copy()
-    df["ts_ns"] = ts.view("int64")
+def _normalize_time(df: pd.DataFrame, text: bool = True) -> pd.DataFrame:
+    # adds ts_ns in place. Fast path for the feed layout YYYY-MM-DDTHH:MM:SS[.fff…]Z
+    # on the bytes of the column; only rows that do not match go through the
+    # generic ISO8601 parser. Without text (compact raw_norm) the column is dropped.
+    if "timestamp" not in df.columns:
+        # binary input already in epoch ns; raw_norm still gets the ISO text unless
+        # it is written compact
+        if text:
+            ts = df["ts_ns"].to_numpy().astype("datetime64[ns]")
+            df.insert(0, "timestamp", pd.arrays.ArrowExtensionArray(
+                pa.array(np.char.add(np.datetime_as_string(ts, unit="ns"), "Z"), type=pa.string())))
+        return df
+    col = df["timestamp"]
+    raw = pa.array(col.array) if isinstance(col.dtype, pd.ArrowDtype) else col.to_numpy()
+    ts_ns, ok = parse_iso_utc(raw)
+    if not ok.all():
+        rest = pd.to_datetime(col[~ok].to_numpy(dtype=object), utc=True, errors="coerce")
+        if rest.isna().any():
+            raise ValueError(E.TIMEZONE_ERROR)
+        ts_ns[~ok] = rest.as_unit("ns").asi8
+    df["ts_ns"] = ts_ns
+    if not text:
+        del df["timestamp"]
     return df
 
-def _sort_and_dedupe(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.sort_values("ts_ns", kind="mergesort")
-    df = df.drop_duplicates(subset=["ts_ns","bid","ask"], keep="first")
+def _pop_text(df: pd.DataFrame) -> Tuple[pd.DataFrame, pa.Array | None]:
+    # removes the timestamp column as an Arrow array; the frame index becomes the
+    # row positions in it and follows the rows through sorting and filtering
+    if "timestamp" not in df.columns:
+        return df, None
+    col = df.pop("timestamp")
+    text = pa.array(col.array) if isinstance(col.dtype, pd.ArrowDtype) else \
+        pa.array(col.to_numpy(dtype=object), type=pa.string())
+    df.index = pd.RangeIndex(len(df))
+    return df, text
+
+def _raw_tables(df: pd.DataFrame, text: pa.Array, rows: np.ndarray):
+    # raw_norm rows as Arrow tables of at most ROW_GROUP_ROWS rows: NumPy columns are
+    # wrapped without a copy, text is sliced where its rows are contiguous and only
+    # gathered, one piece at a time, where rows were dropped or reordered
+    for off in range(0, len(df), ROW_GROUP_ROWS):
+        r = rows[off:off + ROW_GROUP_ROWS]
+        if r[-1] - r[0] == len(r) - 1 and (np.diff(r) == 1).all():
+            t = text.slice(int(r[0]), len(r))
+        else:
+            t = text.take(pa.array(r))
+        cols = [c for c in ("bid", "ask", "ts_ns", "volume") if c in df.columns]
+        yield pa.table({"timestamp": t, **{c: df[c].to_numpy()[off:off + ROW_GROUP_ROWS] for c in cols}})
+
+def _with_volume(df: pd.DataFrame, volume: bool) -> pd.DataFrame:
+    # a float64 volume column without NaN if the run carries volume, none otherwise
+    if not volume:
+        if "volume" in df.columns:
+            del df["volume"]
+        return df
+    if "volume" not in df.columns:
+        raise ValueError(f"{E.MISSING_COLUMN}: ['volume']")
+    v = df["volume"].to_numpy(dtype="float64")
+    if v.dtype != df["volume"].dtype or np.isnan(v).any():
+        df["volume"] = np.nan_to_num(v, nan=0.0)
     return df
 
+def _time_filter(df: pd.DataFrame, start: int | None, end: int | None) -> pd.DataFrame:
+    # keep ticks with start <= ts_ns < end
+    ts = df["ts_ns"].to_numpy()
+    keep = np.ones(len(ts), dtype=bool)
+    if start is not None:
+        keep &= ts >= start
+    if end is not None:
+        keep &= ts < end
+    return df if keep.all() else df.loc[keep]
+
+def _sort_and_dedupe(df: pd.DataFrame) -> pd.DataFrame:
+    # feed files are almost always in order: one O(n) check instead of a sort
+    ts = df["ts_ns"].to_numpy()
+    if (ts[1:] < ts[:-1]).any():
+        df = df.sort_values("ts_ns", kind="mergesort")
+    return dedupe_sorted(df)
+
 def _neg_spread_check(df: pd.DataFrame):
     if (df["ask"] < df["bid"]).any():
         raise ValueError(E.NEGATIVE_SPREAD)
 
-def _trim_weekend(df: pd.DataFrame) -> pd.DataFrame:
-    # FX 24x5, simple rule: drop Saturday and Sunday by UTC weekday
-    ts = pd.to_datetime(df["ts_ns"], utc=True, unit="ns")
-    wd = ts.dt.weekday  # Monday=0 ... Sunday=6
-    mask = ~wd.isin([5,6])
-    return df.loc[mask].copy()
+def _trim_weekend(df: pd.DataFrame, rule: str = "calendar", index: TimeIndex | None = None) -> pd.DataFrame:
+    # FX 24x5: drop the weekend of rule (UTC Saturday/Sunday or the Friday 22:00 ..
+    # Sunday 22:00 session break); index is the chunk's shared TimeIndex
+    mask = (index or TimeIndex(df["ts_ns"].to_numpy())).trading(rule)
+    return df if mask.all() else df.loc[mask]
 
 def _compute_mid(df: pd.DataFrame, basis: str) -> pd.Series:
     if basis == "bid":
@@ -58,153 +140,803 @@ def _compute_mid(df: pd.DataFrame, basis: str) -> pd.Series:
         return df["ask"]
     return (df["bid"] + df["ask"]) / 2.0
 
-def _gap_report(df: pd.DataFrame, max_gap_s: int) -> Tuple[List[Tuple[str,str,float]], float]:
-    ts = pd.to_datetime(df["ts_ns"], utc=True, unit="ns")
-    dt_s = ts.diff().dt.total_seconds().fillna(0.0)
-    gaps = dt_s[dt_s > max_gap_s]
-    items = []
-    for idx, val in gaps.items():
-        t_prev = ts.iloc[int(idx)-1] if idx>0 else pd.NaT
-        t_now = ts.iloc[int(idx)]
-        items.append((t_prev.isoformat(), t_now.isoformat(), float(val)))
-    coverage = float((dt_s <= max_gap_s).mean() * 100.0)
-    return items, coverage
-
-def _time_bars_1m(df: pd.DataFrame, basis: str, symbol: str) -> pd.DataFrame:
-    # resample by minute on UTC
-    ts = pd.to_datetime(df["ts_ns"], utc=True, unit="ns")
-    s = _compute_mid(df, basis)
-    # Create a DataFrame with required fields
-    tmp = pd.DataFrame({"mid": s.values, "bid": df["bid"].values, "ask": df["ask"].values}, index=ts)
-    o = tmp["mid"].resample("1T").first().ffill()
-    h = tmp["mid"].resample("1T").max().ffill()
-    l = tmp["mid"].resample("1T").min().ffill()
-    c = tmp["mid"].resample("1T").last().ffill()
-    o_bid = tmp["bid"].resample("1T").first().ffill()
-    o_ask = tmp["ask"].resample("1T").first().ffill()
-    c_bid = tmp["bid"].resample("1T").last().ffill()
-    c_ask = tmp["ask"].resample("1T").last().ffill()
-    spread_mean = (tmp["ask"] - tmp["bid"]).resample("1T").mean().fillna(0.0)
-    n_ticks = tmp["mid"].resample("1T").count().fillna(0).astype("int32")
-
-    out = pd.DataFrame({
-        "symbol": symbol,
-        "frame": "1m",
-        "t_open_ns": o.index.view("int64"),
-        "t_close_ns": (o.index + pd.Timedelta(minutes=1) - pd.Timedelta(nanoseconds=1)).view("int64"),
-        "o": o.values,"h": h.values,"l": l.values,"c": c.values,
-        "o_bid": o_bid.values,"o_ask": o_ask.values,"c_bid": c_bid.values,"c_ask": c_ask.values,
-        "spread_mean": spread_mean.values,
-        "n_ticks": n_ticks.values,
-        "v_sum": np.zeros_like(n_ticks.values, dtype="float64"),
-        "tick_first_id": -1,
-        "tick_last_id": -1,
-        "gap_flag": (n_ticks==0).astype("int32"),
-    })
+def _gap_report(df: pd.DataFrame, max_gap_s: int, prev_ns: int | None = None) -> Tuple[pd.DataFrame, int]:
+    # gaps between consecutive ticks as a GAP_COLUMNS table, all on int64 ts_ns;
+    # prev_ns is the last tick of the previous chunk
+    ts = df["ts_ns"].to_numpy()
+    if len(ts) == 0:
+        return pd.DataFrame({c: np.empty(0, "float64" if c == "seconds" else "int64") for c in GAP_COLUMNS}), 0
+    before = np.empty_like(ts)
+    before[0] = ts[0] if prev_ns is None else prev_ns
+    before[1:] = ts[:-1]
+    d = ts - before
+    gap = d > max_gap_s * 1_000_000_000
+    return pd.DataFrame({"start_ns": before[gap], "end_ns": ts[gap], "seconds": d[gap] / 1e9}), int(len(ts) - gap.sum())
+
+class _GapStats:
+    # count and total of all gaps plus the top_k longest for the JSON report; the
+    # full table goes to gaps.parquet
+    def __init__(self, top_k: int):
+        self.top_k = top_k
+        self.n = 0
+        self.total_ns = 0
+        self.top = _gap_report(pd.DataFrame({"ts_ns": np.empty(0, "int64")}), 0)[0]
+
+    def push(self, gaps: pd.DataFrame):
+        if not len(gaps):
+            return
+        self.n += len(gaps)
+        self.total_ns += int((gaps["end_ns"] - gaps["start_ns"]).sum())
+        top = pd.concat([self.top, gaps], ignore_index=True)
+        if len(top) > self.top_k > 0:
+            # only gaps at least as long as the top_k-th longest can stay
+            s = top["seconds"].to_numpy()
+            top = top[s >= np.partition(s, len(s) - self.top_k)[len(s) - self.top_k]]
+        # longest first, earlier first among equal lengths, whatever the chunking
+        order = np.lexsort((top["start_ns"].to_numpy(), -top["seconds"].to_numpy()))[:self.top_k]
+        self.top = top.iloc[order].reset_index(drop=True)
+
+    def items(self) -> List[Tuple[str, str, float]]:
+        return [(pd.Timestamp(int(a), tz="UTC").isoformat(), pd.Timestamp(int(b), tz="UTC").isoformat(), float(s))
+                for a, b, s in zip(self.top["start_ns"], self.top["end_ns"], self.top["seconds"])]
+
+    def restore(self, items: List[Tuple[str, str, float]], n: int | None, total_ns: int | None):
+        # n and total_ns are None for runs whose report still listed every gap
+        start = np.array([pd.Timestamp(a).value for a, _, _ in items], dtype="int64")
+        end = np.array([pd.Timestamp(b).value for _, b, _ in items], dtype="int64")
+        self.push(pd.DataFrame({"start_ns": start, "end_ns": end, "seconds": (end - start) / 1e9}))
+        if n is not None:
+            self.n, self.total_ns = n, total_ns
+
+    def summary(self) -> Dict[str, Any]:
+        return {"n_gaps": self.n, "total_seconds": self.total_ns / 1e9,
+                "max_seconds": float(self.top["seconds"].iloc[0]) if self.n else 0.0, "top_k": self.top_k}
+
+def _time_bars(df: pd.DataFrame, frame: str, basis: str, symbol: str) -> pd.DataFrame:
+    # one pass: epoch-aligned bucket id per tick by integer division, then a
+    # segment reduction over the runs of equal bucket ids
+    frame_ns = parse_frame(frame)
+    ts = df["ts_ns"].to_numpy()
+    bucket = ts // frame_ns
+    starts = bucket_starts(bucket)
+    first_id = int(df.index[0]) if len(df) else 0
+    cols = segment_reduce(ts, df["bid"].to_numpy(), df["ask"].to_numpy(),
+                          _compute_mid(df, basis).to_numpy(), starts, first_id, _volume_of(df))
+    cols = fill_buckets(cols, bucket[starts], frame_ns)
+    out = pd.DataFrame(cols)
+    out.insert(0, "symbol", symbol)
+    out.insert(1, "frame", frame)
+    return out[BAR_COLUMNS]
+
+def _cascade_bars(bars: pd.DataFrame, frame: str, symbol: str) -> pd.DataFrame:
+    # coarser time bars from populated finer ones, so extra frames cost O(bars)
+    frame_ns = parse_frame(frame)
+    src = {c: bars[c].to_numpy() for c in BAR_COLUMNS[2:]}
+    bucket = src["t_open_ns"] // frame_ns
+    starts = bucket_starts(bucket)
+    cols = fill_buckets(cascade_reduce(src, starts), bucket[starts], frame_ns)
+    out = pd.DataFrame(cols)
+    out.insert(0, "symbol", symbol)
+    out.insert(1, "frame", frame)
+    return out[BAR_COLUMNS]
+
+def _segment_bars(df: pd.DataFrame, starts: np.ndarray, frame: str, basis: str, symbol: str) -> pd.DataFrame:
+    # bars over tick segments; df carries positional (raw_norm) row ids as its index
+    first_id = int(df.index[0]) if len(df) else 0
+    cols = segment_reduce(df["ts_ns"].to_numpy(), df["bid"].to_numpy(), df["ask"].to_numpy(),
+                          _compute_mid(df, basis).to_numpy(), starts, first_id, _volume_of(df))
+    out = pd.DataFrame(cols)
+    out.insert(0, "symbol", symbol)
+    out.insert(1, "frame", frame)
+    out["gap_flag"] = np.zeros(len(out), dtype="int32")
     return out[BAR_COLUMNS]
 
 def _tick_bars(df: pd.DataFrame, N: int, basis: str, symbol: str) -> pd.DataFrame:
-    # simple chunking: each N rows = one bar
-    total = len(df)
-    k = total // N + (1 if total % N else 0)
-    rows = []
-    mid = _compute_mid(df, basis).values
-    for i in range(k):
-        s = i*N
-        e = min((i+1)*N, total)
-        seg = df.iloc[s:e]
-        if seg.empty:
-            continue
-        mi = mid[s:e]
-        o = mi[0]; h = mi.max(); l = mi.min(); c = mi[-1]
-        o_bid = seg["bid"].iloc[0]; o_ask = seg["ask"].iloc[0]
-        c_bid = seg["bid"].iloc[-1]; c_ask = seg["ask"].iloc[-1]
-        spread_mean = float((seg["ask"] - seg["bid"]).mean())
-        n_ticks = int(len(seg))
-        t_open_ns = int(seg["ts_ns"].iloc[0])
-        t_close_ns = int(seg["ts_ns"].iloc[-1])
-        rows.append([symbol,f"{N}t",t_open_ns,t_close_ns,o,h,l,c,o_bid,o_ask,c_bid,c_ask,spread_mean,n_ticks,0.0,seg.index[0],seg.index[-1],0])
-    out = pd.DataFrame(rows, columns=BAR_COLUMNS)
-    return out
-
-def _write_parquet(df: pd.DataFrame, path: pathlib.Path):
-    # rely on pandas+pyarrow
-    df.to_parquet(path)
+    # each N rows = one bar
+    return _segment_bars(df, tick_starts(len(df), N), f"{N}t", basis, symbol)
+
+def _volume_of(df: pd.DataFrame) -> np.ndarray | None:
+    return df["volume"].to_numpy(dtype="float64") if "volume" in df.columns else None
+
+class _Deduper:
+    # cross-chunk ordering check and dedupe; keeps the (bid, ask) pairs seen at the last ts_ns
+    def __init__(self):
+        self.last_ns = None
+        self.seen = set()
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        ts = df["ts_ns"].to_numpy()
+        if self.last_ns is not None and len(ts):
+            if ts[0] < self.last_ns:
+                raise ValueError(f"{E.UNSORTED_INPUT}: tick at {int(ts[0])} is {(self.last_ns - int(ts[0])) / 1e9:.3f}s "
+                                 f"behind {self.last_ns}, the last tick before the chunk boundary")
+            head = np.flatnonzero(ts == self.last_ns)
+            if len(head):
+                bid, ask = df["bid"].to_numpy(), df["ask"].to_numpy()
+                keep = np.ones(len(df), dtype=bool)
+                keep[head] = [(bid[j], ask[j]) not in self.seen for j in head]
+                df = df.loc[keep]
+                ts = df["ts_ns"].to_numpy()
+        if len(ts):
+            tail = ts == ts[-1]
+            pairs = set(zip(df["bid"].to_numpy()[tail], df["ask"].to_numpy()[tail]))
+            self.seen = self.seen | pairs if ts[-1] == self.last_ns else pairs
+            self.last_ns = int(ts[-1])
+        return df
+
+class _TimeBarBuilder:
+    # holds back the ticks of the last (possibly open) bucket until the next chunk arrives
+    key = "ts_ns"
+
+    def __init__(self, frame: str, basis: str, symbol: str):
+        self.frame, self.basis, self.symbol = frame, basis, symbol
+        self.frame_ns = parse_frame(frame)
+        self._carry = None
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._carry is not None:
+            df = pd.concat([self._carry, df])
+        if df.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        bucket = df[self.key].to_numpy() // self.frame_ns
+        self._carry = df.iloc[int(np.searchsorted(bucket, bucket[-1])):]
+        return self._build(df).iloc[:-1]
+
+    def flush(self) -> pd.DataFrame:
+        if self._carry is None or self._carry.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return self._build(self._carry)
+
+    def _build(self, df: pd.DataFrame) -> pd.DataFrame:
+        return _time_bars(df, self.frame, self.basis, self.symbol)
+
+    def state(self) -> Dict[str, int]:
+        # the open bar written by flush() and the first raw_norm row needed to rebuild it
+        if self._carry is None or self._carry.empty:
+            return {"tail_rows": 0}
+        return {"tail_rows": 1, "tail_first_id": int(self._carry.index[0])}
+
+class _CascadeBuilder(_TimeBarBuilder):
+    # same carry logic, fed with the finished bars of a finer time frame
+    key = "t_open_ns"
+
+    def push(self, bars: pd.DataFrame) -> pd.DataFrame:
+        return super().push(bars[bars["n_ticks"] > 0])
+
+    def _build(self, bars: pd.DataFrame) -> pd.DataFrame:
+        return _cascade_bars(bars, self.frame, self.symbol)
+
+    def state(self) -> Dict[str, int]:
+        # the open bar and the first finer bar it is built from
+        if self._carry is None or self._carry.empty:
+            return {"tail_rows": 0}
+        return {"tail_rows": 1, "carry_from_ns": int(self._carry["t_open_ns"].iloc[0])}
+
+class _TickBarBuilder:
+    # holds back the ticks of the last partial N-tick bar until the next chunk arrives
+    def __init__(self, N: int, basis: str, symbol: str):
+        self.N, self.basis, self.symbol = N, basis, symbol
+        self._carry = None
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._carry is not None:
+            df = pd.concat([self._carry, df])
+        k = len(df) // self.N * self.N
+        self._carry = df.iloc[k:]
+        return _tick_bars(df.iloc[:k], self.N, self.basis, self.symbol)
+
+    def flush(self) -> pd.DataFrame:
+        if self._carry is None or self._carry.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return _tick_bars(self._carry, self.N, self.basis, self.symbol)
+
+    def state(self) -> Dict[str, int]:
+        if self._carry is None or self._carry.empty:
+            return {"tail_rows": 0}
+        return {"tail_rows": 1, "tail_first_id": int(self._carry.index[0])}
+
+class _FlowBarBuilder(abc.ABC):
+    # bars that close when a running total crosses a threshold (volume, dollar, tick
+    # imbalance); holds back the ticks of the open bar and the running state at its
+    # first tick until the next chunk arrives
+    def __init__(self, name: str, basis: str, symbol: str):
+        self.name, self.basis, self.symbol = name, basis, symbol
+        self._carry = None
+
+    def push(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self._carry is not None:
+            df = pd.concat([self._carry, df])
+        if df.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        ends = self._ends(df)
+        k = int(ends[-1]) if len(ends) else 0
+        self._carry = df.iloc[k:]
+        if not k:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return _segment_bars(df.iloc[:k], np.concatenate([[0], ends[:-1]]).astype("int64"),
+                             self.name, self.basis, self.symbol)
+
+    def flush(self) -> pd.DataFrame:
+        if self._carry is None or self._carry.empty:
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        return _segment_bars(self._carry, np.zeros(1, dtype="int64"), self.name, self.basis, self.symbol)
+
+    @abc.abstractmethod
+    def _ends(self, df: pd.DataFrame) -> np.ndarray:
+        # exclusive ends of the closed bars; advances the state to the open bar
+        ...
+
+    def params(self) -> Dict[str, Any]:
+        return {}
+
+    def restore(self, state: Dict[str, Any]):
+        pass
+
+    def state(self) -> Dict[str, Any]:
+        if self._carry is None or self._carry.empty:
+            return {"tail_rows": 0, **self.params()}
+        return {"tail_rows": 1, "tail_first_id": int(self._carry.index[0]), **self.params()}
+
+class _VolumeBarBuilder(_FlowBarBuilder):
+    # a bar per `size` of volume (or of volume * price for dollar bars), counted in
+    # integer FLOW_POINTS so the running total is exact
+    def __init__(self, name: str, size: float, dollar: bool, basis: str, symbol: str):
+        super().__init__(name, basis, symbol)
+        self.size = max(1, int(round(size * FLOW_POINTS)))
+        self.dollar = dollar
+        self.filled = 0   # points of the open bar before its first tick
+
+    def _ends(self, df: pd.DataFrame) -> np.ndarray:
+        value = df["volume"].to_numpy(dtype="float64")
+        if self.dollar:
+            value = value * _compute_mid(df, self.basis).to_numpy()
+        points = np.rint(value * FLOW_POINTS).astype("int64")
+        starts = threshold_starts(points, self.filled, self.size)
+        last = int(starts[-1])
+        self.filled = (self.filled + int(points[:last].sum())) % self.size
+        return starts[1:]
+
+    def params(self) -> Dict[str, Any]:
+        return {"filled": self.filled}
+
+    def restore(self, state: Dict[str, Any]):
+        self.filled = state["filled"]
+
+class _ImbalanceBarBuilder(_FlowBarBuilder):
+    # tick imbalance bars on the basis price; see bars.imbalance_ends
+    def __init__(self, name: str, expected_ticks: float, alpha: float, basis: str, symbol: str):
+        super().__init__(name, basis, symbol)
+        self.alpha = alpha
+        self.e_t, self.e_b = float(expected_ticks), 0.0
+        self.prev_mid, self.prev_sign = None, 0   # tick before the open bar
+
+    def _ends(self, df: pd.DataFrame) -> np.ndarray:
+        mid = _compute_mid(df, self.basis).to_numpy()
+        sign = tick_signs(mid, self.prev_mid, self.prev_sign)
+        ends, self.e_t, self.e_b = imbalance_ends(sign, self.e_t, self.e_b, self.alpha)
+        if ends:
+            self.prev_mid, self.prev_sign = float(mid[ends[-1] - 1]), int(sign[ends[-1] - 1])
+        return np.asarray(ends, dtype="int64")
+
+    def params(self) -> Dict[str, Any]:
+        return {"e_t": self.e_t, "e_b": self.e_b, "prev_mid": self.prev_mid, "prev_sign": self.prev_sign}
+
+    def restore(self, state: Dict[str, Any]):
+        self.e_t, self.e_b = state["e_t"], state["e_b"]
+        self.prev_mid, self.prev_sign = state["prev_mid"], state["prev_sign"]
+
+def _size_label(size: float) -> str:
+    return str(int(size)) if float(size).is_integer() else str(size)
+
+def _chunk_rows(config: Dict[str, Any]) -> int | None:
+    # None = read the whole file at once
+    stream = config.get("stream") or {}
+    if not stream.get("enabled", False):
+        return None
+    if stream.get("chunk_rows"):
+        return max(1, int(stream["chunk_rows"]))
+    budget = int(stream.get("memory_budget_mb", 1024)) * 1024 * 1024
+    return max(1, budget // ROW_BYTES_ESTIMATE)
+
+def _reorder_ns(config: Dict[str, Any]) -> int:
+    stream = config.get("stream") or {}
+    return int(float(stream.get("reorder_seconds", REORDER_SECONDS)) * 1_000_000_000)
+
+def _hold_back(df: pd.DataFrame, held: pd.DataFrame | None, window_ns: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # stream mode: the ticks of a normalized chunk within window_ns of its latest
+    # tick are held back and go out with the next chunk, so a tick that is slightly
+    # late across a chunk boundary is sorted in as it is in one pass. held comes
+    # first, so a stable sort keeps the file order of equal ts_ns.
+    if held is not None and len(held):
+        df = pd.concat([held, df], ignore_index=True)
+    ts = df["ts_ns"].to_numpy()
+    late = ts > ts.max() - window_ns if len(ts) else np.zeros(0, dtype=bool)
+    return df.loc[~late], df.loc[late]
+
+def _reordered(chunks: Iterator[pd.DataFrame], window_ns: int, text: bool, tel: Telemetry) -> Iterator[pd.DataFrame]:
+    # normalized chunks with _hold_back applied
+    held = None
+    for i, df in enumerate(chunks):
+        with tel.stage("normalize_time", len(df)):
+            _ensure_cols(df)
+            _neg_spread_check(df)
+            if i == 0: tel.log("normalize_time", 10, f"normalize timestamps, reorder window {window_ns / 1e9:g}s")
+            df = _normalize_time(df, text=text)
+        with tel.stage("reorder", len(df) + (len(held) if held is not None else 0)) as call:
+            df, held = _hold_back(df, held, window_ns)
+            call.rows_out = len(df)
+        yield df
+    if held is not None and len(held):
+        yield held
+
+def _parallel_workers(config: Dict[str, Any]) -> int | None:
+    # None = serial ingest
+    par = config.get("parallel") or {}
+    if not par.get("enabled", False):
+        return None
+    return max(1, int(par.get("workers") or os.cpu_count() or 1))
+
+def _prepare(df: pd.DataFrame, text: bool = True) -> pd.DataFrame:
+    # per-chunk stages that need no state from other chunks
+    _ensure_cols(df)
+    _neg_spread_check(df)
+    return _sort_and_dedupe(_normalize_time(df, text=text))
+
+def _prepare_day(csv_path: pathlib.Path, header: str, start: int, end: int) -> pd.DataFrame:
+    # one day partition; runs in a worker process
+    try:
+        df = read_range(csv_path, header, start, end)
+    except Exception as e:
+        raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+    return _prepare(df)
+
+def _parallel_days(csv_path: pathlib.Path, index: Dict[str, Any], workers: int):
+    # prepared day partitions in file order; at most 2 * workers days are in flight
+    jobs = [(csv_path, index["header"], start, end) for _, start, end in index["days"]]
+    if workers == 1:
+        for job in jobs:
+            yield _prepare_day(*job)
+        return
+    # spawn: workers must not inherit the parent's Arrow thread pools
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        window = [pool.submit(_prepare_day, *job) for job in jobs[:2 * workers]]
+        nxt = len(window)
+        while window:
+            df = window.pop(0).result()
+            if nxt < len(jobs):
+                window.append(pool.submit(_prepare_day, *jobs[nxt]))
+                nxt += 1
+            yield df
+
+def _prepared_file(path: pathlib.Path, chunk_rows: int | None, start: int | None, end: int | None,
+                   text: bool, window_ns: int = 0):
+    # one file of a multi-file input, as the k-way merge consumes it; in stream
+    # mode with the reorder window of window_ns
+    fmt = input_format(path)
+    chunks = read_csv(path, chunk_rows) if fmt == "csv" else read_ticks(path, fmt, chunk_rows, start, end)
+    held = None
+    for df in chunks:
+        _ensure_cols(df)
+        _neg_spread_check(df)
+        df = _normalize_time(df, text=text)
+        if window_ns > 0:
+            df, held = _hold_back(df, held, window_ns)
+        yield _time_filter(_sort_and_dedupe(df), start, end)
+    if held is not None and len(held):
+        yield _time_filter(_sort_and_dedupe(held), start, end)
+
+def _first_ns(path: pathlib.Path) -> int | None:
+    # first ts_ns of a file's first PEEK_ROWS rows, without reading the rest of it
+    fmt = input_format(path)
+    chunks = read_csv(path, PEEK_ROWS) if fmt == "csv" else read_ticks(path, fmt, PEEK_ROWS)
+    head = next(chunks, None)
+    chunks.close()
+    if head is None or not len(head):
+        return None
+    _ensure_cols(head)
+    return int(_normalize_time(head, text=False)["ts_ns"].min())
+
+def _input_sha256(files: List[Tuple[int, pathlib.Path]], cache_root: pathlib.Path | None) -> str:
+    # a single file hashes as itself; several hash their (vendor, name, sha256) list
+    shas = [cache.input_sha256(p, cache_root) if cache_root is not None else sha256_of_file(p) for _, p in files]
+    if len(files) == 1:
+        return shas[0]
+    listing = [[v, p.name, sha] for (v, p), sha in zip(files, shas)]
+    return hashlib.sha256(json.dumps(listing).encode("utf-8")).hexdigest()
+
+def _spread(df: pd.DataFrame) -> np.ndarray:
+    return (df["ask"] - df["bid"]).to_numpy(dtype="float64")
+
+def _quality_history(raw_norm: pathlib.Path, quality: QualityStats, decimals: int | None = None):
+    # replay already ingested ticks, one row group at a time, for runs without a
+    # quality state; decimals is set for the compact raw_norm layout
+    cols = ["ts_ns","bid_pts","ask_pts"] if decimals is not None else ["ts_ns","bid","ask"]
+    for p in parts(raw_norm):
+        pf = pq.ParquetFile(p)
+        for rg in range(pf.metadata.num_row_groups):
+            df = pf.read_row_group(rg, columns=cols).to_pandas()
+            df = decode_ticks(df, decimals) if decimals is not None else df
+            quality.push(df["ts_ns"].to_numpy(), _spread(df))
 
 def run(config: Dict[str, Any]) -> Dict[str, Any]:
     out_dir = pathlib.Path(config["out_dir"]); out_dir.mkdir(parents=True, exist_ok=True)
-    _log_line(out_dir, "init", 1, "init")
+    # progress events and per-stage timings go to progress.jsonl; under the
+    # orchestrator the sink is the one it already holds open
+    with open_telemetry(out_dir / "progress.jsonl", "data_ingest") as tel:
+        return _run(config, out_dir, tel)
+
+def _run(config: Dict[str, Any], out_dir: pathlib.Path, tel: Telemetry) -> Dict[str, Any]:
+    tel.log("init", 1, "init")
 
     # Select input path
     demo = bool(config.get("demo", False))
     if demo:
         # relative to this module → samples
-        csv_path = (pathlib.Path(__file__).resolve().parents[2] / "samples" / "ticks" / "eurusd_sample.csv")
+        spec = str(pathlib.Path(__file__).resolve().parents[2] / "samples" / "ticks" / "eurusd_sample.csv")
     else:
-        csv_path = pathlib.Path(config["csv"]["path"])
+        # input.path (CSV, Parquet or Arrow IPC; a directory, glob or vendor list is
+        # merged) takes precedence over csv.path
+        spec = (config.get("input") or {}).get("path") or config["csv"]["path"]
+    files = expand_inputs(spec)
+    if not files:
+        raise RuntimeError(f"{E.IO_ERROR}: no input files match {spec!r}")
+    merged = is_multi(spec)
+    in_path = files[0][1]
+    fmt = "multi" if merged else input_format(in_path)
+    t_start, t_end = time_range(config)
 
     symbol = config.get("symbol","EURUSD")
     basis = config.get("price_basis","mid")
     max_gap_s = int(config.get("max_missing_gap_seconds",60))
 
-    # Load CSV
-    _log_line(out_dir, "load_csv", 5, f"loading {csv_path}")
-    try:
-        df = pd.read_csv(csv_path)
-    except Exception as e:
-        raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
-
-    _ensure_cols(df)
-    _neg_spread_check(df)
-    _log_line(out_dir, "normalize_time", 10, "normalize timestamps")
-    df = _normalize_time(df)
+    trim = weekend_rule(config)
+    chunk_rows = _chunk_rows(config)
 
-    _log_line(out_dir, "sort_dedupe", 20, "sort & dedupe")
-    df = _sort_and_dedupe(df)
-    df = df.reset_index(drop=True)
+    # Result cache: an identical input + config reuses the outputs of an earlier run
+    cache_root = cache.cache_dir(config)
+    input_sha = None
+    if cache_root is not None and all(p.exists() for _, p in files):
+        input_sha = _input_sha256(files, cache_root)
+        key = cache.cache_key(input_sha, config, {"module_version": MODULE_VERSION, "schema_version": SCHEMA_VERSION,
+                                                  "bar_rules_id": BAR_RULES_ID})
+        entry = cache.lookup(cache_root, key)
+        if entry is not None:
+            tel.log("cache", 50, f"cache hit {key[:12]}")
+            manifest = cache.materialize(entry, out_dir)
+            manifest["run_ts"] = dt.datetime.utcnow().isoformat()
+            manifest["cache"] = {"key": key, "hit": True}
+            write_json(out_dir / "manifest.json", manifest)
+            (out_dir / "config_used.yaml").write_text(json.dumps(config, indent=2), encoding="utf-8")
+            tel.report()
+            tel.log("done", 100, "done")
+            return _result(symbol, manifest["outputs"], out_dir)
 
-    if config.get("trim_weekend", True):
-        _log_line(out_dir, "trim_weekend", 25, "trim weekends")
-        df = _trim_weekend(df)
+    # Append mode continues an existing run from the state in its manifest
+    prev = None
+    if config.get("append", False) and (out_dir / "manifest.json").exists():
+        prev = json.loads((out_dir / "manifest.json").read_text(encoding="utf-8"))
+        if "state" not in prev:
+            raise ValueError(f"append: {out_dir / 'manifest.json'} has no ingest state")
+        if prev.get("price_basis") != basis:
+            raise ValueError(f"append: price_basis {basis!r} differs from existing run ({prev.get('price_basis')!r})")
 
-    _log_line(out_dir, "gap_report", 30, "gap analysis")
-    gaps, coverage = _gap_report(df, max_gap_s)
-
-    # Save normalized raw
-    raw_norm = out_dir / "raw_norm.parquet"
-    _write_parquet(df[["timestamp","bid","ask","ts_ns"]], raw_norm)
-
-    frames_out = {}
-    for frame in config.get("bar_frames", []):
-        if frame.get("type") == "time" and frame.get("unit") == "1m":
-            _log_line(out_dir, "bars_1m", 50, "build 1m bars")
-            bars = _time_bars_1m(df, basis, symbol)
-            p = out_dir / "bars_1m.parquet"
-            _write_parquet(bars, p); frames_out["1m"] = str(p)
+    # the finest time frame is built from ticks; coarser multiples of it cascade from its bars
+    frames = config.get("bar_frames", [])
+    units = [str(f.get("unit", "1m")) for f in frames if f.get("type") == "time"]
+    base = min(units, key=parse_frame) if units else None
+    builders, cascades = {}, {}
+    for frame in frames:
+        if frame.get("type") == "time":
+            unit = str(frame.get("unit", "1m"))
+            p = out_dir / f"bars_{unit}.parquet"
+            if unit != base and parse_frame(unit) % parse_frame(base) == 0:
+                cascades[unit] = (_CascadeBuilder(unit, basis, symbol), p)
+            else:
+                builders[unit] = (_TimeBarBuilder(unit, basis, symbol), p)
         if frame.get("type") == "tick":
             N = int(frame.get("count", 0))
             if N > 0:
-                _log_line(out_dir, f"bars_{N}t", 60, f"build {N}t bars")
-                bars = _tick_bars(df, N, basis, symbol)
-                p = out_dir / f"bars_{N}tick.parquet"
-                _write_parquet(bars, p); frames_out[f"{N}t"] = str(p)
+                builders[f"{N}t"] = (_TickBarBuilder(N, basis, symbol), out_dir / f"bars_{N}tick.parquet")
+        if frame.get("type") in ("volume", "dollar"):
+            size = float(frame.get("size", 0))
+            if size > 0:
+                dollar = frame["type"] == "dollar"
+                label = _size_label(size)
+                name = f"{label}{'d' if dollar else 'v'}"
+                builders[name] = (_VolumeBarBuilder(name, size, dollar, basis, symbol),
+                                  out_dir / f"bars_{label}{'dollar' if dollar else 'vol'}.parquet")
+        if frame.get("type") == "tick_imbalance":
+            expected = float(frame.get("expected_ticks", 100))
+            if expected > 0:
+                name = f"{_size_label(expected)}ti"
+                builders[name] = (_ImbalanceBarBuilder(name, expected, float(frame.get("alpha", 0.1)), basis, symbol),
+                                  out_dir / f"bars_{_size_label(expected)}imb.parquet")
+    outputs = {name: p for name, (_, p) in {**builders, **cascades}.items()}
+
+    raw_norm = out_dir / "raw_norm.parquet"
+    # compact raw_norm: int32 price points and delta-encoded ts_ns, no text timestamp
+    compact = bool((config.get("compact_ticks") or {}).get("enabled", False))
+    decimals = price_decimals(symbol, config) if compact else None
+    raw_cols = COMPACT_COLUMNS if compact else ["timestamp","bid","ask","ts_ns"]
+    raw_opts = {"column_encoding": COMPACT_ENCODING} if compact else {}
+    # raw_norm and the bars carry volume if the input has it; decided by the first
+    # chunk, or by the existing run when appending
+    volume = None
+    needs_volume = any(isinstance(b, _VolumeBarBuilder) for b, _ in builders.values())
+    deduper = _Deduper()
+    qstats = QualityStats()
+    sketch_path = out_dir / "quality_sketch.parquet"
+    gaps = _GapStats(int((config.get("quality") or {}).get("top_gaps", 100)))
+    gaps_path = out_dir / "gaps.parquet"
+    n_within, n_rows, prev_ns = 0, 0, None
+    # robust z-score filter on mid returns and spreads; rejected ticks are quarantined
+    zscore = config.get("outlier_zscore")
+    outliers = OutlierFilter(zscore) if zscore else None
+    quarantine_path = out_dir / "quarantine.parquet"
+
+    # row group size, codec and layout of every output
+    pq_opts = parquet_options(config)
+    layout = pq_opts.pop("layout")
+
+    def sink(p: pathlib.Path, columns: List[str], key: str, appending: bool, **extra):
+        if layout == "dataset":
+            return DatasetSink(p, columns, symbol, key, **pq_opts, **extra)
+        if appending:
+            return ParquetSink(next_part(as_parts(p)), columns, keep_empty=False, sort_key=key, **pq_opts, **extra)
+        return ParquetSink(p, columns, sort_key=key, **pq_opts, **extra)
+
+    if prev is None:
+        for p in [raw_norm, gaps_path, quarantine_path, *outputs.values()]:
+            reset(p)
+        raw_sink = sink(raw_norm, raw_cols, "ts_ns", False, **raw_opts)
+        sinks = {name: sink(p, BAR_COLUMNS, "t_open_ns", False) for name, p in outputs.items()}
+        gap_sink = sink(gaps_path, GAP_COLUMNS, "start_ns", False)
+        q_sink = sink(quarantine_path, QUARANTINE_COLUMNS, "ts_ns", False) if outliers else None
+    else:
+        state = prev["state"]
+        if set(state["frames"]) != set(outputs):
+            raise ValueError(f"append: bar_frames {sorted(outputs)} differ from existing run {sorted(state['frames'])}")
+        if prev.get("layout", "file") != layout:
+            raise ValueError(f"append: parquet layout {layout!r} differs from existing run ({prev.get('layout', 'file')!r})")
+        if prev.get("price_decimals") != decimals:
+            raise ValueError(f"append: compact price_decimals {decimals!r} differ from existing run ({prev.get('price_decimals')!r})")
+        if prev.get("trim_weekend", trim) != trim:
+            raise ValueError(f"append: trim_weekend {trim!r} differs from existing run ({prev['trim_weekend']!r})")
+        if prev.get("outlier_zscore") != (outliers.k if outliers else None):
+            raise ValueError(f"append: outlier_zscore {zscore!r} differs from existing run ({prev.get('outlier_zscore')!r})")
+        tel.log("append", 3, f"append after watermark {state['watermark_ns']}")
+        # only the open trailing bars are rewritten; everything else gets a new part
+        for name, p in outputs.items():
+            drop_tail_rows(as_parts(p), state["frames"][name]["tail_rows"])
+        volume = bool(prev.get("volume", False))
+        if needs_volume and not volume:
+            raise ValueError(f"{E.MISSING_COLUMN}: ['volume'] (existing run has no volume)")
+        raw_sink = sink(raw_norm, raw_cols + ["volume"] if volume else raw_cols, "ts_ns", True, **raw_opts)
+        sinks = {name: sink(p, BAR_COLUMNS, "t_open_ns", True) for name, p in outputs.items()}
+        gap_sink = sink(gaps_path, GAP_COLUMNS, "start_ns", True)
+        q_sink = sink(quarantine_path, QUARANTINE_COLUMNS, "ts_ns", True) if outliers else None
+
+        def raw_rows(start: int) -> pd.DataFrame:
+            # raw_norm rows [start:] as ts_ns/bid/ask (and volume)
+            extra = ["volume"] if volume else []
+            if compact:
+                return decode_ticks(read_rows_from(raw_norm, start, COMPACT_COLUMNS + extra), decimals)
+            return read_rows_from(raw_norm, start, ["ts_ns","bid","ask"] + extra)
+
+        deduper.last_ns = state["watermark_ns"]
+        deduper.seen = {tuple(pair) for pair in state["dedupe_seen"]}
+        n_rows, n_within, prev_ns = state["n_raw_rows"], state["n_gap_within"], state["last_raw_ns"]
+        prev_quality = json.loads((out_dir / "quality_report.json").read_text(encoding="utf-8"))
+        gaps.restore(prev_quality["gap_items"], state.get("n_gaps"), state.get("gap_total_ns"))
+        if outliers is not None:
+            # filter references are rebuilt from the accepted ticks in raw_norm
+            outliers.restore(raw_rows(outliers.first_row(n_rows)), n_rows, prev_quality["outliers"],
+                             state.get("outliers"))
+        if "quality" in state:
+            # moments up to the last full block; the ticks after it are read back
+            qstats.restore(state["quality"], sketch_path)
+            qstats.add_moments(_spread(raw_rows(state["quality"]["n_blocked"])))
+        else:
+            _quality_history(raw_norm, qstats, decimals)
+
+        # rebuild builder carries from the ticks / finer bars behind the open bars
+        tail_ids = [st["tail_first_id"] for st in state["frames"].values() if "tail_first_id" in st]
+        tail = raw_rows(min(tail_ids)) if tail_ids else None
+        for name, (builder, _) in builders.items():
+            st = state["frames"][name]
+            if isinstance(builder, _FlowBarBuilder):
+                builder.restore(st)
+            if "tail_first_id" in st:
+                builder.push(tail.loc[st["tail_first_id"]:])
+        for name, (cascade, _) in cascades.items():
+            st = state["frames"][name]
+            if "carry_from_ns" in st:
+                cascade.push(read_where(outputs[base], "t_open_ns", st["carry_from_ns"]))
+
+    def emit(name: str, bars: pd.DataFrame):
+        sinks[name].write(bars)
+        if name == base:
+            for cname, (cascade, _) in cascades.items():
+                with tel.stage(f"bars_{cname}", len(bars)) as call:
+                    out = cascade.push(bars)
+                    call.rows_out = len(out)
+                sinks[cname].write(out)
+
+    n_skipped = 0
+    normalized = False
+    # stream chunks of a serial, multi-file or polars ingest are reordered within this window
+    window_ns = _reorder_ns(config) if chunk_rows else 0
+    engine = config.get("engine", "pandas")
+    if engine not in ENGINES:
+        raise ValueError(f"unsupported engine: {engine!r}")
+    # Parallel mode: day partitions are parsed, normalized and deduped in worker
+    # processes and enter the chunk loop below in file order
+    workers = _parallel_workers(config) if engine == "pandas" else None
+    index = day_index(in_path) if workers and fmt == "csv" else None
+    if merged:
+        # every file is normalized, sorted and deduped on its own, then all are merged
+        # by ts_ns; ticks at one ts_ns from several vendors keep the preferred vendor's
+        tel.log("load_csv", 5, f"merging {len(files)} files" + (f" in chunks of {chunk_rows} rows" if chunk_rows else ""))
+        tel.log("normalize_time", 10, "normalize timestamps, sort & dedupe per file, merge")
+        sources = [(str(p), _first_ns(p), functools.partial(_prepared_file, p, chunk_rows, t_start, t_end, not compact,
+                                                              window_ns))
+                   for _, p in files]
+        chunks, prepared = kway_merge(sources, [v for v, _ in files]), True
+    elif index is not None and index["days"]:
+        tel.log("load_csv", 5, f"loading {in_path} as {len(index['days'])} day partitions on {workers} workers")
+        tel.log("normalize_time", 10, "normalize timestamps, sort & dedupe per day")
+        chunks, prepared = _parallel_days(in_path, index, workers), True
+    elif engine == "polars" and fmt == "csv":
+        # the polars engine parses, sorts and dedupes the file, or each chunk of it, on all cores
+        from .polars_engine import prepared_chunks
+        tel.log("load_csv", 5, f"loading {in_path} with the polars engine" + (f" in chunks of {chunk_rows} rows" if chunk_rows else ""))
+        tel.log("normalize_time", 10, "normalize timestamps, sort & dedupe")
+        chunks, prepared = prepared_chunks(in_path, chunk_rows, t_start, t_end, window_ns), True
+    else:
+        # Load CSV, whole or in chunks; every stage carries its state across chunk boundaries
+        if workers:
+            tel.log("parallel", 3, "input cannot be split into day partitions, ingesting serially")
+        tel.log("load_csv", 5, f"loading {in_path}" + (f" in chunks of {chunk_rows} rows" if chunk_rows else ""))
+        if fmt == "csv":
+            chunks = read_csv(in_path, chunk_rows)
+        else:
+            chunks = read_ticks(in_path, fmt, chunk_rows, t_start, t_end)
+        prepared = False
+        if window_ns > 0:
+            chunks, normalized = _reordered(tel.timed("load_csv", chunks), window_ns, not compact, tel), True
+    for i, df in enumerate(chunks if normalized else tel.timed("load_csv", chunks)):
+        first = i == 0
+        if not first:
+            tel.log("stream", 70, f"chunk {i}: {len(df)} rows")
+        # rows already counted where _reordered normalized them
+        with tel.stage("normalize_time", 0 if normalized else len(df)):
+            if not prepared and not normalized:
+                _ensure_cols(df)
+                _neg_spread_check(df)
+                if first: tel.log("normalize_time", 10, "normalize timestamps")
+                df = _normalize_time(df, text=not compact)
+            # the ISO text is the bulk of a chunk; the filters below only move the
+            # numeric columns and the text is taken once, for the raw_norm write
+            df, text = _pop_text(df)
+            if volume is None:
+                volume = "volume" in df.columns
+                if needs_volume and not volume:
+                    raise ValueError(f"{E.MISSING_COLUMN}: ['volume']")
+                raw_sink.columns = raw_cols + ["volume"] if volume else raw_cols
+            df = _with_volume(df, volume)
+        if not prepared:
+            if first: tel.log("sort_dedupe", 20, "sort & dedupe")
+            with tel.stage("sort_dedupe", len(df)) as call:
+                df = _sort_and_dedupe(df)
+                call.rows_out = len(df)
+        # time range, append watermark and the dedupe across chunk boundaries
+        with tel.stage("dedupe", len(df)) as call:
+            if t_start is not None or t_end is not None:
+                df = _time_filter(df, t_start, t_end)
+            if prev is not None:
+                # ticks before the watermark are already ingested
+                old = df["ts_ns"].to_numpy() < deduper.last_ns
+                n_skipped += int(old.sum())
+                df = df.loc[~old]
+            df = deduper.push(df)
+            call.rows_out = len(df)
+
+        if trim:
+            if first: tel.log("trim_weekend", 25, f"trim weekends ({trim})")
+            with tel.stage("trim_weekend", len(df)) as call:
+                df = _trim_weekend(df, trim, TimeIndex(df["ts_ns"].to_numpy()))
+                call.rows_out = len(df)
+        if outliers is not None:
+            if first: tel.log("outliers", 27, f"outlier filter at |z| > {outliers.k}")
+            with tel.stage("outliers", len(df)) as call:
+                df, rejected = outliers.push(df)
+                q_sink.write(rejected)
+                call.rows_out = len(df)
+        rows = df.index.to_numpy()
+        # positional ids into raw_norm
+        df.index = pd.RangeIndex(n_rows, n_rows + len(df))
+
+        if first: tel.log("gap_report", 30, "gap analysis")
+        with tel.stage("gap_report", len(df)):
+            chunk_gaps, within = _gap_report(df, max_gap_s, prev_ns)
+            gap_sink.write(chunk_gaps); gaps.push(chunk_gaps)
+        n_within += within; n_rows += len(df)
+        if len(df):
+            prev_ns = int(df["ts_ns"].iloc[-1])
+
+        # Save normalized raw
+        with tel.stage("write_raw", len(df)):
+            if compact:
+                raw_sink.write(encode_ticks(df, decimals))
+            else:
+                for t in _raw_tables(df, text, rows):
+                    raw_sink.write(t)
+            del text, rows
+        with tel.stage("quality_stats", len(df)):
+            qstats.push(df["ts_ns"].to_numpy(), _spread(df))
+
+        for name, (builder, _) in builders.items():
+            if first: tel.log(f"bars_{name}", 60 if name.endswith("t") else 50, f"build {name} bars")
+            with tel.stage(f"bars_{name}", len(df)) as call:
+                bars = builder.push(df)
+                call.rows_out = len(bars)
+            emit(name, bars)
+        if first:
+            for cname in cascades:
+                tel.log(f"bars_{cname}", 50, f"derive {cname} bars from {base}")
+        del df
+
+    with tel.stage("write_raw"):
+        raw_sink.close()
+    gap_sink.close()
+    if q_sink is not None:
+        q_sink.close()
+    for name, (builder, _) in builders.items():
+        emit(name, builder.flush())
+    for name, (cascade, _) in cascades.items():
+        sinks[name].write(cascade.flush())
+    for sink in sinks.values():
+        sink.close()
+    frames_out = {name: str(p) for name, p in outputs.items()}
+
+    # Memory-mappable Arrow IPC copies of the ticks and bars, rebuilt from the Parquet outputs
+    ipc_files = {}
+    if ipc_enabled(config):
+        tel.log("ipc", 75, "write Arrow IPC copies")
+        with tel.stage("ipc", n_rows):
+            ipc_files[TICKS] = ipc_path(out_dir, raw_norm)
+            write_ipc(raw_norm, ipc_files[TICKS], raw_sink.columns, decimals=decimals)
+            for name, p in outputs.items():
+                ipc_files[name] = ipc_path(out_dir, p)
+                write_ipc(p, ipc_files[name], BAR_COLUMNS, symbol)
+    else:
+        reset(out_dir / IPC_DIR)
 
     # Quality report
-    _log_line(out_dir, "quality", 80, "write quality report")
+    tel.log("quality", 80, "write quality report")
+    spread_stats, hourly = qstats.result()
+    qstats.write_sketch(sketch_path)
     quality = {
-        "n_raw_rows": int(len(df)),
-        "gap_items": gaps,
-        "gap_coverage_percent": coverage,
+        "n_raw_rows": n_rows,
+        "outliers": dict(outliers.counts, zscore=outliers.k) if outliers else None,
+        "gap_summary": gaps.summary(),
+        "gap_items": gaps.items(),
+        "gap_coverage_percent": n_within / n_rows * 100.0 if n_rows else float("nan"),
         "neg_spread_found": False,
-        "spread_stats": {
-            "mean": float((df["ask"]-df["bid"]).mean()),
-            "p95": float((df["ask"]-df["bid"]).quantile(0.95)),
-        }
+        "spread_stats": spread_stats,
+        "hourly": hourly,
     }
     write_json(out_dir / "quality_report.json", quality)
 
     # Manifest
-    _log_line(out_dir, "manifest", 90, "write manifest")
+    tel.log("manifest", 90, "write manifest")
+    input_info = {
+        "csv_path": [str(e) for e in spec] if isinstance(spec, (list, tuple)) else str(spec),
+        "format": fmt,
+        "sha256": input_sha or (_input_sha256(files, None) if all(p.exists() for _, p in files) else None)
+    }
+    if merged:
+        input_info["files"] = [[v, str(p)] for v, p in files]
     manifest = {
         "run_ts": dt.datetime.utcnow().isoformat(),
         "module": "data_ingest",
@@ -213,23 +945,55 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         "bar_rules_id": BAR_RULES_ID,
         "symbol": symbol,
         "price_basis": basis,
-        "input": {
-            "csv_path": str(csv_path),
-            "sha256": sha256_of_file(csv_path) if csv_path.exists() else None
-        },
+        "layout": layout,
+        "raw_schema": "compact" if compact else "full",
+        "price_decimals": decimals,
+        "outlier_zscore": outliers.k if outliers else None,
+        "trim_weekend": trim,
+        "volume": bool(volume),
+        "input": input_info if prev is None else prev["input"],
         "outputs": frames_out,
+        "gaps": str(gaps_path),
+        "ipc": {name: str(p) for name, p in ipc_files.items()},
+        # what an append run needs to continue exactly where this run stopped
+        "state": {
+            "watermark_ns": deduper.last_ns,
+            "dedupe_seen": [[float(b), float(a)] for b, a in sorted(deduper.seen)],
+            "last_raw_ns": prev_ns,
+            "n_raw_rows": n_rows,
+            "n_gap_within": n_within,
+            "n_gaps": gaps.n,
+            "gap_total_ns": gaps.total_ns,
+            "quality": qstats.state(),
+            "outliers": outliers.state() if outliers else None,
+            "frames": {name: b.state() for name, (b, _) in {**builders, **cascades}.items()},
+        },
     }
+    if prev is not None:
+        manifest["appends"] = prev.get("appends", []) + [dict(input_info, n_rows=raw_sink.n_rows, n_skipped=n_skipped)]
+    if cache_root is not None and input_sha is not None:
+        manifest["cache"] = {"key": key, "hit": False}
     write_json(out_dir / "manifest.json", manifest)
+    if cache_root is not None and input_sha is not None:
+        names = [raw_norm.name, gaps_path.name, sketch_path.name, *[p.name for p in outputs.values()],
+                 "quality_report.json", "manifest.json"]
+        names += [quarantine_path.name] if outliers else []
+        cache.store(cache_root, key, out_dir, names + ([IPC_DIR] if ipc_files else []), cache.max_bytes(config))
 
     # Save config copy
     (out_dir / "config_used.yaml").write_text(json.dumps(config, indent=2), encoding="utf-8")
 
-    _log_line(out_dir, "done", 100, "done")
+    tel.report()
+    tel.log("done", 100, "done")
+
+    return _result(symbol, frames_out, out_dir)
 
+def _result(symbol: str, frames_out: Dict[str, str], out_dir: pathlib.Path) -> Dict[str, Any]:
     return {
         "symbol": symbol,
         "frames": frames_out,
         "quality_report": str(out_dir / "quality_report.json"),
+        "gaps": str(out_dir / "gaps.parquet"),
         "manifest": str(out_dir / "manifest.json"),
         "log": str(out_dir / "progress.jsonl")
     }
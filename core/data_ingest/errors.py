@@ -5,3 +5,4 @@ UNSORTED_INPUT = "UNSORTED_INPUT"
 TIMEZONE_ERROR = "TIMEZONE_ERROR"
 IO_ERROR = "IO_ERROR"
 GAP_EXCESS = "GAP_EXCESS"
+PRICE_PRECISION = "PRICE_PRECISION"
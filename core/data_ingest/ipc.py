@@ -0,0 +1,100 @@
+from __future__ import annotations
+import json, pathlib, uuid
+from typing import Dict, Any, List, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import errors as E
+from .compact import decode_table
+from .store import parts
+
+# Uncompressed Arrow IPC (Feather v2) copies of the ingest outputs. The Parquet
+# files stay the source of truth; the IPC files are rebuilt from them at the end
+# of every run and opened memory-mapped, so any number of processes share one
+# page-cached copy and a read costs no decoding. Compact raw_norm is stored
+# decoded (ts_ns/bid/ask floats, volume as is), i.e. ready to use.
+
+IPC_DIR = "ipc"
+TICKS = "ticks"
+
+def ipc_enabled(config: Dict[str, Any]) -> bool:
+    return bool((config.get("ipc") or {}).get("enabled", False))
+
+def ipc_path(out_dir: pathlib.Path, parquet_path: pathlib.Path) -> pathlib.Path:
+    # out_dir/ipc/<output name>.arrow
+    return out_dir / IPC_DIR / (pathlib.Path(parquet_path).name.split(".")[0] + ".arrow")
+
+def write_ipc(src: pathlib.Path, dst: pathlib.Path, columns: List[str], symbol: str | None = None,
+              decimals: int | None = None):
+    # one record batch per Parquet row group, written next to dst and renamed into
+    # place, so readers that still map the previous file keep a consistent copy
+    files = parts(src)
+    if decimals is not None:
+        schema = pa.schema([("ts_ns", pa.int64()), ("bid", pa.float64()), ("ask", pa.float64())] +
+                           [("volume", pa.float64())] * ("volume" in columns))
+    else:
+        schema = pq.read_schema(files[0]).remove_metadata() if files else pa.schema([])
+        if "symbol" in columns and "symbol" not in schema.names:
+            # dataset layout keeps the symbol in the directory names only
+            schema = schema.insert(columns.index("symbol"), pa.field("symbol", pa.string()))
+        schema = pa.schema([schema.field(c) for c in columns if c in schema.names])
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for p in files:
+            pf = pq.ParquetFile(p)
+            read = [c for c in columns if c in pf.schema_arrow.names]
+            for rg in range(pf.metadata.num_row_groups):
+                t = pf.read_row_group(rg, columns=read)
+                if decimals is not None:
+                    writer.write_table(decode_table(t, decimals))
+                    continue
+                if "symbol" in schema.names and "symbol" not in read:
+                    t = t.add_column(schema.get_field_index("symbol"), "symbol", pa.array([symbol] * len(t), pa.string()))
+                writer.write_table(t.select(schema.names).replace_schema_metadata())
+    tmp.replace(dst)
+
+def open_ipc(path: pathlib.Path) -> pa.Table:
+    # memory-mapped; the table's buffers point into the page cache
+    try:
+        return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    except (OSError, pa.ArrowException) as e:
+        raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+
+def _manifest_ipc(out_dir: pathlib.Path) -> Dict[str, str]:
+    manifest = json.loads((pathlib.Path(out_dir) / "manifest.json").read_text(encoding="utf-8"))
+    if not manifest.get("ipc"):
+        raise RuntimeError(f"{E.IO_ERROR}: no IPC copy in {out_dir}; run with ipc.enabled")
+    return manifest["ipc"]
+
+def open_ticks(out_dir: pathlib.Path) -> pa.Table:
+    # the normalized ticks of a run
+    return open_ipc(pathlib.Path(_manifest_ipc(out_dir)[TICKS]))
+
+def tick_span(bars: pa.Table | pd.DataFrame, start: int, stop: int | None = None) -> Tuple[int, int]:
+    # raw_norm rows [first, end) of bars[start:stop], of bar start alone without stop;
+    # tick_first_id / tick_last_id are raw_norm row positions, empty bars have
+    # tick_last_id == tick_first_id - 1
+    stop = start + 1 if stop is None else stop
+    if not 0 <= start < stop <= len(bars):
+        raise IndexError(f"bar range [{start}, {stop}) outside 0..{len(bars)}")
+    def at(col: str, i: int) -> int:
+        return int(bars[col].iloc[i] if isinstance(bars, pd.DataFrame) else bars[col][i].as_py())
+    first, end = at("tick_first_id", start), at("tick_last_id", stop - 1) + 1
+    if first < 0:
+        raise ValueError("bars have no tick ids (written before module 1.2); rebuild the run")
+    return first, max(first, end)
+
+def bar_ticks(ticks: pa.Table, bars: pa.Table | pd.DataFrame, start: int, stop: int | None = None) -> pa.Table:
+    # the ticks of bars[start:stop] (bar start alone without stop) as a zero-copy
+    # slice of ticks, e.g. open_ticks(out_dir) with open_bars(out_dir, "1m")
+    first, end = tick_span(bars, start, stop)
+    return ticks.slice(first, end - first)
+
+def open_bars(out_dir: pathlib.Path, frame: str) -> pa.Table:
+    # the bars of one frame of a run, by its output name ("1m", "100t", ...)
+    files = _manifest_ipc(out_dir)
+    if frame not in files or frame == TICKS:
+        raise ValueError(f"unknown bar frame {frame!r}; available: {sorted(k for k in files if k != TICKS)}")
+    return open_ipc(pathlib.Path(files[frame]))
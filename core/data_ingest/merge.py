@@ -0,0 +1,137 @@
+from __future__ import annotations
+import glob, pathlib
+from typing import Any, Callable, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+
+from . import errors as E
+from .sources import FORMATS
+
+# Multi-file tick inputs for Module 1: input.path may be a directory, a glob or a
+# list of them. Each list entry is one vendor, in priority order; the files of an
+# entry (per-hour or per-day files) are taken in name order and all files are
+# merged by ts_ns in a streaming k-way merge. A file is only opened once the merge
+# reaches the first ts_ns of its head, so a directory of hourly or daily files
+# holds a few of them in memory, not all.
+
+INPUT_SUFFIXES = {".csv", *FORMATS}
+# rows read to find where a file starts; a file must not go back before them
+PEEK_ROWS = 4096
+
+# name, first ts_ns (None for an empty head), and a function opening the stream
+Source = Tuple[str, "int | None", Callable[[], Iterator[pd.DataFrame]]]
+
+def _has_magic(s: str) -> bool:
+    return any(c in s for c in "*?[")
+
+def is_multi(spec: Any) -> bool:
+    return isinstance(spec, (list, tuple)) or _has_magic(str(spec)) or pathlib.Path(spec).is_dir()
+
+def expand_inputs(spec: Any) -> List[Tuple[int, pathlib.Path]]:
+    # (vendor, path) per input file; vendor 0 is the preferred one
+    out = []
+    for vendor, entry in enumerate(spec if isinstance(spec, (list, tuple)) else [spec]):
+        p = pathlib.Path(entry)
+        if p.is_dir():
+            files = sorted(f for f in p.iterdir() if f.is_file() and f.suffix.lower() in INPUT_SUFFIXES)
+        elif _has_magic(str(entry)):
+            files = sorted(pathlib.Path(f) for f in glob.glob(str(entry), recursive=True) if pathlib.Path(f).is_file())
+        else:
+            files = [p]
+        out.extend((vendor, f) for f in files)
+    return out
+
+def dedupe_sorted(df: pd.DataFrame) -> pd.DataFrame:
+    # keep-first dedupe on (ts_ns, bid, ask) of ts_ns-sorted ticks; duplicates share
+    # ts_ns, so only the runs of equal ts_ns are hashed
+    ts = df["ts_ns"].to_numpy()
+    eq = ts[1:] == ts[:-1]
+    if not eq.any():
+        return df
+    run = np.zeros(len(ts), dtype=bool)
+    run[1:] = eq
+    run[:-1] |= eq
+    idx = np.flatnonzero(run)
+    dup = df.iloc[idx].duplicated(subset=["ts_ns","bid","ask"], keep="first").to_numpy()
+    if not dup.any():
+        return df
+    keep = np.ones(len(ts), dtype=bool)
+    keep[idx[dup]] = False
+    return df[keep]
+
+def _merge(parts: List[pd.DataFrame], vendors: List[np.ndarray]) -> pd.DataFrame:
+    # parts come in (vendor, file name) order, so a stable sort by ts_ns puts the
+    # preferred vendor first among equal timestamps
+    if len(parts) == 1:
+        return parts[0].reset_index(drop=True)
+    df = pd.concat(parts, ignore_index=True)
+    order = np.argsort(df["ts_ns"].to_numpy(), kind="stable")
+    df, v = df.iloc[order], np.concatenate(vendors)[order]
+    ts = df["ts_ns"].to_numpy()
+    # a ts_ns reported by several vendors keeps only the preferred vendor's ticks
+    head = np.ones(len(ts), dtype=bool)
+    head[1:] = ts[1:] != ts[:-1]
+    best = v[head][np.cumsum(head) - 1]
+    return dedupe_sorted(df[v == best]).reset_index(drop=True)
+
+def kway_merge(sources: List[Source], vendors: List[int]) -> Iterator[pd.DataFrame]:
+    # sources open into the normalized, ts_ns-sorted chunks of one file each. A
+    # merged chunk ends before the smallest last buffered ts_ns of the open,
+    # unfinished files, so all ticks with the same ts_ns meet in one chunk; a file
+    # is opened before a chunk would reach its first ts_ns.
+    k = len(sources)
+    streams: List[Iterator[pd.DataFrame] | None] = [None] * k
+    bufs: List[pd.DataFrame | None] = [None] * k
+    last: List[int | None] = [None] * k
+    live = [True] * k
+    queue = sorted(range(k), key=lambda i: (sources[i][1] is not None, sources[i][1] or 0, i))
+    done = None   # every tick before this ts_ns has been yielded
+
+    def pull(i: int):
+        while live[i]:
+            try:
+                df = next(streams[i])
+            except StopIteration:
+                live[i] = False
+                streams[i] = None
+                return
+            if not len(df):
+                continue
+            ts = df["ts_ns"].to_numpy()
+            if last[i] is not None and ts[0] < last[i]:
+                raise ValueError(f"{E.UNSORTED_INPUT}: chunk starts at {int(ts[0])} before {last[i]}")
+            if last[i] is None and done is not None and ts[0] < done:
+                raise ValueError(f"{E.UNSORTED_INPUT}: {sources[i][0]} has a tick at {int(ts[0])}, before "
+                                 f"its first {PEEK_ROWS} rows and ticks of other files already merged up to {done}")
+            bufs[i] = df if bufs[i] is None or not len(bufs[i]) else pd.concat([bufs[i], df])
+            last[i] = int(ts[-1])
+            return
+
+    def tails() -> List[int]:
+        return [last[i] for i in range(k) if live[i] and streams[i] is not None]
+
+    while True:
+        # open the files the merge has reached
+        while queue and (not tails() or sources[queue[0]][1] is None or sources[queue[0]][1] <= min(tails())):
+            i = queue.pop(0)
+            streams[i] = sources[i][2]()
+            pull(i)
+        open_tails = tails()
+        bound = min(open_tails) if open_tails else None
+        parts, vend = [], []
+        for i in range(k):
+            b = bufs[i]
+            if b is None or not len(b):
+                continue
+            n = len(b) if bound is None else int(np.searchsorted(b["ts_ns"].to_numpy(), bound, side="left"))
+            if n:
+                parts.append(b.iloc[:n]); vend.append(np.full(n, vendors[i]))
+                bufs[i] = b.iloc[n:]
+        if parts:
+            yield _merge(parts, vend)
+        if bound is None:
+            return
+        done = bound
+        for i in range(k):
+            if live[i] and streams[i] is not None and last[i] == bound:
+                pull(i)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+from typing import Any, Dict, Tuple
+import numpy as np
+import pandas as pd
+
+from .schema import QUARANTINE_COLUMNS
+
+# Tick outlier filter for Module 1 (outlier_zscore). The mid log-return of a tick
+# against the last accepted tick and its spread get a robust z-score,
+# (x - median) / (1.4826 * MAD), against the previous block of BLOCK accepted
+# ticks; while the first block fills, the accepted ticks so far are the
+# reference, refreshed each time their count doubles from MIN_HISTORY. The work
+# per tick is O(1) amortized, and references only depend on the accepted ticks,
+# so the result is the same for any chunking and an append run can rebuild them
+# from raw_norm.
+#
+# Returns are scored against an anchor, the last accepted mid, so a run of bad
+# prints cannot drag the reference along. Two things move the anchor past
+# rejected ticks, so a real level shift is not quarantined for good: a tick more
+# than REANCHOR_GAP_NS after the previous one (a weekend reopen or a feed outage)
+# has no return score, and after REANCHOR_RUN return rejects in a row on the same
+# side the last of them becomes the anchor. Both only depend on the ticks seen
+# so far, and the anchor state goes into the manifest for append runs.
+
+BLOCK = 1024
+MIN_HISTORY = 32
+MAD_SCALE = 1.4826
+MEAN_AD_SCALE = 1.2533      # fallback when more than half of the deviations are 0
+# of the median spread: on a feed with a fixed spread MAD and mean deviation are 0
+# or near it, and a spread is only flagged above (1 + k * floor) times the median,
+# 7x at k = 12, so the occasional legitimate widening is kept
+SPREAD_SCALE_FLOOR = 0.5
+BULK_BLOCKS = 16            # blocks scored at once while no tick is flagged
+REANCHOR_GAP_NS = 10 * 60 * 1_000_000_000
+REANCHOR_RUN = 8
+REASONS = {1: "return", 2: "spread", 3: "return+spread"}
+
+Reference = Tuple[float, float]   # median, scale
+
+def _references(x: np.ndarray, floor: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    # median and robust scale of every row
+    med = np.median(x, axis=1)
+    dev = np.abs(x - med[:, None])
+    scale = np.maximum(np.maximum(MAD_SCALE * np.median(dev, axis=1), MEAN_AD_SCALE * dev.mean(axis=1)),
+                       floor * np.abs(med))
+    return med, scale
+
+def _reference(x: np.ndarray, floor: float = 0.0) -> Reference:
+    med, scale = _references(x[None, :], floor)
+    return float(med[0]), float(scale[0])
+
+def _z(x: np.ndarray, ref: Reference | None) -> np.ndarray:
+    # 0 without a reference or where the reference has no spread
+    if ref is None:
+        return np.zeros(len(x))
+    med, scale = ref
+    return np.divide(x - med, scale, out=np.zeros(len(x)), where=np.asarray(scale) > 0)
+
+def _returns(mid: np.ndarray, prev: float | None) -> np.ndarray:
+    if prev is None:
+        return np.log(mid[1:] / mid[:-1])
+    return np.log(mid / np.concatenate([[prev], mid[:-1]]))
+
+class OutlierFilter:
+    def __init__(self, zscore: float):
+        self.k = float(zscore)
+        self.ref: Tuple[Reference, Reference] | None = None   # returns, spreads of the previous block
+        self._mid, self._spread = [], []   # accepted ticks of the current block
+        self._n = 0
+        self._block_prev = None            # last accepted mid before the current block
+        self._filled = False               # the first block is complete
+        self.last_mid = None               # anchor of the next return
+        self.last_ns = None                # ts_ns of the last tick pushed
+        self.run, self.side = 0, 0         # same-side return rejects in a row
+        self.counts = {"n_rejected": 0, "n_return": 0, "n_spread": 0}
+
+    def _current(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.concatenate(self._mid) if self._mid else np.empty(0),
+                np.concatenate(self._spread) if self._spread else np.empty(0))
+
+    def _next_refresh(self) -> int:
+        # accepted ticks in the current block at which the reference changes next
+        if self._filled:
+            return BLOCK
+        n = MIN_HISTORY
+        while n <= self._n:
+            n *= 2
+        return min(n, BLOCK)
+
+    def _accept(self, mid: np.ndarray, spread: np.ndarray):
+        if len(mid):
+            self._mid.append(mid); self._spread.append(spread)
+            self._n += len(mid)
+        if self._n == BLOCK or (not self._filled and self._n >= MIN_HISTORY and self._n & (self._n - 1) == 0):
+            m, s = self._current()
+            self._mid, self._spread = [m], [s]
+            self.ref = (_reference(_returns(m, self._block_prev)), _reference(s, SPREAD_SCALE_FLOOR))
+        if self._n == BLOCK:
+            self._block_prev = float(m[-1])
+            self._mid, self._spread, self._n = [], [], 0
+            self._filled = True
+
+    def _accept_all(self, mid: np.ndarray, spread: np.ndarray):
+        # accepted ticks split at the reference refreshes
+        pos = 0
+        while pos < len(mid):
+            end = pos + self._next_refresh() - self._n
+            self._accept(mid[pos:end], spread[pos:end])
+            pos = end
+
+    def _gaps(self, ts: np.ndarray) -> np.ndarray:
+        # ticks too long after the previous one to score their return
+        prev = np.concatenate([[ts[0] if self.last_ns is None else self.last_ns], ts[:-1]])
+        return ts - prev > REANCHOR_GAP_NS
+
+    def _piece(self, mid: np.ndarray, spread: np.ndarray, ts: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # ticks under one reference: keep mask, reason codes and the larger |z|
+        ref_r, ref_s = self.ref if self.ref is not None else (None, None)
+        if self.last_mid is None:
+            r = np.concatenate([[np.nan], _returns(mid, None)])
+        else:
+            r = _returns(mid, self.last_mid)
+        gap = self._gaps(ts)
+        z_r, z_s = np.abs(_z(r, ref_r)), np.abs(_z(spread, ref_s))
+        z_r[gap] = 0.0
+        bad_s = z_s > self.k
+        keep = ~bad_s
+        reason = np.where(bad_s, 2, 0).astype("int8")
+        # a tick after a rejected one is scored against the anchor, so only
+        # flagged ticks and their successors need the sequential pass
+        cand = np.flatnonzero((z_r > self.k) | bad_s)
+        anchor, run, side = self.last_mid, self.run, self.side
+        ptr, forced = 0, None
+        while True:
+            if forced is not None:
+                i, forced = forced, None
+                if ptr < len(cand) and cand[ptr] == i:
+                    ptr += 1
+            elif ptr < len(cand):
+                i = int(cand[ptr]); ptr += 1
+            else:
+                break
+            if i > 0 and keep[i-1]:
+                anchor, run = float(mid[i-1]), 0
+            prev = None if gap[i] else anchor
+            z_r[i] = abs(_z(np.log(mid[i:i+1] / prev), ref_r)[0]) if prev is not None else 0.0
+            bad_r = z_r[i] > self.k
+            if bad_r or bad_s[i]:
+                keep[i] = False
+                reason[i] |= 1 if bad_r else 0
+                anchor = prev
+                if bad_r:
+                    s = 1 if mid[i] > prev else -1
+                    run, side = (run + 1 if s == side else 1), s
+                    if run >= REANCHOR_RUN:
+                        anchor, run = float(mid[i]), 0
+                else:
+                    run = 0
+                if i + 1 < len(mid):
+                    forced = i + 1
+            else:
+                keep[i] = True
+        if keep[-1]:
+            anchor, run = float(mid[-1]), 0
+        self.last_mid, self.run, self.side = anchor, run, side
+        self.last_ns = int(ts[-1])
+        return keep, reason, np.maximum(np.nan_to_num(z_r), z_s)
+
+    def _bulk(self, mid: np.ndarray, spread: np.ndarray, ts: np.ndarray) -> int:
+        # the rest of the current block (block 0) and up to BULK_BLOCKS whole blocks
+        # after it, scored at once; accepts the blocks before the first flagged tick
+        # and returns their length
+        first = BLOCK - self._n
+        nb = min((len(mid) - first) // BLOCK, BULK_BLOCKS)
+        if not self._filled or nb < 1:
+            return 0
+        m = first + nb * BLOCK
+        r = _returns(mid[:m], self.last_mid)
+        cur_m, cur_s = self._current()
+        # block 0 completes the current one; block j > 0 is scored against block j - 1
+        block0 = np.concatenate([cur_m, mid[:first]])
+        r0 = _reference(_returns(block0, self._block_prev))
+        s0 = _reference(np.concatenate([cur_s, spread[:first]]), SPREAD_SCALE_FLOOR)
+        rm, rs = _references(r[first:].reshape(nb, BLOCK))
+        sm, ss = _references(spread[first:m].reshape(nb, BLOCK), SPREAD_SCALE_FLOOR)
+        (ref_r, ref_s), reps = self.ref, [first] + [BLOCK] * nb
+        z_r = _z(r, (np.repeat([ref_r[0], r0[0], *rm[:-1]], reps), np.repeat([ref_r[1], r0[1], *rs[:-1]], reps)))
+        z_r[self._gaps(ts[:m])] = 0.0
+        z_s = _z(spread[:m], (np.repeat([ref_s[0], s0[0], *sm[:-1]], reps), np.repeat([ref_s[1], s0[1], *ss[:-1]], reps)))
+        flagged = np.flatnonzero((np.abs(z_r) > self.k) | (np.abs(z_s) > self.k))
+        if len(flagged) and flagged[0] < first:
+            return 0
+        # whole blocks after block 0 that end before the first flagged tick
+        done = nb if not len(flagged) else int(flagged[0] - first) // BLOCK
+        self._accept(mid[:first], spread[:first])
+        n = first + done * BLOCK
+        if done:
+            self.ref = ((float(rm[done - 1]), float(rs[done - 1])), (float(sm[done - 1]), float(ss[done - 1])))
+            self._block_prev = float(mid[n - 1])
+        self.last_mid, self.last_ns, self.run = float(mid[n - 1]), int(ts[n - 1]), 0
+        return n
+
+    def push(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        # accepted ticks and the QUARANTINE_COLUMNS rows of the rejected ones
+        bid, ask = df["bid"].to_numpy(dtype="float64"), df["ask"].to_numpy(dtype="float64")
+        mid, spread = (bid + ask) / 2.0, ask - bid
+        ts = df["ts_ns"].to_numpy(dtype="int64")
+        keep = np.ones(len(df), dtype=bool)
+        reason = np.zeros(len(df), dtype="int8")
+        z = np.zeros(len(df))
+        pos = 0
+        while pos < len(df):
+            pos += self._bulk(mid[pos:], spread[pos:], ts[pos:])
+            if pos == len(df):
+                break
+            # up to the next reference refresh
+            end = min(len(df), pos + self._next_refresh() - self._n)
+            k, reason[pos:end], z[pos:end] = self._piece(mid[pos:end], spread[pos:end], ts[pos:end])
+            keep[pos:end] = k
+            self._accept(mid[pos:end][k], spread[pos:end][k])
+            pos = end
+        rejected = ~keep
+        if rejected.any():
+            self.counts["n_rejected"] += int(rejected.sum())
+            self.counts["n_return"] += int((reason & 1 > 0).sum())
+            self.counts["n_spread"] += int((reason & 2 > 0).sum())
+        out = df.loc[rejected, ["ts_ns", "bid", "ask"]].reset_index(drop=True)
+        out["reason"] = [REASONS[r] for r in reason[rejected].tolist()]
+        out["z"] = z[rejected]
+        return (df if keep.all() else df.loc[keep]), out[QUARANTINE_COLUMNS]
+
+    def state(self) -> Dict[str, Any]:
+        # the anchor of the next return, for an append run
+        return {"anchor": self.last_mid, "last_ns": self.last_ns, "run": self.run, "side": self.side}
+
+    def restore(self, ticks: pd.DataFrame, n_rows: int, counts: Dict[str, int], state: Dict[str, Any] | None = None):
+        # ticks: the raw_norm rows from BLOCK + 1 before the current block start on;
+        # state: state() of the previous run, if it has one
+        start = n_rows // BLOCK * BLOCK
+        mid = ((ticks["bid"] + ticks["ask"]) / 2.0).to_numpy(dtype="float64")
+        spread = (ticks["ask"] - ticks["bid"]).to_numpy(dtype="float64")
+        ids = ticks.index.to_numpy()
+        if start >= BLOCK:
+            blk = (ids >= start - BLOCK) & (ids < start)
+            prev = mid[ids == start - BLOCK - 1]
+            self._block_prev = float(prev[0]) if len(prev) else None
+            self._accept_all(mid[blk], spread[blk])
+        cur = ids >= start
+        self._accept_all(mid[cur], spread[cur])
+        if state is not None:
+            self.last_mid, self.last_ns = state["anchor"], state["last_ns"]
+            self.run, self.side = state["run"], state["side"]
+        elif len(mid):
+            self.last_mid, self.last_ns = float(mid[-1]), int(ticks["ts_ns"].iloc[-1])
+        self.counts = dict(counts)
+
+    def first_row(self, n_rows: int) -> int:
+        # first raw_norm row restore() needs
+        return max(0, n_rows // BLOCK * BLOCK - BLOCK - 1)
@@ -0,0 +1,89 @@
+from __future__ import annotations
+import json, pathlib
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .sources import as_frame, read_csv_table
+
+# Day partitions of a time-ordered tick CSV: newline-aligned byte ranges that
+# start where the date prefix of the leading timestamp column changes. The index
+# is kept in a sidecar file next to the CSV and reused while the CSV is unchanged.
+
+INDEX_SUFFIX = ".days.json"
+SCAN_BLOCK = 64 << 20
+
+def _scan(path: pathlib.Path) -> Dict[str, Any] | None:
+    # one pass over the file: start offsets and "YYYY-MM-DD" prefixes of the lines
+    # where the date changes; None if the layout does not allow partitioning
+    offsets: List[int] = []
+    prefixes: List[bytes] = []
+    with path.open("rb") as f:
+        header = f.readline()
+        if header.split(b",")[0].strip() != b"timestamp":
+            return None
+        pos, buf, last = len(header), b"", None
+        while True:
+            block = f.read(SCAN_BLOCK)
+            eof = not block
+            buf += block
+            if not buf:
+                break
+            a = np.frombuffer(buf, dtype="uint8")
+            nl = np.flatnonzero(a == 10)
+            ends = np.append(nl, len(a)) if eof and (not len(nl) or nl[-1] != len(a) - 1) else nl
+            if len(ends):
+                starts = np.concatenate([[0], ends[:-1] + 1])
+                full = (ends - starts) >= 10      # blank and short lines do not start a day
+                s = starts[full]
+                pre = a[s[:, None] + np.arange(10)].copy().view("S10").ravel()
+                change = np.ones(len(pre), dtype=bool)
+                change[1:] = pre[1:] != pre[:-1]
+                if len(pre) and last is not None:
+                    change[0] = pre[0] != last
+                offsets.extend((pos + s[change]).tolist())
+                prefixes.extend(pre[change].tolist())
+                if len(pre):
+                    last = pre[-1]
+                cut = int(ends[-1]) + 1
+                pos += cut
+                buf = buf[cut:]
+            if eof:
+                break
+        size = f.tell()
+    try:
+        days = np.array([p.decode("ascii") for p in prefixes], dtype="datetime64[D]").astype("int64")
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if (np.diff(days) <= 0).any():
+        return None   # not ordered by day
+    bounds = offsets[1:] + [size]
+    if offsets:
+        offsets[0] = len(header)   # leading blank lines belong to the first day
+    return {"header": header.decode("utf-8"),
+            "days": [[int(d), int(s), int(e)] for d, s, e in zip(days, offsets, bounds)]}
+
+def day_index(path: pathlib.Path) -> Dict[str, Any] | None:
+    # the sidecar index of path, scanned on first use and whenever the file changed
+    st = path.stat()
+    sig = [st.st_size, st.st_mtime_ns]
+    sidecar = path.with_name(path.name + INDEX_SUFFIX)
+    if sidecar.exists():
+        index = json.loads(sidecar.read_text(encoding="utf-8"))
+        if index.get("sig") == sig:
+            return index if index.get("days") is not None else None
+    index = _scan(path) or {"days": None}
+    index["sig"] = sig
+    try:
+        sidecar.write_text(json.dumps(index), encoding="utf-8")
+    except OSError:
+        pass   # read-only input directory: scan again next time
+    return index if index["days"] is not None else None
+
+def read_range(path: pathlib.Path, header: str, start: int, end: int) -> pd.DataFrame:
+    # the CSV rows in bytes [start, end) under the file's header line
+    with path.open("rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return as_frame(read_csv_table(pa.BufferReader(header.encode("utf-8") + data)))
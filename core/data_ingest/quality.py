@@ -0,0 +1,150 @@
+from __future__ import annotations
+import math, pathlib
+from typing import Dict, Any, List, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Mergeable quality statistics for Module 1. Spread count/mean/variance are
+# Welford moments combined per BLOCK ticks of the stream, so they do not depend
+# on how the stream was chunked; spread quantiles come from a log-bucket sketch
+# with relative error SKETCH_ALPHA, kept per UTC hour so it also gives hourly
+# tick rates. Sketches merge by adding counts, moments by Chan's formula.
+
+HOUR_NS = 3_600_000_000_000
+SKETCH_ALPHA = 0.001
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+SKETCH_COLUMNS = ["hour_ns", "bucket", "count"]
+
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_BUCKET_BITS = 20
+_BUCKET_OFFSET = 1 << (_BUCKET_BITS - 1)
+_ZERO = -_BUCKET_OFFSET   # bucket of zero spreads
+
+Moments = Tuple[int, float, float]   # n, mean, sum of squared deviations
+
+def _moments(x: np.ndarray) -> Moments:
+    if not len(x):
+        return 0, 0.0, 0.0
+    mean = float(x.mean())
+    return len(x), mean, float(((x - mean) ** 2).sum())
+
+def _combine(a: Moments, b: Moments) -> Moments:
+    na, ma, qa = a
+    nb, mb, qb = b
+    if not na or not nb:
+        return a if na else b
+    n = na + nb
+    d = mb - ma
+    return n, ma + d * nb / n, qa + qb + d * d * na * nb / n
+
+def _buckets(spread: np.ndarray) -> np.ndarray:
+    # k with gamma**(k-1) < spread <= gamma**k; spreads are >= 0
+    k = np.full(len(spread), _ZERO, dtype="int64")
+    pos = spread > 0
+    k[pos] = np.ceil(np.log(spread[pos]) / math.log(_GAMMA)).astype("int64")
+    return k
+
+def _value(bucket: np.ndarray) -> np.ndarray:
+    # the bucket's representative, within SKETCH_ALPHA of every spread in it
+    return np.where(bucket == _ZERO, 0.0, 2 * _GAMMA ** bucket.astype("float64") / (_GAMMA + 1))
+
+def _quantiles(bucket: np.ndarray, count: np.ndarray) -> Dict[str, float]:
+    # bucket ascending; lower quantile at rank q * (n - 1)
+    cum = np.cumsum(count)
+    idx = np.searchsorted(cum, [q * (cum[-1] - 1) for q in QUANTILES.values()], side="right")
+    return dict(zip(QUANTILES, _value(bucket[idx]).tolist()))
+
+class QualityStats:
+    BLOCK = 1 << 16
+
+    def __init__(self):
+        self.moments: Moments = (0, 0.0, 0.0)   # of the full blocks
+        self.min, self.max = math.inf, -math.inf
+        self.sketch: Dict[int, int] = {}         # hour << _BUCKET_BITS | bucket + offset -> count
+        self._pending: List[np.ndarray] = []
+        self._n_pending = 0
+
+    @property
+    def n(self) -> int:
+        return self.moments[0] + self._n_pending
+
+    def push(self, ts_ns: np.ndarray, spread: np.ndarray):
+        self.add_moments(spread)
+        if not len(spread):
+            return
+        self.min = min(self.min, float(spread.min()))
+        self.max = max(self.max, float(spread.max()))
+        keys = (ts_ns // HOUR_NS) << _BUCKET_BITS | (_buckets(spread) + _BUCKET_OFFSET)
+        keys, counts = np.unique(keys, return_counts=True)
+        for k, c in zip(keys.tolist(), counts.tolist()):
+            self.sketch[k] = self.sketch.get(k, 0) + c
+
+    def add_moments(self, spread: np.ndarray):
+        # full blocks are folded in stream order, the rest waits for the next push
+        self._pending.append(np.asarray(spread, dtype="float64"))
+        self._n_pending += len(spread)
+        if self._n_pending < self.BLOCK:
+            return
+        buf = np.concatenate(self._pending)
+        k = len(buf) // self.BLOCK * self.BLOCK
+        for off in range(0, k, self.BLOCK):
+            self.moments = _combine(self.moments, _moments(buf[off:off + self.BLOCK]))
+        self._pending, self._n_pending = [buf[k:]], len(buf) - k
+
+    def _total(self) -> Moments:
+        return _combine(self.moments, _moments(np.concatenate(self._pending) if self._pending else np.empty(0)))
+
+    def merge(self, other: QualityStats):
+        # other holds the ticks that follow this state's ticks
+        self.moments = _combine(self._total(), other._total())
+        self._pending, self._n_pending = [], 0
+        self.min, self.max = min(self.min, other.min), max(self.max, other.max)
+        for k, c in other.sketch.items():
+            self.sketch[k] = self.sketch.get(k, 0) + c
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        keys = np.array(sorted(self.sketch), dtype="int64")
+        counts = np.array([self.sketch[k] for k in keys.tolist()], dtype="int64")
+        return keys >> _BUCKET_BITS, (keys & ((1 << _BUCKET_BITS) - 1)) - _BUCKET_OFFSET, counts
+
+    def result(self) -> Tuple[Dict[str, float], List[Dict[str, Any]]]:
+        # spread_stats and the hourly rows of the quality report
+        n, mean, m2 = self._total()
+        if n == 0:
+            return {"n": 0, "mean": float("nan"), "std": float("nan"), "min": float("nan"), "max": float("nan"),
+                    **{q: float("nan") for q in QUANTILES}}, []
+        hour, bucket, count = self._arrays()
+        order = np.argsort(bucket, kind="stable")
+        buckets, first = np.unique(bucket[order], return_index=True)
+        overall = _quantiles(buckets, np.add.reduceat(count[order], first))
+        stats = {"n": n, "mean": mean, "std": math.sqrt(m2 / (n - 1)) if n > 1 else 0.0,
+                 "min": self.min, "max": self.max,
+                 **{q: min(max(v, self.min), self.max) for q, v in overall.items()}}
+        hourly = []
+        bounds = np.flatnonzero(np.diff(hour)) + 1
+        for h, b, c in zip(np.split(hour, bounds), np.split(bucket, bounds), np.split(count, bounds)):
+            q = _quantiles(b, c)
+            n_h = int(c.sum())
+            hourly.append({"hour": np.datetime_as_string(np.datetime64(int(h[0]) * HOUR_NS, "ns"), unit="h") + "Z",
+                           "n_ticks": n_h, "ticks_per_min": n_h / 60.0,
+                           "spread_p50": q["p50"], "spread_p95": q["p95"]})
+        return stats, hourly
+
+    def state(self) -> Dict[str, Any]:
+        # the full-block part; the pending ticks are re-read from raw_norm on append
+        n, mean, m2 = self.moments
+        return {"n_blocked": n, "mean": mean, "m2": m2,
+                "min": self.min if self.n else None, "max": self.max if self.n else None}
+
+    def restore(self, state: Dict[str, Any], sketch_path: pathlib.Path):
+        self.moments = (state["n_blocked"], state["mean"], state["m2"])
+        if state["min"] is not None:
+            self.min, self.max = state["min"], state["max"]
+        t = pq.read_table(sketch_path)
+        keys = t.column("hour_ns").to_numpy() // HOUR_NS << _BUCKET_BITS | (t.column("bucket").to_numpy() + _BUCKET_OFFSET)
+        self.sketch = dict(zip(keys.tolist(), t.column("count").to_numpy().tolist()))
+
+    def write_sketch(self, path: pathlib.Path):
+        hour, bucket, count = self._arrays()
+        pq.write_table(pa.table({"hour_ns": hour * HOUR_NS, "bucket": bucket, "count": count}), path)
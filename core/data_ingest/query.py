@@ -0,0 +1,204 @@
+from __future__ import annotations
+import json, os, pathlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import errors as E
+from .compact import COMPACT_COLUMNS, decode_table
+from .schema import BAR_COLUMNS
+from .store import parts
+
+# Time-range reads over ingest runs. An output's row groups are indexed once by
+# the min/max statistics of its sorted key (ts_ns for ticks, t_open_ns for bars);
+# a query binary-searches that index for the row groups overlapping [t0, t1),
+# decodes only those and cuts them with a binary search on the key. Decoded row
+# groups stay in an LRU of CACHE_BYTES, so repeated or nearby queries skip the
+# Parquet decode. Both are keyed by file mtime and size, so outputs rewritten by
+# an append run are re-read. The runs below a root are indexed once as well; a
+# later lookup only stats the directories and manifests it saw, and rescans (re-
+# parsing only changed manifests) when one of them changed. A run's own out_dir
+# can be passed as the root to skip the scan altogether.
+
+CACHE_BYTES = 256 << 20
+TICK_COLUMNS = ["ts_ns", "bid", "ask"]
+
+class _RowGroupCache:
+    # decoded row groups by (file, mtime_ns, row group, columns), least recently used first
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._tables: OrderedDict[Tuple, pa.Table] = OrderedDict()
+
+    def get(self, key: Tuple) -> pa.Table | None:
+        t = self._tables.get(key)
+        if t is not None:
+            self._tables.move_to_end(key)
+        return t
+
+    def put(self, key: Tuple, table: pa.Table):
+        self._tables[key] = table
+        self.nbytes += table.nbytes
+        while self.nbytes > self.max_bytes and len(self._tables) > 1:
+            _, old = self._tables.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def clear(self):
+        self._tables.clear()
+        self.nbytes = 0
+
+_cache = _RowGroupCache(CACHE_BYTES)
+# output path → (file signature, row group index)
+_indexes: Dict[str, Tuple[Tuple, Dict[str, np.ndarray]]] = {}
+# root → (directory signatures, manifest path → (file signature, manifest))
+_runs: Dict[str, Tuple[Dict[str, int], Dict[str, Tuple[Tuple, Dict[str, Any]]]]] = {}
+
+def clear_cache():
+    _cache.clear()
+    _indexes.clear()
+    _runs.clear()
+
+def to_ns(t) -> int | None:
+    # epoch ns from an int, a datetime or an ISO string; naive times are UTC
+    if t is None or isinstance(t, (int, np.integer)):
+        return None if t is None else int(t)
+    ts = pd.Timestamp(t)
+    return (ts.tz_localize("UTC") if ts.tzinfo is None else ts).value
+
+def _sig(p: str) -> Tuple[int, int] | None:
+    try:
+        st = os.stat(p)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _manifests(root: pathlib.Path) -> Dict[str, Tuple[Tuple, Dict[str, Any]]]:
+    # manifest path → (signature, manifest) of root itself or every run below it
+    # (cache entries in hidden directories are skipped), from the index while it
+    # is current
+    hit = _runs.get(str(root))
+    if hit is not None:
+        dirs, manifests = hit
+        if all(_sig(d) == sig for d, sig in dirs.items()) and all(_sig(p) == sig for p, (sig, _) in manifests.items()):
+            return manifests
+    old = hit[1] if hit is not None else {}
+    dirs, manifests = {}, {}
+    # a run's own out_dir is not walked
+    walk = [(str(root), [], ["manifest.json"])] if (root / "manifest.json").exists() else os.walk(root)
+    for d, subdirs, files in walk:
+        subdirs[:] = [s for s in subdirs if not s.startswith(".")]
+        dirs[d] = _sig(d)
+        if "manifest.json" not in files:
+            continue
+        p = os.path.join(d, "manifest.json")
+        sig = _sig(p)
+        if p in old and old[p][0] == sig:
+            manifests[p] = old[p]
+        elif sig is not None:
+            manifests[p] = (sig, json.loads(pathlib.Path(p).read_text(encoding="utf-8")))
+    _runs[str(root)] = (dirs, manifests)
+    return manifests
+
+def find_run(symbol: str, root: str | pathlib.Path = "./runs/") -> Tuple[pathlib.Path, Dict[str, Any]]:
+    # directory and manifest of the latest ingest run of symbol: root itself or any
+    # run below it
+    root = pathlib.Path(root)
+    found = []
+    for p, (_, manifest) in _manifests(root).items():
+        if manifest.get("module") == "data_ingest" and manifest.get("symbol") == symbol:
+            found.append((manifest.get("run_ts", ""), str(pathlib.Path(p).parent), manifest))
+    if not found:
+        raise RuntimeError(f"{E.IO_ERROR}: no ingest run for {symbol} under {root}")
+    run_ts, out_dir, manifest = max(found, key=lambda f: f[:2])
+    return pathlib.Path(out_dir), manifest
+
+def _index(path: pathlib.Path, key: str) -> Tuple[List[Tuple[str, int]], Dict[str, np.ndarray]]:
+    # per row group: file, row group number, first row position, key min/max
+    files = parts(path)
+    sig = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in files)
+    hit = _indexes.get(str(path))
+    if hit is not None and hit[0] == sig:
+        return [s[:2] for s in sig], hit[1]
+    cols = {"file": [], "rg": [], "offset": [], "min": [], "max": []}
+    pos = 0
+    for i, p in enumerate(files):
+        meta = pq.ParquetFile(p).metadata
+        j = meta.schema.to_arrow_schema().get_field_index(key)
+        for rg in range(meta.num_row_groups):
+            g = meta.row_group(rg)
+            stats = g.column(j).statistics
+            lo, hi = (stats.min, stats.max) if stats is not None and stats.has_min_max else (None, None)
+            if lo is None:
+                # no statistics: the key column of this row group is read once
+                k = pq.ParquetFile(p).read_row_group(rg, columns=[key]).column(0)
+                lo, hi = (k[0].as_py(), k[-1].as_py()) if len(k) else (0, -1)
+            cols["file"].append(i); cols["rg"].append(rg); cols["offset"].append(pos)
+            cols["min"].append(lo); cols["max"].append(hi)
+            pos += g.num_rows
+    index = {k: np.asarray(v, dtype="int64") for k, v in cols.items()}
+    _indexes[str(path)] = (sig, index)
+    return [s[:2] for s in sig], index
+
+def _row_group(file: Tuple[str, int], rg: int, columns: List[str], decimals: int | None) -> pa.Table:
+    key = (*file, rg, tuple(columns))
+    t = _cache.get(key)
+    if t is None:
+        t = pq.ParquetFile(file[0]).read_row_group(rg, columns=columns).replace_schema_metadata()
+        if decimals is not None:
+            t = decode_table(t, decimals)
+        _cache.put(key, t)
+    return t
+
+def _read_range(path: pathlib.Path, key: str, t0: int | None, t1: int | None, columns: List[str],
+                decimals: int | None = None) -> Tuple[pa.Table | None, int]:
+    # rows with t0 <= key < t1 and the position of the first one
+    files, index = _index(path, key)
+    lo = 0 if t0 is None else int(np.searchsorted(index["max"], t0, "left"))
+    hi = len(index["min"]) if t1 is None else int(np.searchsorted(index["min"], t1, "left"))
+    tables, first = [], None
+    for g in range(lo, hi):
+        t = _row_group(files[index["file"][g]], int(index["rg"][g]), columns, decimals)
+        k = t.column(key).to_numpy()
+        a = 0 if t0 is None else int(np.searchsorted(k, t0, "left"))
+        b = len(k) if t1 is None else int(np.searchsorted(k, t1, "left"))
+        if b > a:
+            if first is None:
+                first = int(index["offset"][g]) + a
+            tables.append(t.slice(a, b - a))
+    return (pa.concat_tables(tables) if tables else None), (first or 0)
+
+def load_ticks(symbol: str, t0=None, t1=None, root: str | pathlib.Path = "./runs/") -> pd.DataFrame:
+    # ticks with t0 <= ts_ns < t1 as ts_ns/bid/ask (and volume) floats; the index
+    # holds the raw_norm row positions the bars' tick ids point to
+    out_dir, manifest = find_run(symbol, root)
+    raw_norm = out_dir / "raw_norm.parquet"
+    extra = ["volume"] if manifest.get("volume") else []
+    compact = manifest.get("raw_schema") == "compact"
+    columns = (COMPACT_COLUMNS if compact else TICK_COLUMNS) + extra
+    t, first = _read_range(raw_norm, "ts_ns", to_ns(t0), to_ns(t1), columns,
+                           manifest.get("price_decimals") if compact else None)
+    if t is None:
+        return pd.DataFrame({c: pd.Series(dtype="int64" if c == "ts_ns" else "float64") for c in TICK_COLUMNS + extra})
+    df = t.select(TICK_COLUMNS + extra).to_pandas()
+    df.index = pd.RangeIndex(first, first + len(df))
+    return df
+
+def load_bars(symbol: str, frame: str, t0=None, t1=None, root: str | pathlib.Path = "./runs/") -> pd.DataFrame:
+    # bars of one frame ("1m", "100t", ...) with t0 <= t_open_ns < t1
+    _, manifest = find_run(symbol, root)
+    outputs = manifest["outputs"]
+    if frame not in outputs:
+        raise ValueError(f"unknown bar frame {frame!r}; available: {sorted(outputs)}")
+    path = pathlib.Path(outputs[frame])
+    # the dataset layout keeps the symbol in the directory names only
+    columns = [c for c in BAR_COLUMNS if c != "symbol"] if manifest.get("layout") == "dataset" else BAR_COLUMNS
+    t, _ = _read_range(path, "t_open_ns", to_ns(t0), to_ns(t1), columns)
+    if t is None:
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    df = t.to_pandas()
+    if "symbol" not in df.columns:
+        df.insert(0, "symbol", symbol)
+    return df[BAR_COLUMNS]
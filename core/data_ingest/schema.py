@@ -6,6 +6,21 @@ TICK_SCHEMA = {
     # optional: "volume": "float64"
 }
 
+# opt-in compact raw_norm layout: prices as int32 points of 10**-price_decimals,
+# no text timestamp, ts_ns delta-encoded on disk (DELTA_BINARY_PACKED)
+TICK_SCHEMA_COMPACT = {
+    "ts_ns": "int64",
+    "bid_pts": "int32",
+    "ask_pts": "int32",
+}
+
+# price decimals per symbol for the compact layout; others use DEFAULT_PRICE_DECIMALS
+PRICE_DECIMALS = {
+    "USDJPY": 3, "EURJPY": 3, "GBPJPY": 3, "AUDJPY": 3, "CADJPY": 3, "CHFJPY": 3, "NZDJPY": 3,
+    "XAUUSD": 2,
+}
+DEFAULT_PRICE_DECIMALS = 5
+
 BAR_COLUMNS = [
     "symbol","frame","t_open_ns","t_close_ns",
     "o","h","l","c",
@@ -14,5 +29,12 @@ BAR_COLUMNS = [
     "tick_first_id","tick_last_id","gap_flag"
 ]
 
+# gaps.parquet: one row per gap longer than max_missing_gap_seconds
+GAP_COLUMNS = ["start_ns","end_ns","seconds"]
+
+# quarantine.parquet: ticks rejected by the outlier filter, reason "return",
+# "spread" or "return+spread", z the larger robust z-score
+QUARANTINE_COLUMNS = ["ts_ns","bid","ask","reason","z"]
+
 SCHEMA_VERSION = "1.0"
 BAR_RULES_ID = "time_1m_linksschliessend_tick_N"
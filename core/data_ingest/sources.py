@@ -0,0 +1,184 @@
+from __future__ import annotations
+import pathlib
+from typing import Dict, Any, Iterator, List, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+
+from . import errors as E
+
+# Binary tick inputs for Module 1: Parquet and Arrow IPC files are read column-
+# projected (time column, bid, ask, optional volume) and, with a time range,
+# row groups / record batches outside it are skipped before they are decoded.
+# CSV inputs are read by Arrow as well; text columns reach pandas as Arrow-backed
+# strings, so no Python str object is created per tick.
+
+FORMATS = {".parquet": "parquet", ".pq": "parquet",
+           ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow", ".arrows": "arrow"}
+TICK_COLUMNS = ["bid", "ask"]
+OPTIONAL_COLUMNS = ["volume"]
+# the timestamp stays text for the ISO parser; Arrow parses floats correctly rounded
+CSV_TYPES = {"timestamp": pa.string(), "bid": pa.float64(), "ask": pa.float64()}
+_TEXT = {pa.string(): pd.ArrowDtype(pa.string()), pa.large_string(): pd.ArrowDtype(pa.large_string())}
+
+def input_format(path: pathlib.Path) -> str:
+    return FORMATS.get(path.suffix.lower(), "csv")
+
+def time_range(config: Dict[str, Any]) -> Tuple[int | None, int | None]:
+    # input.start / input.end as UTC epoch ns, [start, end); naive times are UTC
+    inp = config.get("input") or {}
+    bounds = []
+    for key in ("start", "end"):
+        v = inp.get(key)
+        if v is None:
+            bounds.append(None)
+            continue
+        t = pd.Timestamp(v)
+        bounds.append((t.tz_localize("UTC") if t.tzinfo is None else t).value)
+    return bounds[0], bounds[1]
+
+def _time_column(schema: pa.Schema) -> str:
+    # an int64 ts_ns column or a timestamp-typed column avoids text parsing
+    if "ts_ns" in schema.names and pa.types.is_integer(schema.field("ts_ns").type):
+        return "ts_ns"
+    if "timestamp" in schema.names:
+        return "timestamp"
+    raise ValueError(f"{E.MISSING_COLUMN}: ['timestamp']")
+
+def _projection(schema: pa.Schema) -> List[str]:
+    return [_time_column(schema)] + [c for c in TICK_COLUMNS + OPTIONAL_COLUMNS if c in schema.names]
+
+_UNIT_NS = {"s": 1_000_000_000, "ms": 1_000_000, "us": 1_000, "ns": 1}
+
+def _ns_per_unit(t: pa.DataType) -> int | None:
+    # scale of a typed time column's integer values to ns; None for text
+    if pa.types.is_integer(t):
+        return 1
+    if pa.types.is_timestamp(t):
+        return _UNIT_NS[t.unit]
+    return None
+
+def _as_ns(col: pa.ChunkedArray | pa.Array) -> pa.ChunkedArray | pa.Array | None:
+    # epoch ns of a typed time column; None for text, which goes through the parser
+    if pa.types.is_integer(col.type):
+        return col.cast(pa.int64())
+    if pa.types.is_timestamp(col.type):
+        return col.cast(pa.timestamp("ns", tz=col.type.tz)).cast(pa.int64())
+    return None
+
+def as_frame(table: pa.Table) -> pd.DataFrame:
+    # numeric columns as zero-copy NumPy views where Arrow allows, text as Arrow strings
+    return table.to_pandas(split_blocks=True, types_mapper=_TEXT.get)
+
+def _to_frame(table: pa.Table) -> pd.DataFrame:
+    ts = _as_ns(table.column(0))
+    if ts is not None:
+        table = table.drop_columns([table.column_names[0]]).append_column("ts_ns", ts)
+    return as_frame(table)
+
+def _skip(lo: int | None, hi: int | None, start: int | None, end: int | None) -> bool:
+    if lo is None or hi is None:
+        return False
+    return (start is not None and hi < start) or (end is not None and lo >= end)
+
+def _parquet_tables(path: pathlib.Path, start: int | None, end: int | None) -> Iterator[pa.Table]:
+    pf = pq.ParquetFile(path)
+    cols = _projection(pf.schema_arrow)
+    scale = _ns_per_unit(pf.schema_arrow.field(cols[0]).type)
+    idx = pf.schema_arrow.get_field_index(cols[0])
+    for rg in range(pf.metadata.num_row_groups):
+        # row-group statistics hold the physical integers of the time column
+        stats = pf.metadata.row_group(rg).column(idx).statistics
+        if scale and stats is not None and stats.has_min_max and \
+                _skip(stats.min_raw * scale, stats.max_raw * scale, start, end):
+            continue
+        yield pf.read_row_group(rg, columns=cols)
+
+def _arrow_tables(path: pathlib.Path, start: int | None, end: int | None) -> Iterator[pa.Table]:
+    # memory-mapped, so projected and skipped columns are never read from disk
+    source = pa.memory_map(str(path))
+    try:
+        reader = pa.ipc.open_file(source)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        schema = reader.schema
+    except pa.ArrowInvalid:
+        reader = pa.ipc.open_stream(source)
+        batches, schema = iter(reader), reader.schema
+    cols = _projection(schema)
+    for batch in batches:
+        table = pa.Table.from_batches([batch]).select(cols)
+        ts = _as_ns(table.column(0))
+        if ts is not None and len(ts):
+            mm = pc.min_max(ts)
+            if _skip(mm["min"].as_py(), mm["max"].as_py(), start, end):
+                continue
+        yield table
+
+def read_ticks(path: pathlib.Path, fmt: str, chunk_rows: int | None,
+               start: int | None = None, end: int | None = None) -> Iterator[pd.DataFrame]:
+    # one DataFrame per row group / record batch when streaming, else one for the file
+    tables = _parquet_tables(path, start, end) if fmt == "parquet" else _arrow_tables(path, start, end)
+    if chunk_rows is None:
+        tables = (list(t) for t in [tables])   # the whole file as one chunk
+    while True:
+        try:
+            table = next(tables)
+        except StopIteration:
+            return
+        except (OSError, pa.ArrowException) as e:
+            raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+        if isinstance(table, list):
+            if not table:
+                yield pd.DataFrame({"ts_ns": np.empty(0, "int64"), "bid": np.empty(0), "ask": np.empty(0)})
+                continue
+            table = pa.concat_tables(table)
+        yield _to_frame(table)
+
+def read_csv_table(source) -> pa.Table:
+    # a whole CSV file (path or buffer) as one table
+    return pacsv.read_csv(source, convert_options=pacsv.ConvertOptions(column_types=CSV_TYPES))
+
+def read_csv(path: pathlib.Path, chunk_rows: int | None) -> Iterator[pd.DataFrame]:
+    # the file as one DataFrame, or as chunks of exactly chunk_rows rows (the last
+    # one shorter) cut from Arrow's streaming reader
+    if chunk_rows is None:
+        try:
+            table = read_csv_table(path)
+        except (OSError, pa.ArrowException) as e:
+            raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+        # the parser's block buffers are free now; hand them back before the
+        # pipeline allocates outside the Arrow pool
+        pa.default_memory_pool().release_unused()
+        yield as_frame(table)
+        return
+    for table in csv_tables(path, chunk_rows):
+        yield as_frame(table)
+
+def csv_tables(path: pathlib.Path, chunk_rows: int) -> Iterator[pa.Table]:
+    # chunks of exactly chunk_rows rows as Arrow tables
+    try:
+        reader = pacsv.open_csv(path, convert_options=pacsv.ConvertOptions(column_types=CSV_TYPES))
+    except (OSError, pa.ArrowException) as e:
+        raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+    schema, pending, n, cut = reader.schema, [], 0, False
+    while True:
+        try:
+            batch = reader.read_next_batch()
+        except StopIteration:
+            break
+        except (OSError, pa.ArrowException) as e:
+            raise RuntimeError(f"{E.IO_ERROR}: {e!r}")
+        pending.append(batch); n += len(batch)
+        if n < chunk_rows:
+            continue
+        table = pa.Table.from_batches(pending, schema)
+        for off in range(0, n - chunk_rows + 1, chunk_rows):
+            yield table.slice(off, chunk_rows)
+        cut = True
+        rest = table.slice(n // chunk_rows * chunk_rows)
+        pending, n = rest.to_batches(), len(rest)
+    if n or not cut:
+        yield pa.Table.from_batches(pending, schema)
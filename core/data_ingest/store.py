@@ -0,0 +1,222 @@
+from __future__ import annotations
+import pathlib, shutil
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Parquet output layout for Module 1. A full run writes one file per output;
+# append runs turn an output into a directory of ordered part files. The
+# "dataset" layout writes a hive-partitioned directory (symbol=/date=) instead.
+
+# rows per Parquet row group; fixed so chunked and in-memory runs write identical files
+ROW_GROUP_ROWS = 1 << 20
+# uncompressed width assumed for string columns when row_group_mb is turned into rows
+STRING_BYTES_ESTIMATE = 32
+DAY_NS = 86_400_000_000_000
+LAYOUTS = ("file", "dataset")
+
+def parquet_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    # writer settings from the config's parquet block; without one the fixed defaults apply
+    pq_cfg = config.get("parquet") or {}
+    layout = pq_cfg.get("layout", "file")
+    if layout not in LAYOUTS:
+        raise ValueError(f"unsupported parquet layout: {layout!r}")
+    return {"row_group_mb": pq_cfg.get("row_group_mb"), "compression": pq_cfg.get("compression", "snappy"),
+            "layout": layout}
+
+def _row_width(schema: pa.Schema) -> int:
+    # uncompressed bytes per row, from the column types only so every chunking agrees
+    w = 0
+    for f in schema:
+        try:
+            w += max(1, f.type.bit_width // 8)
+        except ValueError:
+            w += STRING_BYTES_ESTIMATE
+    return w
+
+class ParquetSink:
+    # appends DataFrames to one Parquet file in fixed-size row groups, with column
+    # statistics and the sort order of sort_key recorded in the footer
+    def __init__(self, path: pathlib.Path, columns: List[str], row_group_rows: int = ROW_GROUP_ROWS,
+                 keep_empty: bool = True, row_group_mb: float | None = None, compression: str = "snappy",
+                 sort_key: str | None = None, column_encoding: Dict[str, str] | None = None):
+        self.path = path
+        self.columns = columns
+        self.row_group_rows = row_group_rows
+        self.row_group_mb = row_group_mb
+        self.compression = compression
+        self.sort_key = sort_key
+        self.column_encoding = column_encoding
+        self.keep_empty = keep_empty
+        self.n_rows = 0
+        self._writer = None
+        self._pending: List[pa.Table] = []
+        self._n_pending = 0
+
+    def write(self, df: pd.DataFrame | pa.Table):
+        if not len(df):
+            return
+        # no intermediate frame; without the pandas metadata the file does not depend
+        # on whether the rows arrived as a DataFrame or an Arrow table
+        if isinstance(df, pa.Table):
+            table = df.select(self.columns)
+        else:
+            table = pa.Table.from_pandas(df, columns=self.columns, preserve_index=False).replace_schema_metadata()
+        if self.row_group_mb and not self.n_rows:
+            self.row_group_rows = max(1, int(self.row_group_mb * 1024 * 1024) // _row_width(table.schema))
+        self._pending.append(table)
+        self._n_pending += len(df)
+        self.n_rows += len(df)
+        while self._n_pending >= self.row_group_rows:
+            self._flush(self.row_group_rows)
+
+    def _flush(self, n: int):
+        # one chunk per column: Parquet pages must not follow the stream chunk boundaries
+        table = pa.concat_tables(self._pending).combine_chunks()
+        if self._writer is None:
+            sorting = [pq.SortingColumn(self.columns.index(self.sort_key))] if self.sort_key in self.columns else None
+            # explicitly encoded columns must not be dictionary-encoded
+            enc = self.column_encoding or {}
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression=self.compression,
+                                            write_statistics=True, sorting_columns=sorting,
+                                            use_dictionary=[c for c in self.columns if c not in enc] if enc else True,
+                                            column_encoding=enc or None)
+        self._writer.write_table(table.slice(0, n), row_group_size=n)
+        rest = table.slice(n)
+        self._pending = [rest] if len(rest) else []
+        self._n_pending = len(rest)
+
+    def close(self):
+        if self._n_pending:
+            self._flush(self._n_pending)
+        if self._writer is not None:
+            self._writer.close()
+        elif self.keep_empty:
+            pq.write_table(pa.Table.from_pandas(pd.DataFrame(columns=self.columns), preserve_index=False), self.path,
+                           compression=self.compression)
+
+class DatasetSink:
+    # hive-partitioned output: path/symbol=<symbol>/date=<UTC date of key>/part-NNNNN.parquet;
+    # rows arrive sorted by key, so one date partition is open at a time
+    def __init__(self, path: pathlib.Path, columns: List[str], symbol: str, key: str, **options):
+        self.path = path
+        # partition values live in the directory names, not in the files
+        self.columns = [c for c in columns if c != "symbol"]
+        self.symbol, self.key = symbol, key
+        self.options = options
+        self.n_rows = 0
+        self._day = None
+        self._sink = None
+
+    def write(self, df: pd.DataFrame | pa.Table):
+        if not len(df):
+            return
+        table = isinstance(df, pa.Table)
+        day = (df.column(self.key) if table else df[self.key]).to_numpy() // DAY_NS
+        cuts = [0, *(np.flatnonzero(np.diff(day)) + 1), len(day)]
+        for a, b in zip(cuts[:-1], cuts[1:]):
+            if day[a] != self._day:
+                self._open(int(day[a]))
+            self._sink.write(df.slice(a, b - a) if table else df.iloc[a:b])
+        self.n_rows += len(df)
+
+    def _open(self, day: int):
+        if self._sink is not None:
+            self._sink.close()
+        date = str(np.datetime64(day, "D"))
+        part_dir = self.path / f"symbol={self.symbol}" / f"date={date}"
+        part_dir.mkdir(parents=True, exist_ok=True)
+        self._sink = ParquetSink(next_part(part_dir), self.columns, keep_empty=False, sort_key=self.key,
+                                 **self.options)
+        self._day = day
+
+    def close(self):
+        if self._sink is not None:
+            self._sink.close()
+        self.path.mkdir(parents=True, exist_ok=True)
+
+def parts(path: pathlib.Path) -> List[pathlib.Path]:
+    # the files of an output in row order
+    if path.is_dir():
+        return sorted(path.rglob("part-*.parquet"))
+    return [path] if path.exists() else []
+
+def as_parts(path: pathlib.Path) -> pathlib.Path:
+    # turn a single-file output into a part directory (a rename, no rewrite)
+    if path.is_file():
+        tmp = path.with_name(path.name + ".tmp")
+        path.rename(tmp)
+        path.mkdir()
+        tmp.rename(path / "part-00000.parquet")
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def next_part(path: pathlib.Path) -> pathlib.Path:
+    existing = parts(path)
+    k = int(existing[-1].stem.split("-")[1]) + 1 if existing else 0
+    return path / f"part-{k:05d}.parquet"
+
+def drop_tail_rows(path: pathlib.Path, k: int):
+    # remove the last k rows of a part directory; only the last part(s) are rewritten,
+    # keeping their row group size, codec and sort order
+    for p in reversed(parts(path)):
+        if k <= 0:
+            return
+        pf = pq.ParquetFile(p)
+        table = pf.read()
+        if len(table) <= k:
+            k -= len(table)
+            p.unlink()
+            continue
+        rg = pf.metadata.row_group(0)
+        codec = rg.column(0).compression if len(table.schema) else "snappy"
+        tmp = p.with_name(p.name + ".tmp")
+        pq.write_table(table.slice(0, len(table) - k), tmp, row_group_size=rg.num_rows,
+                       compression="NONE" if codec == "UNCOMPRESSED" else codec,
+                       sorting_columns=rg.sorting_columns or None)
+        tmp.replace(p)
+        return
+
+def read_rows(path: pathlib.Path, start: int, stop: int | None = None,
+              columns: List[str] | None = None) -> pa.Table | None:
+    # rows [start:stop] of an output, decoding only the row groups that contain them;
+    # None if there are none
+    tables, pos = [], 0
+    for p in parts(path):
+        pf = pq.ParquetFile(p)
+        for rg in range(pf.metadata.num_row_groups):
+            n = pf.metadata.row_group(rg).num_rows
+            if pos + n > start and (stop is None or pos < stop):
+                t = pf.read_row_group(rg, columns=columns)
+                lo = max(0, start - pos)
+                tables.append(t.slice(lo, None if stop is None else stop - pos - lo))
+            pos += n
+            if stop is not None and pos >= stop:
+                break
+        if stop is not None and pos >= stop:
+            break
+    return pa.concat_tables(tables) if tables else None
+
+def read_rows_from(path: pathlib.Path, start: int, columns: List[str] | None = None) -> pd.DataFrame:
+    # rows [start:] of an output; the index carries the row positions
+    t = read_rows(path, start, None, columns)
+    if t is None:
+        return pd.DataFrame(columns=columns or [])
+    df = t.to_pandas()
+    df.index = pd.RangeIndex(start, start + len(df))
+    return df
+
+def read_where(path: pathlib.Path, column: str, min_value) -> pd.DataFrame:
+    # rows with column >= min_value; row-group statistics skip the rest
+    tables = [pq.read_table(p, filters=[(column, ">=", min_value)]) for p in parts(path)]
+    tables = [t for t in tables if len(t)]
+    if not tables:
+        return pd.DataFrame()
+    return pa.concat_tables(tables).to_pandas()
+
+def reset(path: pathlib.Path):
+    # a full run replaces part directories left behind by earlier append runs
+    if path.is_dir():
+        shutil.rmtree(path)
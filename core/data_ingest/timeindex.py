@@ -0,0 +1,55 @@
+from __future__ import annotations
+from functools import cached_property
+from typing import Any, Dict
+import numpy as np
+
+# Calendar fields of a chunk of ticks for the weekend trim, derived from ts_ns by
+# integer arithmetic once per chunk. Each field is computed on first use and kept
+# in the narrowest integer type that holds it.
+
+MINUTE_NS = 60_000_000_000
+HOUR_NS = 60 * MINUTE_NS
+DAY_NS = 24 * HOUR_NS
+# the FX trading day rolls over at 22:00 UTC (17:00 New York): session s covers
+# [s * DAY_NS - SESSION_OFFSET_NS, (s + 1) * DAY_NS - SESSION_OFFSET_NS)
+SESSION_OFFSET_NS = 2 * HOUR_NS
+# trim_weekend: "calendar" drops UTC Saturday and Sunday, "session" the FX weekend
+# from Friday 22:00 to Sunday 22:00 UTC; true means "calendar"
+WEEKEND_RULES = ("calendar", "session")
+
+def weekend_rule(config: Dict[str, Any]) -> str | None:
+    rule = config.get("trim_weekend", True)
+    if rule is True:
+        return "calendar"
+    if rule is False or rule is None:
+        return None
+    if rule not in WEEKEND_RULES:
+        raise ValueError(f"unsupported trim_weekend: {rule!r}")
+    return rule
+
+def _weekday(day: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a Thursday; Monday=0 ... Sunday=6
+    return ((day + 3) % 7).astype("int8")
+
+class TimeIndex:
+    def __init__(self, ts_ns: np.ndarray):
+        self.ts_ns = np.asarray(ts_ns, dtype="int64")
+
+    @cached_property
+    def weekday(self) -> np.ndarray:
+        # of the UTC day
+        return _weekday((self.ts_ns // DAY_NS).astype("int32"))
+
+    @cached_property
+    def session(self) -> np.ndarray:
+        # FX trading day: the UTC date on which the session ends
+        return ((self.ts_ns + SESSION_OFFSET_NS) // DAY_NS).astype("int32")
+
+    @cached_property
+    def session_weekday(self) -> np.ndarray:
+        # weekday of the session; Friday 22:00 .. Sunday 22:00 UTC falls on 5 and 6
+        return _weekday(self.session)
+
+    def trading(self, rule: str) -> np.ndarray:
+        # mask of the ticks outside the weekend of rule
+        return (self.session_weekday if rule == "session" else self.weekday) < 5
@@ -0,0 +1,138 @@
+from __future__ import annotations
+from typing import Tuple
+import numpy as np
+import pyarrow as pa
+
+# Fixed-layout parser for the feed timestamp format YYYY-MM-DDTHH:MM:SS[.f{1,9}]Z.
+# Works on the raw bytes of the column (object array or Arrow string array); rows
+# that do not match the layout are reported in the mask and left to the generic parser.
+
+_SEPS = {4: b"-", 7: b"-", 10: b"T", 13: b":"}
+_FIELDS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+# weights of the fraction digits at offsets 20..28; float64 holds them exactly
+_FRAC_W = 10.0 ** np.arange(8, -1, -1)
+# rows parsed at once; bounds the (rows, width) byte matrices and int64 temporaries
+PARSE_ROWS = 1 << 16
+
+def _days_from_civil(y: np.ndarray, m: np.ndarray, d: np.ndarray) -> np.ndarray:
+    # proleptic Gregorian date → days since 1970-01-01 (H. Hinnant)
+    y = y - (m <= 2)
+    era = np.floor_divide(y, 400)
+    yoe = y - era * 400
+    mp = (m + 9) % 12
+    doy = (153 * mp + 2) // 5 + d - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def _month_days(y: np.ndarray, m: np.ndarray) -> np.ndarray:
+    leap = ((y % 4 == 0) & (y % 100 != 0)) | (y % 400 == 0)
+    days = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype="int32")[np.clip(m, 0, 12)]
+    return days + ((m == 2) & leap)
+
+def _as_bytes(values) -> np.ndarray:
+    # (n, width) uint8 rows; when every value has the same byte length this is a
+    # zero-copy view of the Arrow string buffer
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        try:
+            values = pa.array(np.asarray(values, dtype=object), type=pa.string())
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            values = None
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    if values is not None and values.type in (pa.string(), pa.large_string()):
+        n = len(values)
+        off_type = "int32" if values.type == pa.string() else "int64"
+        offsets = np.frombuffer(values.buffers()[1], dtype=off_type)[values.offset:values.offset + n + 1]
+        lens = np.diff(offsets)
+        if n and values.null_count == 0 and (lens == lens[0]).all():
+            data = np.frombuffer(values.buffers()[2], dtype="uint8")
+            return data[offsets[0]:offsets[-1]].reshape(n, int(lens[0]))
+        values = values.to_numpy(zero_copy_only=False)
+    try:
+        raw = np.asarray(values).astype("S")
+        return raw.view("uint8").reshape(len(raw), raw.dtype.itemsize)
+    except (UnicodeEncodeError, ValueError, TypeError):
+        pass
+    # non-ASCII text keeps its row layout with 0xFF bytes
+    try:
+        u = np.asarray(values).astype("U")
+    except (ValueError, TypeError):
+        return np.zeros((len(values), 1), dtype="uint8")
+    u = u.view("uint32").reshape(len(u), u.dtype.itemsize // 4)
+    return np.where(u < 128, u, 255).astype("uint8")
+
+def _num(d: np.ndarray, i: int, k: int) -> np.ndarray:
+    v = d[:, i].astype("int32")
+    for j in range(i + 1, i + k):
+        v = v * 10 + d[:, j]
+    return v
+
+def _minute_ns(d: np.ndarray, b: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # "YYYY-MM-DDTHH:MM" → (ns since epoch, ok)
+    ok = np.ones(len(d), dtype=bool)
+    for pos, ch in _SEPS.items():
+        ok &= b[:, pos] == ord(ch)
+    ok &= (d[:, _FIELDS[:12]] < 10).all(axis=1)
+    year, month, day = _num(d, 0, 4), _num(d, 5, 2), _num(d, 8, 2)
+    hour, minute = _num(d, 11, 2), _num(d, 14, 2)
+    # int64 ns covers 1677-09-21 .. 2262-04-11
+    ok &= (year >= 1678) & (year <= 2261)
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= _month_days(year, month))
+    ok &= (hour < 24) & (minute < 60)
+    days = _days_from_civil(year, month, day).astype("int64")
+    return ((days * 24 + hour) * 60 + minute) * 60_000_000_000, ok
+
+def parse_iso_utc(values) -> Tuple[np.ndarray, np.ndarray]:
+    # → (ts_ns int64, ok bool); ts_ns is 0 where ok is False
+    n = len(values)
+    if n <= PARSE_ROWS:
+        return _parse(values)
+    ts, ok = np.empty(n, dtype="int64"), np.empty(n, dtype=bool)
+    for off in range(0, n, PARSE_ROWS):
+        ts[off:off + PARSE_ROWS], ok[off:off + PARSE_ROWS] = _parse(values[off:off + PARSE_ROWS])
+    return ts, ok
+
+def _parse(values) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(values)
+    b = _as_bytes(values)
+    w = b.shape[1]
+    if n == 0 or w < 20:
+        return np.zeros(n, dtype="int64"), np.zeros(n, dtype=bool)
+    d = b - np.uint8(48)        # digits → 0..9, any other byte → >= 10
+
+    # the date/hour/minute prefix is shared by long runs of ticks: parse it once per run
+    key = np.ascontiguousarray(b[:, :16]).view("<u8")
+    head = np.ones(n, dtype=bool)
+    head[1:] = (key[1:] != key[:-1]).any(axis=1)
+    first = np.flatnonzero(head)
+    run = np.cumsum(head) - 1
+    run_ns, run_ok = _minute_ns(d[first], b[first])
+
+    short = b[:, w - 1] == 0    # NUL padding only occurs in rows shorter than the widest
+    length = np.full(n, w, dtype="int64")
+    if short.any():
+        length[short] = np.count_nonzero(b[short], axis=1)
+
+    ok = run_ok[run] & (length >= 20) & (length <= 30)
+    ok &= (b[:, 16] == ord(":")) & (d[:, 17] < 10) & (d[:, 18] < 10)
+    second = _num(d, 17, 2).astype("int64")
+    ok &= second < 60
+    # "...SSZ" or "...SS.fZ" with 1-9 fraction digits directly followed by the final Z
+    zpos = length - 1
+    ok &= b[np.arange(n), np.minimum(zpos, w - 1)] == ord("Z")
+    has_frac = length > 20
+    ok &= ~has_frac | ((b[:, 19] == ord(".")) & (length >= 22))
+    frac = np.zeros(n, dtype="int64")
+    if 22 <= w <= 30 and not short.any():
+        k = w - 21              # uniform width: fraction is bytes 20..w-2
+        ok &= (d[:, 20:20 + k] < 10).all(axis=1)
+        frac = _num(d, 20, k).astype("int64") * 10 ** (9 - k)
+    elif w > 20:
+        cols = min(w - 20, 9)
+        isdig = d[:, 20:20 + cols] < 10
+        ndig = np.where(isdig.all(axis=1), cols, isdig.argmin(axis=1))
+        ok &= ~has_frac | (20 + ndig == zpos)
+        frac = (np.where(isdig, d[:, 20:20 + cols], 0) @ _FRAC_W[:cols]).astype("int64")
+
+    ts = run_ns[run] + second * 1_000_000_000 + frac
+    return np.where(ok, ts, 0), ok
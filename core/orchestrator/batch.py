@@ -0,0 +1,108 @@
+from __future__ import annotations
+import json, os, pathlib, shutil, traceback, uuid, datetime as dt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any
+
+from .orchestrator import run as orch_run
+
+# Batch driver: runs one module over many (symbol, csv) jobs on a process pool.
+# A failing job is recorded in the summary; the rest of the batch carries on.
+
+# a job whose worker process dies is retried once, alone in a fresh pool; a dead
+# worker breaks the whole pool, so only the jobs that had started are charged an
+# attempt and the others are resubmitted as they were
+MAX_ATTEMPTS = 2
+
+def _limit_memory(memory_mb: int | None):
+    if memory_mb:
+        import resource
+        cap = int(memory_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (cap, cap))
+
+def _job_config(config: dict, job: dict, batch_id: str, memory_mb: int | None) -> dict:
+    cfg = dict(config)
+    cfg["symbol"] = job["symbol"]
+    cfg["csv"] = dict(config.get("csv") or {}, path=str(job["csv"]))
+    # input.path takes precedence over csv.path; the batch config's would win for every job
+    cfg["input"] = dict(config.get("input") or {}, path=str(job["csv"]))
+    cfg["demo"] = False
+    cfg["run_id"] = f"{batch_id}/{job['symbol']}"
+    # stream the input so a capped worker stays inside its address space
+    if memory_mb and not (cfg.get("stream") or {}).get("enabled", False):
+        cfg["stream"] = {"enabled": True, "memory_budget_mb": max(1, int(memory_mb) // 2)}
+    return cfg
+
+def _run_job(cfg: dict, module_path: str, marker: str) -> dict:
+    pathlib.Path(marker).touch()   # left behind if this process dies
+    try:
+        return {"ok": True, **orch_run(cfg, module_path)}
+    except BaseException as e:   # MemoryError included: the cap must fail only this job
+        return {"ok": False, "error": repr(e), "traceback": traceback.format_exc()}
+
+def run_batch(config: dict, module_path: str, jobs: List[Dict[str, Any]],
+              workers: int | None = None, memory_mb: int | None = None) -> dict:
+    batch_id = config.get("batch_id") or dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S") + "_" + uuid.uuid4().hex[:6]
+    out_root = pathlib.Path(config.get("out_dir", "./runs/")) / batch_id
+    out_root.mkdir(parents=True, exist_ok=True)
+    workers = max(1, min(int(workers or os.cpu_count() or 1), len(jobs) or 1))
+    started = dt.datetime.utcnow()
+
+    results: Dict[int, dict] = {}
+    attempts = {i: 0 for i in range(len(jobs))}
+    pending, alone = list(range(len(jobs))), []
+    running = out_root / ".running"
+    while pending or alone:
+        # jobs that were running when a pool broke go one at a time
+        if alone:
+            batch, n = [alone.pop(0)], 1
+        else:
+            batch, pending, n = pending, [], workers
+        shutil.rmtree(running, ignore_errors=True)
+        running.mkdir()
+        # one process per job: memory goes back to the OS between symbols
+        with ProcessPoolExecutor(max_workers=n, initializer=_limit_memory, initargs=(memory_mb,),
+                                 max_tasks_per_child=1) as pool:
+            futures = {pool.submit(_run_job, _job_config(config, jobs[i], batch_id, memory_mb), module_path,
+                                   str(running / str(i))): i for i in batch}
+            broken = []
+            for fut in as_completed(futures):
+                i = futures[fut]
+                try:
+                    results[i] = fut.result()
+                    attempts[i] += 1
+                except BrokenProcessPool as e:
+                    broken.append((i, e))
+        # if no job got to start, the pool died on its own and all of them are charged
+        charged = [i for i, _ in broken if (running / str(i)).exists()] or [i for i, _ in broken]
+        for i, e in broken:
+            if i not in charged:
+                pending.append(i)
+                continue
+            attempts[i] += 1
+            if attempts[i] < MAX_ATTEMPTS:
+                alone.append(i)
+            else:
+                results[i] = {"ok": False, "error": f"worker process died: {e!r}"}
+        pending.sort(); alone.sort()
+    shutil.rmtree(running, ignore_errors=True)
+
+    done, failures = [], []
+    for i, job in enumerate(jobs):
+        r = dict(results[i], symbol=job["symbol"], csv=str(job["csv"]), attempts=attempts[i])
+        (done if r.pop("ok") else failures).append(r)
+    summary = {
+        "batch_id": batch_id,
+        "module": module_path,
+        "started": started.isoformat(),
+        "finished": dt.datetime.utcnow().isoformat(),
+        "workers": workers,
+        "memory_mb": memory_mb,
+        "n_jobs": len(jobs),
+        "n_ok": len(done),
+        "n_failed": len(failures),
+        "results": done,
+        "failures": failures,
+    }
+    (out_root / "batch_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
@@ -0,0 +1,124 @@
+from __future__ import annotations
+import datetime as dt, json, pathlib, resource, sys, time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List
+
+# progress.jsonl writer shared by the orchestrator and the modules it runs. One
+# handle per file stays open while anyone uses it; events are buffered and
+# written every FLUSH_EVENTS events or FLUSH_SECONDS, and on close. Every line
+# has the progress keys (timestamp, module, step, percent, message); stage lines
+# add kind="stage" and the totals of one stage over all chunks: wall and CPU
+# seconds, rows in/out, rows/s and the process peak RSS when the stage last ran.
+
+FLUSH_EVENTS = 64
+FLUSH_SECONDS = 1.0
+
+def peak_rss_mb() -> float:
+    # high-water mark of this process (not of worker processes); KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+
+class _Call:
+    # one run of a stage; rows_out defaults to rows_in for stages that keep every row
+    def __init__(self, rows_in: int):
+        self.rows_in = rows_in
+        self.rows_out = rows_in
+
+class Stage:
+    def __init__(self):
+        self.calls, self.wall_s, self.cpu_s = 0, 0.0, 0.0
+        self.rows_in, self.rows_out = 0, 0
+        self.peak_rss_mb = 0.0
+
+    def record(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "wall_s": round(self.wall_s, 6), "cpu_s": round(self.cpu_s, 6),
+                "rows_in": self.rows_in, "rows_out": self.rows_out,
+                "rows_per_s": round(self.rows_in / self.wall_s, 1) if self.wall_s > 0 else None,
+                "peak_rss_mb": round(self.peak_rss_mb, 1)}
+
+class Telemetry:
+    def __init__(self, path: pathlib.Path, module: str):
+        self.path, self.module = pathlib.Path(path), module
+        self.percent = 0
+        self.stages: Dict[str, Stage] = {}
+        self._reported = set()
+        self._buf: List[str] = []
+        self._flushed = time.monotonic()
+        self._f = self.path.open("a", encoding="utf-8")
+        self._users = 0
+
+    def log(self, step: str, pct: int, msg: str, **fields):
+        self.percent = max(self.percent, pct)
+        self._buf.append(json.dumps({"timestamp": dt.datetime.utcnow().isoformat(), "module": self.module,
+                                     "step": step, "percent": pct, "message": msg, **fields}))
+        if len(self._buf) >= FLUSH_EVENTS or time.monotonic() - self._flushed >= FLUSH_SECONDS:
+            self.flush()
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = 0) -> Iterator[_Call]:
+        # times the block and adds it to the stage's totals
+        s = self.stages.setdefault(name, Stage())
+        call = _Call(rows_in)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield call
+        finally:
+            s.calls += 1
+            s.wall_s += time.perf_counter() - wall
+            s.cpu_s += time.process_time() - cpu
+            s.rows_in += call.rows_in; s.rows_out += call.rows_out
+            s.peak_rss_mb = peak_rss_mb()
+
+    def timed(self, name: str, chunks: Iterable) -> Iterator:
+        # the chunks of a source, with the time spent producing them as a stage
+        it = iter(chunks)
+        while True:
+            with self.stage(name) as call:
+                try:
+                    chunk = next(it)
+                except StopIteration:
+                    return
+                call.rows_in = call.rows_out = len(chunk)
+            yield chunk
+
+    def report(self):
+        # one stage line per finished stage not reported yet, in the order they first ran
+        for name, s in self.stages.items():
+            if name in self._reported or not s.calls:
+                continue
+            self._reported.add(name)
+            r = s.record()
+            self.log(name, self.percent, f"{name}: {r['wall_s']:.3f}s wall, {r['cpu_s']:.3f}s cpu, "
+                     f"{r['rows_in']} -> {r['rows_out']} rows", kind="stage", **r)
+
+    def flush(self):
+        if self._buf:
+            self._f.write("\n".join(self._buf) + "\n")
+            self._buf.clear()
+        self._f.flush()
+        self._flushed = time.monotonic()
+
+    def close(self):
+        self.flush()
+        self._f.close()
+
+_open: Dict[str, Telemetry] = {}
+
+@contextmanager
+def open_telemetry(path: pathlib.Path, module: str) -> Iterator[Telemetry]:
+    # the sink of path; nested users (orchestrator, then the module it runs) share it
+    # and the file is closed when the outermost one is done
+    key = str(pathlib.Path(path).resolve())
+    tel = _open.get(key)
+    if tel is None:
+        tel = _open[key] = Telemetry(path, module)
+    tel._users += 1
+    try:
+        yield tel
+    finally:
+        tel._users -= 1
+        if tel._users:
+            tel.flush()
+        else:
+            del _open[key]
+            tel.close()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark core.data_ingest.run() on synthetic ticks and track regressions.
+
+Every size gets a deterministic tick CSV (generated once, reused from --data-dir)
+and is ingested --repeat times in a fresh worker process, so peak RSS is per run.
+End-to-end and per-stage wall times come from the run's stage telemetry; the best
+repeat is appended to --history together with throughput and peak memory. The
+script exits with 1 if the end-to-end time, a stage taking at least --min-stage-s
+or the peak RSS is worse than --threshold (relative) against the median of the
+last --window entries of the same machine, size and config.
+"""
+import sys, json, time, argparse, hashlib, pathlib, platform, shutil, subprocess, datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# rows per generated block; block k is drawn from seed (seed, k), so a smaller set
+# is a prefix of a larger one and the data never depends on how it was written
+GEN_BLOCK = 1_000_000
+GENERATOR_VERSION = 1
+START = np.datetime64("2025-08-04T00:00:00", "ms").astype("int64")   # a Monday, ms
+DUPLICATE_RATE = 0.001
+
+BENCH_CONFIG = {
+    "symbol": "EURUSD",
+    "price_basis": "mid",
+    "bar_frames": [{"type": "time", "unit": "1m"}, {"type": "time", "unit": "1h"}, {"type": "tick", "count": 100}],
+    "max_missing_gap_seconds": 60,
+    "trim_weekend": True,
+    "stream": {"enabled": True, "chunk_rows": 1_000_000},
+    "cache": {"enabled": False},
+}
+
+def parse_rows(text: str) -> int:
+    # "1M", "10m", "250k", "100000"
+    t = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(t[-1:], 1)
+    return int(float(t[:-1] if scale > 1 else t) * scale)
+
+def _block(seed: int, k: int, n: int, last_ms: int, last_mid: float):
+    # one block of ticks: exponential gaps (mean 250 ms), a random-walk mid with a
+    # varying spread on 5 decimals and a few exact duplicates
+    rng = np.random.default_rng([seed, k])
+    ms = last_ms + np.cumsum(rng.exponential(250.0, n).astype("int64") + 1)
+    mid = last_mid + np.cumsum(rng.normal(0.0, 0.00005, n))
+    spread = np.maximum(0.00015 + rng.normal(0.0, 0.00004, n), 0.00005)
+    bid = np.round(mid - spread / 2, 5)
+    ask = np.maximum(np.round(mid + spread / 2, 5), bid)
+    dup = np.flatnonzero(rng.random(n) < DUPLICATE_RATE)
+    dup = dup[dup > 0]
+    ms[dup], bid[dup], ask[dup] = ms[dup - 1], bid[dup - 1], ask[dup - 1]
+    return ms, bid, ask, mid[-1]
+
+def fixture(data_dir: pathlib.Path, rows: int, seed: int) -> pathlib.Path:
+    path = data_dir / f"ticks_{rows}_s{seed}_g{GENERATOR_VERSION}.csv"
+    if path.exists():
+        return path
+    data_dir.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    last_ms, last_mid = int(START), 1.1
+    schema = pa.schema([("timestamp", pa.string()), ("bid", pa.float64()), ("ask", pa.float64())])
+    with pacsv.CSVWriter(str(tmp), schema, write_options=pacsv.WriteOptions(quoting_style="needed")) as w:
+        for k, off in enumerate(range(0, rows, GEN_BLOCK)):
+            n = min(GEN_BLOCK, rows - off)
+            ms, bid, ask, last_mid = _block(seed, k, n, last_ms, last_mid)
+            last_ms = int(ms[-1])
+            ts = pc.strftime(pa.array(ms, pa.timestamp("ms")), format="%Y-%m-%dT%H:%M:%SZ")
+            w.write_table(pa.table({"timestamp": ts, "bid": bid, "ask": ask}, schema=schema))
+    tmp.replace(path)
+    return path
+
+def _run_case(csv_path: str, out_dir: str, config: dict) -> dict:
+    # worker process: one ingest run, its stage telemetry and this process' peak RSS
+    from core.data_ingest.data_ingest import run
+    from core.orchestrator.telemetry import peak_rss_mb
+    shutil.rmtree(out_dir, ignore_errors=True)
+    cfg = dict(config, out_dir=out_dir, csv={"path": csv_path})
+    t = time.perf_counter()
+    run(cfg)
+    wall = time.perf_counter() - t
+    with open(pathlib.Path(out_dir) / "progress.jsonl", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    stages = {l["step"]: {k: l[k] for k in ("wall_s", "cpu_s", "rows_in", "rows_out", "rows_per_s")}
+              for l in lines if l.get("kind") == "stage"}
+    return {"wall_s": wall, "peak_rss_mb": peak_rss_mb(), "stages": stages}
+
+def measure(csv_path: pathlib.Path, rows: int, out_dir: pathlib.Path, config: dict, repeat: int) -> dict:
+    runs = []
+    for _ in range(repeat):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            runs.append(pool.submit(_run_case, str(csv_path), str(out_dir), config).result())
+    best = min(runs, key=lambda r: r["wall_s"])
+    return {"rows": rows, "wall_s": round(best["wall_s"], 4), "rows_per_s": round(rows / best["wall_s"], 1),
+            "peak_rss_mb": round(max(r["peak_rss_mb"] for r in runs), 1), "stages": best["stages"],
+            "repeat": repeat}
+
+def regressions(result: dict, history: list, key: dict, threshold: float, window: int, min_stage_s: float) -> list:
+    # checks against the median of the last `window` comparable entries
+    past = [h["results"][str(result["rows"])] for h in history
+            if h.get("key") == key and str(result["rows"]) in h.get("results", {})][-window:]
+    if not past:
+        return []
+    found = []
+    def check(what, now, before):
+        base = float(np.median(before))
+        if base > 0 and now > base * (1 + threshold):
+            found.append(f"{result['rows']} rows {what}: {now:.3f} vs median {base:.3f} (+{now / base - 1:.0%})")
+    check("end-to-end wall_s", result["wall_s"], [p["wall_s"] for p in past])
+    check("peak_rss_mb", result["peak_rss_mb"], [p["peak_rss_mb"] for p in past])
+    for name, s in result["stages"].items():
+        before = [p["stages"][name]["wall_s"] for p in past if name in p.get("stages", {})]
+        if before and max(s["wall_s"], float(np.median(before))) >= min_stage_s:
+            check(f"stage {name} wall_s", s["wall_s"], before)
+    return found
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--rows", default="1M,10M,100M", help="comma-separated sizes, e.g. 1M,10M,100M")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--data-dir", type=pathlib.Path, default=pathlib.Path("runs/bench/data"))
+    ap.add_argument("--out-dir", type=pathlib.Path, default=pathlib.Path("runs/bench/out"))
+    ap.add_argument("--history", type=pathlib.Path, default=pathlib.Path("runs/bench/history.json"))
+    ap.add_argument("--config", type=pathlib.Path, help="JSON/YAML ingest config overriding the bench defaults")
+    ap.add_argument("--threshold", type=float, default=0.15, help="allowed relative slowdown / memory growth")
+    ap.add_argument("--window", type=int, default=5, help="history entries the median is taken over")
+    ap.add_argument("--min-stage-s", type=float, default=0.5, help="stages faster than this are not checked")
+    ap.add_argument("--no-record", action="store_true", help="check only, do not append to the history")
+    args = ap.parse_args()
+
+    config = dict(BENCH_CONFIG)
+    if args.config:
+        import yaml
+        config.update(yaml.safe_load(args.config.read_text(encoding="utf-8")) or {})
+    # entries are only compared with runs of the same machine, data and config
+    key = {"host": platform.node(), "machine": platform.machine(), "python": platform.python_version(),
+           "seed": args.seed, "generator": GENERATOR_VERSION,
+           "config": hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12]}
+    history = json.loads(args.history.read_text(encoding="utf-8")) if args.history.exists() else []
+
+    results, found = {}, []
+    for rows in [parse_rows(r) for r in args.rows.split(",")]:
+        t = time.perf_counter()
+        csv_path = fixture(args.data_dir, rows, args.seed)
+        gen = time.perf_counter() - t
+        r = measure(csv_path, rows, args.out_dir / str(rows), config, args.repeat)
+        results[str(rows)] = r
+        found += regressions(r, history, key, args.threshold, args.window, args.min_stage_s)
+        print(f"rows={rows:,}  wall={r['wall_s']:.2f}s  {r['rows_per_s']:,.0f} rows/s  "
+              f"peak_rss={r['peak_rss_mb']:.0f}MB" + (f"  (fixture {gen:.1f}s)" if gen > 1 else ""))
+        for name, s in sorted(r["stages"].items(), key=lambda kv: -kv[1]["wall_s"]):
+            print(f"    {name:<16} {s['wall_s']:8.3f}s  {s['rows_in']:>12,} -> {s['rows_out']:<12,}")
+
+    if not args.no_record:
+        args.history.parent.mkdir(parents=True, exist_ok=True)
+        history.append({"timestamp": dt.datetime.utcnow().isoformat(), "commit": _git_commit(), "key": key,
+                        "results": results, "regressions": found})
+        args.history.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    for f in found:
+        print(f"REGRESSION {f}")
+    sys.exit(1 if found else 0)
+
+if __name__ == "__main__":
+    main()
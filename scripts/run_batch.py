@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+import sys, yaml, json, argparse
+from core.orchestrator.batch import run_batch
+
+def main():
+    ap = argparse.ArgumentParser(description="Run a module over many (symbol, csv) jobs in parallel")
+    ap.add_argument("module_path")
+    ap.add_argument("config_yaml")
+    ap.add_argument("jobs_yaml", help="YAML list of {symbol: ..., csv: ...}")
+    ap.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    ap.add_argument("--memory-mb", type=int, default=None, help="address-space cap per worker")
+    args = ap.parse_args()
+    with open(args.config_yaml, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    with open(args.jobs_yaml, "r", encoding="utf-8") as f:
+        jobs = yaml.safe_load(f)
+    summary = run_batch(config, args.module_path, jobs, workers=args.workers, memory_mb=args.memory_mb)
+    print(json.dumps({k: v for k, v in summary.items() if k != "results"}, indent=2))
+    sys.exit(1 if summary["n_failed"] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -72,10 +72,19 @@ def main():
                 help="Maximale Lücke zwischen Ticks"
             )
             
-            trim_weekend = st.checkbox(
+            trim_weekend = st.selectbox(
                 "Wochenenden entfernen",
-                value=True,
-                help="Samstag/Sonntag-Daten entfernen"
+                options=["calendar", "session", False],
+                format_func=lambda r: {"calendar": "Samstag/Sonntag (UTC)",
+                                       "session": "FX-Session (Fr 22:00 - So 22:00 UTC)",
+                                       False: "Nein"}[r],
+                help="Kalender-Wochenende oder FX-Wochenpause entfernen"
+            )
+            
+            use_cache = st.checkbox(
+                "Ergebnis-Cache verwenden",
+                value=False,
+                help="Gleiche Eingabe und Konfiguration übernehmen die Ergebnisse eines früheren Laufs"
             )
     
     # Main content area
@@ -98,7 +107,8 @@ def main():
             "price_basis": price_basis,
             "max_missing_gap_seconds": max_gap_seconds,
             "trim_weekend": trim_weekend,
-            "bar_frames": bar_frames
+            "bar_frames": bar_frames,
+            "cache": {"enabled": use_cache, "dir": str(Path("runs") / ".ingest_cache")}
         }
         
         if demo_mode:
@@ -203,14 +213,15 @@ def main():
                 
                 # Gap analysis
                 if quality['gap_items']:
-                    st.write(f"**Erkannte Gaps:** {len(quality['gap_items'])}")
+                    n_gaps = quality.get('gap_summary', {}).get('n_gaps', len(quality['gap_items']))
+                    st.write(f"**Erkannte Gaps:** {n_gaps:,}")
                     
                     # Show gap details
                     with st.expander("Gap-Details"):
                         for i, (start, end, duration) in enumerate(quality['gap_items'][:5]):
                             st.write(f"Gap {i+1}: {duration:.1f}s ({start} - {end})")
-                        if len(quality['gap_items']) > 5:
-                            st.write(f"... und {len(quality['gap_items']) - 5} weitere")
+                        if n_gaps > 5:
+                            st.write(f"... und {n_gaps - 5:,} weitere")
             
             # Download section
             st.subheader("💾 Downloads")
@@ -0,0 +1,117 @@
+"""
+Tests for the multi-symbol batch driver (core version)
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import tempfile
+import shutil
+import json
+import os
+from datetime import datetime, timedelta
+
+from core.orchestrator.batch import run_batch
+
+
+class TestRunBatch:
+    """Test suite for the process-pool batch driver."""
+    
+    @pytest.fixture
+    def temp_dir(self):
+        """Create temporary directory for test outputs."""
+        temp_dir = tempfile.mkdtemp()
+        yield Path(temp_dir)
+        shutil.rmtree(temp_dir)
+    
+    @pytest.fixture
+    def jobs(self, temp_dir):
+        """Two good symbols and one file without an ask column."""
+        start_time = datetime(2025, 1, 1, 9, 0, 0)
+        timestamps = [(start_time + timedelta(seconds=i)).isoformat() + 'Z' for i in range(300)]
+        np.random.seed(42)
+        jobs = []
+        for symbol in ['EURUSD', 'GBPUSD']:
+            mid = 1.1 + np.cumsum(np.random.normal(0, 0.0001, len(timestamps)))
+            path = temp_dir / f'{symbol}.csv'
+            pd.DataFrame({'timestamp': timestamps, 'bid': mid - 0.00005, 'ask': mid + 0.00005}).to_csv(path, index=False)
+            jobs.append({'symbol': symbol, 'csv': str(path)})
+        bad = temp_dir / 'USDJPY.csv'
+        pd.DataFrame({'timestamp': timestamps, 'bid': 150.0}).to_csv(bad, index=False)
+        jobs.insert(1, {'symbol': 'USDJPY', 'csv': str(bad)})
+        return jobs
+    
+    def test_bad_file_does_not_stop_batch(self, jobs, temp_dir):
+        """Test that a failing job is reported while the others complete."""
+        config = {
+            'out_dir': str(temp_dir / 'runs'),
+            'batch_id': 'nightly',
+            'bar_frames': [{'type': 'time', 'unit': '1m'}],
+        }
+        summary = run_batch(config, 'core.data_ingest.data_ingest', jobs, workers=2, memory_mb=2048)
+        
+        assert summary['n_ok'] == 2
+        assert [r['symbol'] for r in summary['results']] == ['EURUSD', 'GBPUSD']
+        assert summary['failures'][0]['symbol'] == 'USDJPY'
+        assert 'MISSING_COLUMN' in summary['failures'][0]['error']
+        
+        for r in summary['results']:
+            bars = pd.read_parquet(r['result']['frames']['1m'])
+            assert len(bars) == 5
+            assert Path(r['out_dir']) == temp_dir / 'runs' / 'nightly' / r['symbol'] / 'data_ingest'
+            with open(Path(r['out_dir']) / 'progress.jsonl') as f:
+                lines = [json.loads(line) for line in f]
+            # orchestrator and module events in one file, stage timings before the final done
+            assert [l['step'] for l in lines[:2]] == ['start', 'init']
+            assert lines[-1]['message'] == 'module done'
+            stages = {l['step']: l for l in lines if l.get('kind') == 'stage'}
+            assert stages['module']['wall_s'] >= stages['bars_1m']['wall_s'] > 0
+            assert stages['load_csv']['rows_out'] == 300 and stages['bars_1m']['rows_in'] == 300
+        
+        with open(temp_dir / 'runs' / 'nightly' / 'batch_summary.json') as f:
+            assert json.load(f)['n_failed'] == 1
+    
+    def test_jobs_override_input_path(self, jobs, temp_dir):
+        """Test that each job ingests its own file when the batch config sets input.path."""
+        config = {
+            'out_dir': str(temp_dir / 'runs'),
+            'batch_id': 'inputs',
+            'input': {'path': jobs[0]['csv']},
+            'bar_frames': [{'type': 'time', 'unit': '1m'}],
+        }
+        good = [jobs[0], jobs[2]]
+        summary = run_batch(config, 'core.data_ingest.data_ingest', good, workers=2)
+        
+        assert summary['n_ok'] == 2
+        for r, job in zip(summary['results'], good):
+            with open(r['result']['manifest']) as f:
+                assert json.load(f)['input']['csv_path'] == job['csv']
+    
+    def test_crashing_job_is_charged_alone(self, jobs, temp_dir, monkeypatch):
+        """Test that a job killing its worker fails alone while the others complete."""
+        (temp_dir / 'crash_module.py').write_text(
+            "import os\n"
+            "from core.data_ingest.data_ingest import run as ingest\n"
+            "def run(config):\n"
+            "    if config['symbol'] == 'CRASH':\n"
+            "        os._exit(1)\n"
+            "    return ingest(config)\n")
+        monkeypatch.syspath_prepend(str(temp_dir))
+        monkeypatch.setenv('PYTHONPATH', str(temp_dir) + os.pathsep + os.environ.get('PYTHONPATH', ''))
+        good = jobs[0]['csv']
+        batch = [{'symbol': f'SYM{i}', 'csv': good} for i in range(6)]
+        batch.insert(3, {'symbol': 'CRASH', 'csv': good})
+        config = {
+            'out_dir': str(temp_dir / 'runs'),
+            'batch_id': 'crash',
+            'bar_frames': [{'type': 'time', 'unit': '1m'}],
+        }
+        summary = run_batch(config, 'crash_module', batch, workers=3)
+        
+        assert (summary['n_ok'], summary['n_failed']) == (6, 1)
+        assert summary['failures'][0]['symbol'] == 'CRASH'
+        assert summary['failures'][0]['attempts'] == 2
+        assert 'worker process died' in summary['failures'][0]['error']
+        assert all(r['attempts'] <= 2 for r in summary['results'])
+        assert not (temp_dir / 'runs' / 'crash' / '.running').exists()
@@ -9,6 +9,7 @@ from pathlib import Path
 import tempfile
 import shutil
 import json
+import pyarrow.parquet as pq
 from datetime import datetime, timedelta
 
 from core.data_ingest.data_ingest import run
@@ -43,6 +44,22 @@ class TestCoreDataIngest:
         
         return data
     
+    @pytest.fixture
+    def multi_day_tick_data(self):
+        """Fri..Tue ticks with gaps across midnights, duplicates and unsorted runs within days."""
+        np.random.seed(7)
+        start = datetime(2025, 1, 3, 22, 0, 0)
+        timestamps = sorted(start + timedelta(seconds=float(s)) for s in np.random.uniform(0, 4 * 86400, 3000))
+        mid = 1.1 + np.cumsum(np.random.normal(0, 0.0001, len(timestamps)))
+        data = pd.DataFrame({
+            'timestamp': [t.strftime('%Y-%m-%dT%H:%M:%S.%fZ') for t in timestamps],
+            'bid': mid - 0.00005,
+            'ask': mid + 0.00005,
+        })
+        data = pd.concat([data, data.iloc[[10, 500, 2999]]]).sort_index(kind='mergesort')
+        data.iloc[100:110] = data.iloc[100:110].iloc[::-1].values
+        return data
+    
     @pytest.fixture
     def temp_dir(self):
         """Create temporary directory for test outputs."""
@@ -147,6 +164,25 @@ class TestCoreDataIngest:
         assert log_lines[0]['module'] == 'data_ingest'
         assert log_lines[-1]['percent'] == 100
     
+    def test_stage_telemetry(self, sample_tick_data, sample_config, temp_dir):
+        """Test that every stage logs its wall/CPU time, rows in/out, throughput and peak RSS."""
+        data = pd.concat([sample_tick_data, sample_tick_data.iloc[:10]]).sort_index(kind='mergesort')
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['stream'] = {'enabled': True, 'chunk_rows': 300}
+        result = run(sample_config)
+        
+        with open(result['log']) as f:
+            lines = [json.loads(line) for line in f]
+        stages = {l['step']: l for l in lines if l.get('kind') == 'stage'}
+        assert {'load_csv', 'normalize_time', 'sort_dedupe', 'dedupe', 'write_raw', 'bars_1m'} <= set(stages)
+        assert stages['load_csv']['calls'] == 5   # 4 chunks and the end of the input
+        assert stages['load_csv']['rows_out'] == 1010
+        assert stages['sort_dedupe']['rows_in'] == 1010 and stages['dedupe']['rows_out'] == 1000
+        for s in stages.values():
+            assert s['wall_s'] >= 0 and s['cpu_s'] >= 0 and s['peak_rss_mb'] > 0
+        assert stages['bars_1m']['rows_in'] == 1000
+        assert lines[-1]['step'] == 'done'
+    
     def test_tick_bars_generation(self, sample_tick_data, sample_config, temp_dir):
         """Test tick bar generation."""
         # Save sample data as CSV
@@ -263,6 +299,38 @@ class TestCoreDataIngest:
         assert 'gap_items' in quality
         assert len(quality['gap_items']) > 0  # Should detect the 2-minute gap
         assert quality['gap_coverage_percent'] < 100  # Coverage should be less than 100%
+        
+        gaps = pd.read_parquet(result['gaps'])
+        assert list(gaps.columns) == ['start_ns', 'end_ns', 'seconds']
+        assert list(gaps['seconds']) == [121.0]
+        assert quality['gap_summary']['n_gaps'] == 1
+    
+    def test_gap_table_and_top_k(self, sample_tick_data, sample_config, temp_dir):
+        """Test that gaps.parquet lists every gap while the report keeps only the longest ones."""
+        data = sample_tick_data.copy()
+        ts = pd.to_datetime(data['timestamp']) + pd.to_timedelta(np.arange(len(data)) // 10 * 70, unit='s')
+        data['timestamp'] = ts.dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['quality'] = {'top_gaps': 5}
+        result = run(sample_config)
+        
+        gaps = pd.read_parquet(result['gaps'])
+        assert len(gaps) == 99
+        assert (gaps['seconds'] == 71.0).all()
+        assert ((gaps['end_ns'] - gaps['start_ns']) == 71_000_000_000).all()
+        with open(result['quality_report']) as f:
+            quality = json.load(f)
+        assert quality['gap_summary'] == {'n_gaps': 99, 'total_seconds': 99 * 71.0, 'max_seconds': 71.0, 'top_k': 5}
+        assert len(quality['gap_items']) == 5
+        assert quality['gap_items'][0][0] == pd.Timestamp(gaps['start_ns'].iloc[0], tz='UTC').isoformat()
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        result_stream = run(config)
+        pd.testing.assert_frame_equal(pd.read_parquet(result_stream['gaps']), gaps)
+        with open(result_stream['quality_report']) as f:
+            assert json.load(f) == quality
     
     def test_weekend_trimming(self, temp_dir):
         """Test weekend data trimming."""
@@ -316,6 +384,26 @@ class TestCoreDataIngest:
         # Trimmed version should have fewer rows
         assert quality_trim['n_raw_rows'] < quality_no_trim['n_raw_rows']
     
+    def test_weekend_trimming_by_session(self, temp_dir):
+        """Test that the session rule drops Friday 22:00 to Sunday 22:00 UTC and the calendar rule Saturday and Sunday."""
+        # 2025-01-03 is a Friday
+        times = ['2025-01-03T21:59:59Z', '2025-01-03T22:00:00Z', '2025-01-03T23:30:00Z', '2025-01-04T12:00:00Z',
+                 '2025-01-05T21:59:59Z', '2025-01-05T22:00:00Z', '2025-01-06T09:00:00Z']
+        pd.DataFrame({'timestamp': times, 'bid': 1.1, 'ask': 1.1001}).to_csv(temp_dir / 'test_data.csv', index=False)
+        kept = {}
+        for rule in ['session', 'calendar']:
+            config = {'out_dir': str(temp_dir / rule), 'csv': {'path': str(temp_dir / 'test_data.csv')},
+                      'trim_weekend': rule, 'bar_frames': []}
+            run(config)
+            raw = pd.read_parquet(temp_dir / rule / 'raw_norm.parquet')
+            kept[rule] = raw['timestamp'].tolist()
+        assert kept['session'] == [times[0], times[5], times[6]]
+        assert kept['calendar'] == [times[0], times[1], times[2], times[6]]
+        
+        config['trim_weekend'] = 'sunday'
+        with pytest.raises(ValueError, match='unsupported trim_weekend'):
+            run(config)
+    
     def test_error_handling_missing_columns(self, temp_dir):
         """Test error handling for missing required columns."""
         # Create data with missing columns
@@ -388,3 +476,912 @@ class TestCoreDataIngest:
         # Check that percentages are non-decreasing
         for i in range(1, len(percentages)):
             assert percentages[i] >= percentages[i-1]
+
+    @pytest.mark.parametrize('chunk_rows', [37, 7777])
+    def test_streaming_matches_in_memory(self, sample_config, temp_dir, chunk_rows):
+        """Test that chunked ingest writes byte-identical outputs, over many Parquet data pages."""
+        csv_path = temp_dir / 'test_data.csv'
+        n = 60_000
+        np.random.seed(42)
+        mid = 1.1 + np.cumsum(np.random.normal(0, 0.0001, n))
+        ticks = pd.DataFrame({
+            'timestamp': pd.date_range('2025-01-01T09:00:00Z', periods=n, freq='250ms').strftime('%Y-%m-%dT%H:%M:%S.%fZ'),
+            'bid': mid - 0.00005,
+            'ask': mid + 0.00005,
+        })
+        # duplicate a tick so dedupe state has to cross a chunk boundary
+        data = pd.concat([ticks.iloc[:chunk_rows], ticks.iloc[chunk_rows - 1:]])
+        data.to_csv(csv_path, index=False)
+        
+        result_mem = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': chunk_rows}
+        result_stream = run(config)
+        
+        assert result_stream['frames'].keys() == result_mem['frames'].keys()
+        for name in ['raw_norm.parquet', 'bars_1m.parquet', 'bars_100tick.parquet', 'quality_report.json']:
+            assert (Path(sample_config['out_dir']) / name).read_bytes() == \
+                (Path(config['out_dir']) / name).read_bytes(), name
+        
+        raw = pd.read_parquet(Path(config['out_dir']) / 'raw_norm.parquet')
+        assert len(raw) == n
+        # more than one data page per column, so page boundaries are exercised
+        meta = pq.ParquetFile(Path(config['out_dir']) / 'raw_norm.parquet').metadata
+        column = meta.row_group(0).column(0)
+        assert column.total_uncompressed_size > 1024 * 1024   # the default data page size
+    
+    def test_raw_norm_text_follows_filtered_rows(self, sample_tick_data, sample_config, temp_dir):
+        """Test that the raw_norm text stays aligned with ts_ns when rows are reordered and dropped."""
+        from core.data_ingest.sources import read_csv
+        saturday = sample_tick_data.iloc[:5].copy()
+        saturday['timestamp'] = pd.date_range('2025-01-04T10:00:00Z', periods=5, freq='s').strftime('%Y-%m-%dT%H:%M:%SZ')
+        data = pd.concat([sample_tick_data, sample_tick_data.iloc[[10]], saturday])
+        data = data.sample(frac=1.0, random_state=7)
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        
+        chunks = list(read_csv(temp_dir / 'test_data.csv', 300))
+        assert [len(c) for c in chunks] == [300, 300, 300, 106]
+        assert isinstance(chunks[0]['timestamp'].dtype, pd.ArrowDtype)
+        
+        run(sample_config)
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        assert len(raw) == len(sample_tick_data)
+        assert raw['ts_ns'].is_monotonic_increasing
+        assert (pd.to_datetime(raw['timestamp']).astype('int64') == raw['ts_ns']).all()
+    
+    def test_streaming_rejects_unsorted_chunks(self, sample_tick_data, sample_config, temp_dir):
+        """Test that chunked ingest refuses input that is out of order across chunks."""
+        csv_path = temp_dir / 'test_data.csv'
+        sample_tick_data.iloc[::-1].to_csv(csv_path, index=False)
+        
+        sample_config['stream'] = {'enabled': True, 'chunk_rows': 100}
+        
+        with pytest.raises(ValueError, match=E.UNSORTED_INPUT):
+            run(sample_config)
+    
+    def test_streaming_reorders_late_ticks_at_chunk_boundaries(self, sample_tick_data, sample_config, temp_dir):
+        """Test that ticks slightly out of order across chunk boundaries stream like the in-memory run."""
+        data = sample_tick_data.copy()
+        # rows 299/300 and 598/600 straddle the 300-row chunk boundaries
+        data.iloc[[299, 300]] = data.iloc[[300, 299]].values
+        data.iloc[[598, 600]] = data.iloc[[600, 598]].values
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result = run(sample_config)
+        
+        # the serial path and the multi-file merge of the same file
+        for label, extra in [('stream', {}), ('merged', {'input': {'path': [str(temp_dir / 'test_data.csv')]}})]:
+            config = dict(sample_config, **extra)
+            config['out_dir'] = str(temp_dir / f'output_{label}')
+            config['stream'] = {'enabled': True, 'chunk_rows': 300}
+            run(config)
+            for name in ['raw_norm.parquet', *[Path(p).name for p in result['frames'].values()]]:
+                assert (Path(sample_config['out_dir']) / name).read_bytes() == \
+                    (Path(config['out_dir']) / name).read_bytes(), (label, name)
+        
+        # later than the window: the error names the boundary
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_narrow')
+        config['stream'] = {'enabled': True, 'chunk_rows': 300, 'reorder_seconds': 1}
+        with pytest.raises(ValueError, match=f'{E.UNSORTED_INPUT}: .* 1.000s behind .*chunk boundary'):
+            run(config)
+    
+    def test_tick_bar_ids_are_positions(self, sample_tick_data, sample_config, temp_dir):
+        """Test that tick bar ids index into raw_norm."""
+        csv_path = temp_dir / 'test_data.csv'
+        sample_tick_data.iloc[:950].to_csv(csv_path, index=False)
+        
+        sample_config['bar_frames'] = [{'type': 'tick', 'count': 100}]
+        result = run(sample_config)
+        
+        bars = pd.read_parquet(result['frames']['100t'])
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        
+        assert bars['tick_first_id'].tolist() == list(range(0, 950, 100))
+        assert bars['tick_last_id'].iloc[-1] == len(raw) - 1
+        assert bars['n_ticks'].iloc[-1] == 50
+        assert (raw['ts_ns'].to_numpy()[bars['tick_first_id']] == bars['t_open_ns']).all()
+        assert (raw['ts_ns'].to_numpy()[bars['tick_last_id']] == bars['t_close_ns']).all()
+    
+    def test_time_bar_ids_are_positions(self, multi_day_tick_data, sample_config, temp_dir):
+        """Test that time bar ids cover raw_norm contiguously and drill down to the bar's ticks."""
+        from core.data_ingest.ipc import open_ticks, open_bars, bar_ticks, tick_span
+        from core.data_ingest.store import read_rows
+        multi_day_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '1m'}, {'type': 'time', 'unit': '1h'}]
+        sample_config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        sample_config['ipc'] = {'enabled': True}
+        result = run(sample_config)
+        out = Path(sample_config['out_dir'])
+        raw = pd.read_parquet(out / 'raw_norm.parquet')
+        ts = raw['ts_ns'].to_numpy()
+        
+        for name in ['1m', '1h']:
+            bars = pd.read_parquet(result['frames'][name])
+            first, last = bars['tick_first_id'].to_numpy(), bars['tick_last_id'].to_numpy()
+            assert first[0] == 0 and last[-1] == len(raw) - 1
+            assert (first[1:] == last[:-1] + 1).all()
+            assert (last - first + 1 == bars['n_ticks']).all()
+            full = bars['n_ticks'] > 0
+            assert (ts[first[full]] >= bars['t_open_ns'][full]).all()
+            assert (ts[last[full]] <= bars['t_close_ns'][full]).all()
+        
+        ticks, bars = open_ticks(out), open_bars(out, '1m')
+        minute = bars.to_pandas()
+        i = int(np.flatnonzero(minute['n_ticks'] > 1)[0])
+        assert bar_ticks(ticks, bars, i)['ts_ns'].to_pylist() == \
+            ts[minute['tick_first_id'][i]:minute['tick_last_id'][i] + 1].tolist()
+        first, end = tick_span(bars, 10, 40)
+        assert bar_ticks(ticks, bars, 10, 40).equals(ticks.slice(first, end - first))
+        assert read_rows(out / 'raw_norm.parquet', first, end).equals(ticks.slice(first, end - first))
+        with pytest.raises(IndexError):
+            tick_span(bars, 0, len(bars) + 1)
+    
+    def test_time_bars_any_frame(self, sample_tick_data, sample_config, temp_dir):
+        """Test time bars for frames other than 1m."""
+        csv_path = temp_dir / 'test_data.csv'
+        sample_tick_data.to_csv(csv_path, index=False)
+        
+        sample_config['bar_frames'] = [
+            {'type': 'time', 'unit': '1m'},
+            {'type': 'time', 'unit': '5m'},
+            {'type': 'time', 'unit': '1h'},
+        ]
+        result = run(sample_config)
+        
+        assert set(result['frames']) == {'1m', '5m', '1h'}
+        bars_1m = pd.read_parquet(result['frames']['1m'])
+        bars_5m = pd.read_parquet(result['frames']['5m'])
+        
+        # 1000 one-second ticks from 09:00:00 → 17 minutes, 4 five-minute bars
+        assert len(bars_1m) == 17
+        assert len(bars_5m) == 4
+        assert (bars_5m['t_open_ns'] % (5 * 60 * 10**9) == 0).all()
+        assert bars_5m['n_ticks'].sum() == bars_1m['n_ticks'].sum() == 1000
+        assert bars_5m['h'].iloc[0] == bars_1m['h'].iloc[:5].max()
+        assert bars_5m['c'].iloc[-1] == bars_1m['c'].iloc[-1]
+        assert (pd.read_parquet(result['frames']['1h'])['frame'] == '1h').all()
+    
+    def test_time_bars_invalid_frame(self, sample_tick_data, sample_config, temp_dir):
+        """Test that unknown time frame units are rejected."""
+        csv_path = temp_dir / 'test_data.csv'
+        sample_tick_data.to_csv(csv_path, index=False)
+        
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '1w'}]
+        
+        with pytest.raises(ValueError, match='unsupported time frame'):
+            run(sample_config)
+    
+    def test_cascaded_time_bars_match_direct(self, sample_tick_data, sample_config, temp_dir):
+        """Test that coarser frames derived from 1m bars match bars built from ticks."""
+        csv_path = temp_dir / 'test_data.csv'
+        sample_tick_data.to_csv(csv_path, index=False)
+        
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '5m'}]
+        direct = pd.read_parquet(run(sample_config)['frames']['5m'])
+        
+        sample_config['out_dir'] = str(temp_dir / 'output_cascade')
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '1m'}, {'type': 'time', 'unit': '5m'}]
+        cascaded = pd.read_parquet(run(sample_config)['frames']['5m'])
+        
+        pd.testing.assert_frame_equal(direct.drop(columns='spread_mean'), cascaded.drop(columns='spread_mean'))
+        np.testing.assert_allclose(direct['spread_mean'], cascaded['spread_mean'], rtol=1e-12)
+    
+    def test_append_matches_full_run(self, sample_tick_data, sample_config, temp_dir):
+        """Test that appending new ticks gives the same outputs as one full run."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['bar_frames'] = [
+            {'type': 'time', 'unit': '1m'},
+            {'type': 'time', 'unit': '5m'},
+            {'type': 'tick', 'count': 100},
+        ]
+        result_full = run(sample_config)
+        
+        # first part, then the rest re-delivered with some overlap
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_append')
+        config['append'] = True
+        sample_tick_data.iloc[:437].to_csv(temp_dir / 'part1.csv', index=False)
+        sample_tick_data.iloc[400:].to_csv(temp_dir / 'part2.csv', index=False)
+        config['csv'] = {'path': str(temp_dir / 'part1.csv')}
+        run(config)
+        config['csv'] = {'path': str(temp_dir / 'part2.csv')}
+        result_append = run(config)
+        
+        for name, path in result_full['frames'].items():
+            pd.testing.assert_frame_equal(pd.read_parquet(path), pd.read_parquet(result_append['frames'][name]))
+        
+        with open(result_full['quality_report']) as f:
+            quality_full = json.load(f)
+        with open(result_append['quality_report']) as f:
+            quality_append = json.load(f)
+        assert quality_append == quality_full
+        
+        with open(result_append['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['state']['n_raw_rows'] == 1000
+        assert manifest['appends'][0]['n_skipped'] == 36
+    
+    def test_append_rejects_changed_frames(self, sample_tick_data, sample_config, temp_dir):
+        """Test that append refuses bar frames the existing run does not have."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        run(sample_config)
+        
+        sample_config['append'] = True
+        sample_config['bar_frames'] = [{'type': 'tick', 'count': 500}]
+        
+        with pytest.raises(ValueError, match='append'):
+            run(sample_config)
+    
+    def test_cache_hit_reuses_outputs(self, sample_tick_data, sample_config, temp_dir):
+        """Test that a repeated run with the same input and config is served from the cache."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['cache'] = {'dir': str(temp_dir / 'cache')}
+        result_first = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_cached')
+        result_cached = run(config)
+        
+        with open(result_cached['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['cache']['hit'] is True
+        for name, path in result_first['frames'].items():
+            assert Path(result_cached['frames'][name]).parent == temp_dir / 'output_cached'
+            pd.testing.assert_frame_equal(pd.read_parquet(path), pd.read_parquet(result_cached['frames'][name]))
+        
+        with open(Path(config['out_dir']) / 'progress.jsonl') as f:
+            steps = [json.loads(line)['step'] for line in f]
+        assert 'cache' in steps and 'normalize_time' not in steps
+    
+    def test_cache_miss_on_config_change(self, sample_tick_data, sample_config, temp_dir):
+        """Test that changing an output-relevant setting bypasses the cache."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['cache'] = {'dir': str(temp_dir / 'cache')}
+        run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_bid')
+        config['price_basis'] = 'bid'
+        result = run(config)
+        
+        with open(result['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['cache']['hit'] is False
+    
+    def test_cache_entry_survives_later_runs(self, sample_tick_data, sample_config, temp_dir):
+        """Test that later runs into the same out_dir leave the cached entry unchanged."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['cache'] = {'dir': str(temp_dir / 'cache')}
+        result = run(sample_config)
+        expected = pd.read_parquet(result['frames']['1m'])
+        
+        # a miss into the same out_dir, an append over it, then the first config again
+        config = sample_config.copy()
+        config['price_basis'] = 'bid'
+        run(config)
+        run(sample_config)
+        config = sample_config.copy()
+        config['append'] = True
+        later = sample_tick_data.copy()
+        later['timestamp'] = pd.date_range('2025-01-01T10:00:00Z', periods=len(later), freq='s').strftime('%Y-%m-%dT%H:%M:%SZ')
+        later.to_csv(temp_dir / 'later.csv', index=False)
+        config['csv'] = {'path': str(temp_dir / 'later.csv')}
+        run(config)
+        
+        result = run(sample_config)
+        with open(result['manifest']) as f:
+            assert json.load(f)['cache']['hit'] is True
+        pd.testing.assert_frame_equal(pd.read_parquet(result['frames']['1m']), expected)
+    
+    def test_cache_evicts_least_recently_used(self, sample_tick_data, sample_config, temp_dir):
+        """Test that a store over the size cap evicts the least recently used entries."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        root = temp_dir / 'cache'
+        sample_config['cache'] = {'dir': str(root)}
+        entries = lambda: {p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith('.')}
+        run(sample_config)
+        (first,) = entries()
+        size = sum(p.stat().st_size for p in (root / first).rglob('*') if p.is_file())
+        
+        # room for two entries: the hit on the first makes the second the oldest
+        configs = []
+        for basis in ('bid', 'ask'):
+            config = sample_config.copy()
+            config['price_basis'] = basis
+            config['cache'] = {'dir': str(root), 'max_mb': 2.5 * size / (1024 * 1024)}
+            configs.append(config)
+        run(configs[0])
+        (second,) = entries() - {first}
+        run(sample_config)
+        run(configs[1])
+        
+        assert first in entries() and second not in entries() and len(entries()) == 2
+        assert not [p for p in root.iterdir() if p.name.startswith('.')]
+    
+    def test_parallel_days_match_serial(self, multi_day_tick_data, sample_config, temp_dir):
+        """Test that day-partitioned parallel ingest writes the same outputs as a serial run."""
+        data = multi_day_tick_data
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['bar_frames'] = [
+            {'type': 'time', 'unit': '1m'},
+            {'type': 'time', 'unit': '1h'},
+            {'type': 'tick', 'count': 100},
+        ]
+        result_serial = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_parallel')
+        config['parallel'] = {'enabled': True, 'workers': 2}
+        result_parallel = run(config)
+        
+        for name, path in result_serial['frames'].items():
+            with open(path, 'rb') as f1, open(result_parallel['frames'][name], 'rb') as f2:
+                assert f1.read() == f2.read()
+        with open(result_serial['quality_report']) as f:
+            quality_serial = json.load(f)
+        with open(result_parallel['quality_report']) as f:
+            assert json.load(f) == quality_serial
+        
+        with open(temp_dir / 'test_data.csv.days.json') as f:
+            index = json.load(f)
+        assert len(index['days']) == 5
+        with open(result_parallel['log']) as f:
+            assert any('5 day partitions' in json.loads(line)['message'] for line in f)
+    
+    def test_dataset_layout(self, multi_day_tick_data, sample_config, temp_dir):
+        """Test the hive-partitioned dataset layout with the configured codec and row groups."""
+        multi_day_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result_file = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_dataset')
+        config['parquet'] = {'row_group_mb': 0.01, 'compression': 'zstd', 'layout': 'dataset'}
+        result = run(config)
+        
+        bars_dir = Path(result['frames']['1m'])
+        dates = sorted(p.name for p in (bars_dir / 'symbol=EURUSD').iterdir())
+        assert dates == [f'date=2025-01-0{d}' for d in range(3, 8)]
+        
+        meta = pq.ParquetFile(next(bars_dir.rglob('*.parquet'))).metadata
+        assert meta.num_row_groups > 1
+        rg = meta.row_group(0)
+        assert rg.column(0).compression == 'ZSTD'
+        assert rg.column(0).statistics.has_min_max
+        assert meta.schema.names[rg.sorting_columns[0].column_index] == 't_open_ns'
+        
+        for name, path in result_file['frames'].items():
+            expected = pd.read_parquet(path)
+            got = pd.read_parquet(result['frames'][name])
+            assert list(got['symbol'].astype(str).unique()) == ['EURUSD']
+            pd.testing.assert_frame_equal(got[expected.columns].astype({'symbol': str}), expected)
+        
+        # date predicates only open the matching partitions
+        monday = pd.read_parquet(bars_dir, filters=[('date', '=', '2025-01-06')])
+        days = pd.to_datetime(monday['t_open_ns'], unit='ns').dt.date.astype(str)
+        assert len(monday) and (days == '2025-01-06').all()
+    
+    def test_ipc_copies_match_parquet(self, multi_day_tick_data, sample_config, temp_dir):
+        """Test that the memory-mapped Arrow IPC copies hold the same ticks and bars as the Parquet outputs."""
+        from core.data_ingest.ipc import open_ticks, open_bars
+        multi_day_tick_data[['bid', 'ask']] = multi_day_tick_data[['bid', 'ask']].round(5)
+        multi_day_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['ipc'] = {'enabled': True}
+        result = run(sample_config)
+        out = Path(sample_config['out_dir'])
+        
+        ticks = open_ticks(out)
+        assert ticks.equals(pq.read_table(out / 'raw_norm.parquet').replace_schema_metadata())
+        for name, path in result['frames'].items():
+            assert open_bars(out, name).equals(pq.read_table(path).replace_schema_metadata())
+        with pytest.raises(ValueError, match='unknown bar frame'):
+            open_bars(out, '5m')
+        
+        # the compact and dataset layouts give the same decoded ticks and flat bars
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_dataset')
+        config['compact_ticks'] = {'enabled': True}
+        config['parquet'] = {'layout': 'dataset'}
+        run(config)
+        assert open_ticks(config['out_dir']).select(['ts_ns', 'bid', 'ask']).equals(ticks.select(['ts_ns', 'bid', 'ask']))
+        assert open_bars(config['out_dir'], '1m').equals(open_bars(out, '1m'))
+    
+    def test_binary_inputs_match_csv(self, sample_tick_data, sample_config, temp_dir):
+        """Test that Parquet and Arrow IPC tick files give the same bars as the CSV."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result_csv = run(sample_config)
+        
+        ts = pd.to_datetime(sample_tick_data['timestamp'], utc=True)
+        typed = pd.DataFrame({'timestamp': ts, 'bid': sample_tick_data['bid'], 'ask': sample_tick_data['ask'],
+                              'volume': 1.0, 'unused': 'x'})
+        sample_tick_data.to_parquet(temp_dir / 'ticks_text.parquet', row_group_size=128)
+        typed.to_parquet(temp_dir / 'ticks_typed.parquet', row_group_size=128)
+        typed.reset_index(drop=True).to_feather(temp_dir / 'ticks.arrow', chunksize=128)
+        
+        for name in ['ticks_text.parquet', 'ticks_typed.parquet', 'ticks.arrow']:
+            config = sample_config.copy()
+            config['out_dir'] = str(temp_dir / f'output_{name}')
+            config['input'] = {'path': str(temp_dir / name)}
+            result = run(config)
+            for frame, path in result_csv['frames'].items():
+                expected, bars = pd.read_parquet(path), pd.read_parquet(result['frames'][frame])
+                # the typed inputs carry volume 1.0 per tick
+                if name != 'ticks_text.parquet':
+                    assert (bars['v_sum'] == bars['n_ticks']).all()
+                    expected['v_sum'] = bars['v_sum']
+                pd.testing.assert_frame_equal(expected, bars)
+    
+    def test_binary_input_time_range(self, sample_tick_data, sample_config, temp_dir):
+        """Test that a time range skips row groups and keeps exactly the ticks inside it."""
+        from core.data_ingest.sources import read_ticks, time_range
+        
+        typed = sample_tick_data.assign(timestamp=pd.to_datetime(sample_tick_data['timestamp'], utc=True))
+        typed.to_parquet(temp_dir / 'ticks.parquet', row_group_size=100)
+        sample_config['input'] = {'path': str(temp_dir / 'ticks.parquet'),
+                                  'start': '2025-01-01T09:05:30Z', 'end': '2025-01-01T09:07:00Z'}
+        
+        chunks = list(read_ticks(temp_dir / 'ticks.parquet', 'parquet', 1, *time_range(sample_config)))
+        assert [len(c) for c in chunks] == [100, 100]   # row groups 3 and 4 only
+        
+        result = run(sample_config)
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        assert len(raw) == 90
+        assert raw['timestamp'].iloc[0] == '2025-01-01T09:05:30.000000000Z'
+        bars = pd.read_parquet(result['frames']['1m'])
+        assert list(bars['n_ticks']) == [30, 60]
+    
+    def test_compact_ticks_round_trip(self, sample_tick_data, sample_config, temp_dir):
+        """Test the compact raw_norm layout: same bars, lossless prices, delta-encoded ts_ns."""
+        from core.data_ingest.compact import decode_ticks
+        
+        data = sample_tick_data.assign(bid=sample_tick_data['bid'].round(5), ask=sample_tick_data['ask'].round(5))
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result_full = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_compact')
+        config['compact_ticks'] = {'enabled': True}
+        result = run(config)
+        
+        for name, path in result_full['frames'].items():
+            pd.testing.assert_frame_equal(pd.read_parquet(path), pd.read_parquet(result['frames'][name]))
+        
+        raw_path = Path(config['out_dir']) / 'raw_norm.parquet'
+        raw = pd.read_parquet(raw_path)
+        assert list(raw.columns) == ['ts_ns', 'bid_pts', 'ask_pts']
+        assert raw['bid_pts'].dtype == np.int32
+        expected = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        pd.testing.assert_frame_equal(decode_ticks(raw, 5)[['ts_ns', 'bid', 'ask']], expected[['ts_ns', 'bid', 'ask']])
+        
+        column = pq.ParquetFile(raw_path).metadata.row_group(0).column(0)
+        assert 'DELTA_BINARY_PACKED' in column.encodings
+        with open(result['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['raw_schema'] == 'compact' and manifest['price_decimals'] == 5
+    
+    def test_compact_ticks_reject_lossy_prices(self, sample_tick_data, sample_config, temp_dir):
+        """Test that prices finer than the symbol's decimals are refused."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['compact_ticks'] = {'enabled': True}
+        
+        with pytest.raises(ValueError, match=E.PRICE_PRECISION):
+            run(sample_config)
+    
+    @pytest.mark.parametrize('sample', ['eurusd_sample.csv', 'eurusd_small.csv', 'eurusd_medium.csv'])
+    def test_polars_engine_matches_pandas(self, sample, sample_config, temp_dir):
+        """Test that the polars engine writes the same outputs as the pandas engine."""
+        sample_config['csv'] = {'path': str(Path(__file__).parent.parent / 'samples' / 'ticks' / sample)}
+        sample_config['bar_frames'] = [
+            {'type': 'time', 'unit': '1m'},
+            {'type': 'time', 'unit': '5m'},
+            {'type': 'tick', 'count': 100},
+        ]
+        result_pandas = run(sample_config)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_polars')
+        config['engine'] = 'polars'
+        result_polars = run(config)
+        
+        for name in ['raw_norm.parquet', *[Path(p).name for p in result_pandas['frames'].values()]]:
+            with open(Path(sample_config['out_dir']) / name, 'rb') as f1, open(Path(config['out_dir']) / name, 'rb') as f2:
+                assert f1.read() == f2.read(), name
+        with open(result_pandas['quality_report']) as f:
+            quality = json.load(f)
+        with open(result_polars['quality_report']) as f:
+            assert json.load(f) == quality
+    
+    def test_polars_engine_streams_in_chunks(self, sample_config, temp_dir, monkeypatch):
+        """Test that the streamed polars engine honors chunk_rows and writes what the other runs write."""
+        from core.data_ingest import polars_engine
+        lines = (Path(__file__).parent.parent / 'samples' / 'ticks' / 'eurusd_medium.csv').read_text().splitlines()
+        # a tick about 1.5s late across the first 500-row chunk boundary
+        lines[500], lines[501] = lines[501], lines[500]
+        (temp_dir / 'test_data.csv').write_text('\n'.join(lines) + '\n')
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '1m'}, {'type': 'tick', 'count': 100}]
+        result = run(sample_config)
+        
+        # the file is read chunk by chunk, not scanned whole
+        sizes = []
+        csv_tables = polars_engine.csv_tables
+        
+        def recording(*args, **kwargs):
+            for table in csv_tables(*args, **kwargs):
+                sizes.append(len(table))
+                yield table
+        
+        monkeypatch.setattr(polars_engine, 'csv_tables', recording)
+        outs = []
+        for engine, stream in [('pandas', True), ('polars', False), ('polars', True)]:
+            config = sample_config.copy()
+            config['out_dir'] = str(temp_dir / f'output_{engine}_{stream}')
+            config['engine'] = engine
+            if stream:
+                config['stream'] = {'enabled': True, 'chunk_rows': 500}
+            run(config)
+            outs.append(Path(config['out_dir']))
+        
+        assert len(sizes) > 1 and max(sizes) <= 500
+        assert sum(sizes) == len(lines) - 1
+        for name in ['raw_norm.parquet', *[Path(p).name for p in result['frames'].values()]]:
+            for out in outs:
+                assert (Path(sample_config['out_dir']) / name).read_bytes() == (out / name).read_bytes(), (out.name, name)
+    
+    @pytest.mark.parametrize('stream', [False, True])
+    def test_merged_files_match_single_file(self, multi_day_tick_data, sample_config, temp_dir, stream):
+        """Test that overlapping per-day files in a directory merge into the same outputs as one file."""
+        data = multi_day_tick_data.sort_values('timestamp', kind='mergesort') if stream else multi_day_tick_data
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        if stream:
+            sample_config['stream'] = {'enabled': True, 'chunk_rows': 64}
+        result_single = run(sample_config)
+        
+        day_dir = temp_dir / 'days'
+        day_dir.mkdir()
+        day = data['timestamp'].str[:10]
+        for d in day.unique():
+            # each file repeats the last 20 ticks of the previous day
+            rows = np.flatnonzero((day == d).to_numpy())
+            data.iloc[max(0, rows[0] - 20):rows[-1] + 1].to_csv(day_dir / f'{d}.csv', index=False)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_merged')
+        config['input'] = {'path': str(day_dir)}
+        result = run(config)
+        
+        names = ['raw_norm.parquet', *[Path(p).name for p in result_single['frames'].values()]]
+        for name in names:
+            pd.testing.assert_frame_equal(pd.read_parquet(Path(sample_config['out_dir']) / name),
+                                          pd.read_parquet(Path(config['out_dir']) / name))
+        with open(result['manifest']) as f:
+            manifest = json.load(f)
+        assert manifest['input']['format'] == 'multi'
+        assert len(manifest['input']['files']) == 5
+    
+    def test_merge_opens_files_lazily(self, sample_tick_data, sample_config, temp_dir, monkeypatch):
+        """Test that a directory of consecutive files is merged with only the files at the frontier open."""
+        from core.data_ingest import data_ingest
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result_single = run(sample_config)
+        
+        hour_dir = temp_dir / 'hours'
+        hour_dir.mkdir()
+        for i in range(0, len(sample_tick_data), 50):
+            # each file overlaps the next by one tick
+            sample_tick_data.iloc[i:i + 51].to_csv(hour_dir / f'{i:04d}.csv', index=False)
+        opened = {'now': 0, 'max': 0, 'total': 0}
+        prepared_file = data_ingest._prepared_file
+        
+        def counting(*args, **kwargs):
+            opened['now'] += 1; opened['total'] += 1
+            opened['max'] = max(opened['max'], opened['now'])
+            try:
+                yield from prepared_file(*args, **kwargs)
+            finally:
+                opened['now'] -= 1
+        
+        monkeypatch.setattr(data_ingest, '_prepared_file', counting)
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_merged')
+        config['input'] = {'path': str(hour_dir)}
+        run(config)
+        
+        assert opened['total'] == 20 and opened['max'] <= 2
+        for name in ['raw_norm.parquet', 'bars_1m.parquet']:
+            pd.testing.assert_frame_equal(pd.read_parquet(Path(result_single['frames']['1m']).parent / name),
+                                          pd.read_parquet(Path(config['out_dir']) / name))
+    
+    def test_merge_vendor_priority(self, sample_tick_data, sample_config, temp_dir):
+        """Test that ticks both vendors report at one ts_ns come from the preferred vendor."""
+        for vendor, shift in [('a', 0.0), ('b', 0.001)]:
+            (temp_dir / vendor).mkdir()
+            other = sample_tick_data.assign(bid=sample_tick_data['bid'] + shift, ask=sample_tick_data['ask'] + shift)
+            # vendor a covers the first 600 ticks, vendor b the last 600, in hourly-style pieces
+            part = other.iloc[:600] if vendor == 'a' else other.iloc[400:]
+            for i in range(0, len(part), 250):
+                part.iloc[i:i + 250].to_csv(temp_dir / vendor / f'{i:04d}.csv', index=False)
+        
+        for order, overlap_shift in [(['a', 'b'], 0.0), (['b', 'a'], 0.001)]:
+            config = sample_config.copy()
+            config['out_dir'] = str(temp_dir / f'output_{order[0]}')
+            config['input'] = {'path': [str(temp_dir / v / '*.csv') for v in order]}
+            run(config)
+            raw = pd.read_parquet(Path(config['out_dir']) / 'raw_norm.parquet')
+            assert len(raw) == 1000
+            np.testing.assert_allclose(raw['bid'].iloc[400:600], sample_tick_data['bid'].iloc[400:600] + overlap_shift)
+            np.testing.assert_allclose(raw['bid'].iloc[:400], sample_tick_data['bid'].iloc[:400])
+            np.testing.assert_allclose(raw['bid'].iloc[600:], sample_tick_data['bid'].iloc[600:] + 0.001)
+    
+    def test_quality_stats_do_not_depend_on_chunking(self, multi_day_tick_data, sample_config, temp_dir, monkeypatch):
+        """Test spread stats and hourly rows against numpy and across whole, streamed and appended runs."""
+        from core.data_ingest.quality import QualityStats, SKETCH_ALPHA
+        monkeypatch.setattr(QualityStats, 'BLOCK', 64)
+        data = multi_day_tick_data.sort_values('timestamp', kind='mergesort')
+        data = data.assign(ask=data['ask'] + np.random.RandomState(1).uniform(0, 0.0003, len(data)))
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        result = run(sample_config)
+        with open(result['quality_report']) as f:
+            quality = json.load(f)
+        
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        spread = (raw['ask'] - raw['bid']).to_numpy()
+        stats = quality['spread_stats']
+        assert stats['n'] == len(raw)
+        assert stats['mean'] == pytest.approx(spread.mean(), rel=1e-12)
+        assert stats['std'] == pytest.approx(spread.std(ddof=1), rel=1e-9)
+        assert (stats['min'], stats['max']) == (spread.min(), spread.max())
+        for key, q in [('p50', 0.5), ('p95', 0.95), ('p99', 0.99)]:
+            assert stats[key] == pytest.approx(np.quantile(spread, q, method='lower'), rel=SKETCH_ALPHA)
+        hours = pd.to_datetime(raw['ts_ns'], unit='ns').dt.strftime('%Y-%m-%dT%HZ').value_counts().sort_index()
+        assert [h['hour'] for h in quality['hourly']] == list(hours.index)
+        assert [h['n_ticks'] for h in quality['hourly']] == list(hours)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        with open(run(config)['quality_report']) as f:
+            assert json.load(f) == quality
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_append')
+        config['append'] = True
+        data.iloc[:1234].to_csv(temp_dir / 'part1.csv', index=False)
+        data.iloc[1234:].to_csv(temp_dir / 'part2.csv', index=False)
+        for part in ['part1.csv', 'part2.csv']:
+            config['csv'] = {'path': str(temp_dir / part)}
+            result_append = run(config)
+        with open(result_append['quality_report']) as f:
+            assert json.load(f) == quality
+    
+    def test_quality_stats_merge(self):
+        """Test that merging the stats of two partitions matches one pass over both."""
+        from core.data_ingest.quality import QualityStats
+        rng = np.random.RandomState(3)
+        ts = np.sort(rng.randint(0, 10 * 3_600_000_000_000, 5000)).astype('int64')
+        spread = np.round(rng.exponential(0.0001, 5000), 6)
+        whole, left, right = QualityStats(), QualityStats(), QualityStats()
+        whole.push(ts, spread)
+        left.push(ts[:2000], spread[:2000])
+        right.push(ts[2000:], spread[2000:])
+        left.merge(right)
+        stats, hourly = left.result()
+        expected_stats, expected_hourly = whole.result()
+        assert hourly == expected_hourly
+        assert stats == pytest.approx(expected_stats, rel=1e-12)
+    
+    def test_outlier_filter_quarantines_bad_prints(self, sample_tick_data, sample_config, temp_dir, monkeypatch):
+        """Test that spikes and blown-out spreads are quarantined, independent of chunking and append."""
+        from core.data_ingest import outliers
+        monkeypatch.setattr(outliers, 'BLOCK', 100)
+        data = sample_tick_data.copy()
+        data.loc[50, ['bid', 'ask']] *= 1.01            # one bad print
+        data.loc[[700, 701], ['bid', 'ask']] *= 0.99    # two in a row
+        data.loc[500, 'ask'] += 0.001                   # spread 11x the usual
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['outlier_zscore'] = 12.0
+        result = run(sample_config)
+        
+        quarantine = pd.read_parquet(Path(sample_config['out_dir']) / 'quarantine.parquet')
+        expected_ts = pd.to_datetime(data['timestamp'].iloc[[50, 500, 700, 701]]).astype('int64').tolist()
+        assert quarantine['ts_ns'].tolist() == expected_ts
+        assert quarantine['reason'].tolist() == ['return', 'spread', 'return', 'return']
+        assert (quarantine['z'] > 12).all()
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        assert len(raw) == 996 and not raw['ts_ns'].isin(expected_ts).any()
+        with open(result['quality_report']) as f:
+            quality = json.load(f)
+        assert quality['outliers'] == {'n_rejected': 4, 'n_return': 3, 'n_spread': 1, 'zscore': 12.0}
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        run(config)
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_append')
+        config['append'] = True
+        data.iloc[:600].to_csv(temp_dir / 'part1.csv', index=False)
+        data.iloc[600:].to_csv(temp_dir / 'part2.csv', index=False)
+        for part in ['part1.csv', 'part2.csv']:
+            config['csv'] = {'path': str(temp_dir / part)}
+            run(config)
+        for out in ['output_stream', 'output_append']:
+            for name in ['raw_norm.parquet', 'quarantine.parquet', 'bars_1m.parquet']:
+                pd.testing.assert_frame_equal(pd.read_parquet(temp_dir / out / name),
+                                              pd.read_parquet(Path(sample_config['out_dir']) / name))
+            with open(temp_dir / out / 'quality_report.json') as f:
+                assert json.load(f) == quality
+    
+    def test_outlier_filter_keeps_widened_fixed_spreads(self, sample_tick_data, sample_config, temp_dir):
+        """Test that on a fixed 1-pip feed the quotes widened to 2 pips are kept and a blown-out one is not."""
+        data = sample_tick_data.copy()
+        widened = np.random.RandomState(3).choice(len(data), 30, replace=False)
+        data.loc[widened, 'ask'] += 0.0001
+        bad = int(np.setdiff1d(np.arange(100, 1000), widened)[0])
+        data.loc[bad, 'ask'] += 0.0010                  # 11 pips
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['outlier_zscore'] = 12.0
+        run(sample_config)
+        
+        quarantine = pd.read_parquet(Path(sample_config['out_dir']) / 'quarantine.parquet')
+        assert quarantine['ts_ns'].tolist() == [pd.Timestamp(data['timestamp'].iloc[bad]).value]
+        assert quarantine['reason'].tolist() == ['spread']
+    
+    def test_outlier_filter_follows_level_shifts(self, sample_tick_data, sample_config, temp_dir, monkeypatch):
+        """Test that a real level shift and a weekend reopen are not quarantined past the re-anchor run."""
+        from core.data_ingest import outliers
+        monkeypatch.setattr(outliers, 'BLOCK', 100)
+        sample_config['outlier_zscore'] = 12.0
+        mid = 1.1 + np.cumsum(np.random.RandomState(11).normal(0, 0.0001, 2000))
+        mid[1000:] += 0.0030                              # 30 pip step
+        data = pd.DataFrame({
+            'timestamp': pd.date_range('2025-01-01T09:00:00Z', periods=2000, freq='s').strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'bid': mid - 0.00005,
+            'ask': mid + 0.00005,
+        })
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        run(sample_config)
+        quarantine = pd.read_parquet(Path(sample_config['out_dir']) / 'quarantine.parquet')
+        shift_ts = pd.to_datetime(data['timestamp'].iloc[1000:1000 + outliers.REANCHOR_RUN]).astype('int64').tolist()
+        assert quarantine['ts_ns'].tolist() == shift_ts
+        
+        # the same holds streamed and appended, across the re-anchor run
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        run(config)
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_append')
+        config['append'] = True
+        data.iloc[:1003].to_csv(temp_dir / 'part1.csv', index=False)
+        data.iloc[1003:].to_csv(temp_dir / 'part2.csv', index=False)
+        for part in ['part1.csv', 'part2.csv']:
+            config['csv'] = {'path': str(temp_dir / part)}
+            run(config)
+        for out in ['output_stream', 'output_append']:
+            for name in ['raw_norm.parquet', 'quarantine.parquet']:
+                pd.testing.assert_frame_equal(pd.read_parquet(temp_dir / out / name),
+                                              pd.read_parquet(Path(sample_config['out_dir']) / name))
+        
+        # Friday close and a Sunday 22:00 reopen 40 pips away
+        friday = sample_tick_data.copy()
+        friday['timestamp'] = pd.date_range('2025-01-03T21:43:20Z', periods=1000, freq='s').strftime('%Y-%m-%dT%H:%M:%SZ')
+        sunday = sample_tick_data.copy()
+        sunday['timestamp'] = pd.date_range('2025-01-05T22:00:00Z', periods=1000, freq='s').strftime('%Y-%m-%dT%H:%M:%SZ')
+        sunday[['bid', 'ask']] += 0.0040 - 0.0001
+        sunday.loc[20, ['bid', 'ask']] *= 1.01             # a real bad print after the reopen
+        pd.concat([friday, sunday]).to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['out_dir'] = str(temp_dir / 'output_weekend')
+        sample_config['trim_weekend'] = 'session'
+        run(sample_config)
+        quarantine = pd.read_parquet(temp_dir / 'output_weekend' / 'quarantine.parquet')
+        assert quarantine['ts_ns'].tolist() == [pd.Timestamp(sunday['timestamp'].iloc[20]).value]
+    
+    def test_flow_bars_do_not_depend_on_chunking(self, sample_tick_data, sample_config, temp_dir):
+        """Test that volume, dollar and tick-imbalance bars are the same streamed and appended."""
+        data = sample_tick_data.assign(volume=np.random.RandomState(5).randint(1, 20, len(sample_tick_data)) * 0.5)
+        data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['bar_frames'] = [{'type': 'time', 'unit': '1m'},
+                                       {'type': 'volume', 'size': 250},
+                                       {'type': 'dollar', 'size': 300},
+                                       {'type': 'tick_imbalance', 'expected_ticks': 20, 'alpha': 0.2}]
+        result = run(sample_config)
+        assert set(result['frames']) == {'1m', '250v', '300d', '20ti'}
+        
+        minute = pd.read_parquet(result['frames']['1m'])
+        assert minute['v_sum'].sum() == pytest.approx(data['volume'].sum())
+        volume = pd.read_parquet(result['frames']['250v'])
+        assert (volume['v_sum'].iloc[:-1] >= 250 - 10).all()
+        assert volume['n_ticks'].sum() == len(data)
+        assert len(pd.read_parquet(result['frames']['20ti'])) > 1
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_stream')
+        config['stream'] = {'enabled': True, 'chunk_rows': 37}
+        run(config)
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'output_append')
+        config['append'] = True
+        data.iloc[:600].to_csv(temp_dir / 'part1.csv', index=False)
+        data.iloc[600:].to_csv(temp_dir / 'part2.csv', index=False)
+        for part in ['part1.csv', 'part2.csv']:
+            config['csv'] = {'path': str(temp_dir / part)}
+            run(config)
+        for out in ['output_stream', 'output_append']:
+            for name in ['raw_norm.parquet', 'bars_250vol.parquet', 'bars_300dollar.parquet', 'bars_20imb.parquet']:
+                pd.testing.assert_frame_equal(pd.read_parquet(temp_dir / out / name),
+                                              pd.read_parquet(Path(sample_config['out_dir']) / name))
+    
+    def test_volume_bars_need_volume(self, sample_tick_data, sample_config, temp_dir):
+        """Test that volume bars on ticks without volume fail with MISSING_COLUMN."""
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['bar_frames'] = [{'type': 'volume', 'size': 100}]
+        with pytest.raises(ValueError, match=E.MISSING_COLUMN):
+            run(sample_config)
+    
+    def test_query_time_range(self, multi_day_tick_data, sample_config, temp_dir):
+        """Test that load_ticks/load_bars return exactly the window, for both layouts and after an append."""
+        from core.data_ingest.query import load_ticks, load_bars
+        multi_day_tick_data[['bid', 'ask']] = multi_day_tick_data[['bid', 'ask']].round(5)
+        multi_day_tick_data.iloc[:2000].to_csv(temp_dir / 'test_data.csv', index=False)
+        sample_config['out_dir'] = str(temp_dir / 'runs' / 'EURUSD')
+        sample_config['append'] = True
+        sample_config['parquet'] = {'row_group_mb': 0.01}
+        run(sample_config)
+        t0, t1 = '2025-01-06T03:00:00Z', '2025-01-06T20:00:00Z'
+        root = temp_dir / 'runs'
+        first = load_ticks('EURUSD', t0, t1, root=root)
+        
+        multi_day_tick_data.iloc[2000:].to_csv(temp_dir / 'test_data.csv', index=False)
+        run(sample_config)
+        raw = pd.read_parquet(Path(sample_config['out_dir']) / 'raw_norm.parquet')
+        window = raw[(raw['ts_ns'] >= pd.Timestamp(t0).value) & (raw['ts_ns'] < pd.Timestamp(t1).value)]
+        ticks = load_ticks('EURUSD', t0, t1, root=root)
+        assert len(ticks) > len(first) > 0
+        pd.testing.assert_frame_equal(ticks, window[['ts_ns', 'bid', 'ask']])
+        bars = pd.read_parquet(Path(sample_config['out_dir']) / 'bars_1m.parquet')
+        expected = bars[bars['t_open_ns'] >= pd.Timestamp(t0).value].reset_index(drop=True)
+        pd.testing.assert_frame_equal(load_bars('EURUSD', '1m', t0, root=root), expected)
+        assert len(load_ticks('EURUSD', 0, 1, root=root)) == 0
+        with pytest.raises(ValueError, match='unknown bar frame'):
+            load_bars('EURUSD', '5m', root=root)
+        
+        config = sample_config.copy()
+        config['out_dir'] = str(temp_dir / 'runs_dataset' / 'EURUSD')
+        config['append'] = False
+        config['compact_ticks'] = {'enabled': True}
+        config['parquet'] = {'layout': 'dataset', 'row_group_mb': 0.01}
+        multi_day_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        run(config)
+        pd.testing.assert_frame_equal(load_ticks('EURUSD', t0, t1, root=temp_dir / 'runs_dataset'), ticks)
+        pd.testing.assert_frame_equal(load_bars('EURUSD', '1m', t0, root=temp_dir / 'runs_dataset'), expected)
+    
+    def test_query_run_index(self, sample_tick_data, sample_config, temp_dir, monkeypatch):
+        """Test that repeated queries reuse the run index and still see new and appended runs."""
+        from types import SimpleNamespace
+        from core.data_ingest import query
+        sample_tick_data.to_csv(temp_dir / 'test_data.csv', index=False)
+        root = temp_dir / 'runs'
+        for symbol in ['EURUSD', 'GBPUSD']:
+            run(dict(sample_config, symbol=symbol, out_dir=str(root / symbol)))
+        parsed = []
+        monkeypatch.setattr(query, 'json', SimpleNamespace(loads=lambda text: parsed.append(1) or json.loads(text)))
+        
+        assert query.find_run('EURUSD', root)[0] == root / 'EURUSD'
+        assert len(parsed) == 2
+        query.load_ticks('EURUSD', root=root)
+        query.load_bars('GBPUSD', '1m', root=root)
+        assert len(parsed) == 2
+        
+        # a new run is found and only its manifest is parsed
+        run(dict(sample_config, symbol='USDJPY', out_dir=str(root / 'batch' / 'USDJPY')))
+        assert query.find_run('USDJPY', root)[0] == root / 'batch' / 'USDJPY'
+        assert len(parsed) == 3
+        # an append rewrites the manifest in place
+        later = sample_tick_data.assign(timestamp=pd.date_range('2025-01-01T10:00:00Z', periods=len(sample_tick_data),
+                                                                freq='s').strftime('%Y-%m-%dT%H:%M:%SZ'))
+        later.to_csv(temp_dir / 'later.csv', index=False)
+        run(dict(sample_config, out_dir=str(root / 'EURUSD'), append=True, csv={'path': str(temp_dir / 'later.csv')}))
+        assert len(query.load_ticks('EURUSD', root=root)) == 2000
+        # a run's out_dir as the root reads only its manifest
+        assert query.find_run('GBPUSD', root / 'GBPUSD')[0] == root / 'GBPUSD'
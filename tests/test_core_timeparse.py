@@ -0,0 +1,77 @@
+"""
+Tests for the fixed-layout timestamp parser (core version)
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+
+from core.data_ingest.timeparse import parse_iso_utc
+from core.data_ingest.data_ingest import _normalize_time
+from core.data_ingest import errors as E
+
+
+class TestParseIsoUtc:
+    """Test suite for parse_iso_utc."""
+    
+    def test_matches_pandas(self):
+        """Test fast path results against pd.to_datetime."""
+        rng = np.random.default_rng(42)
+        ns = rng.integers(-2 * 10**18, 4 * 10**18, 10000)
+        for fmt in ['%Y-%m-%dT%H:%M:%S.%fZ', '%Y-%m-%dT%H:%M:%SZ']:
+            values = pd.to_datetime(ns, utc=True).strftime(fmt).to_numpy(dtype=object)
+            ts, ok = parse_iso_utc(values)
+            assert ok.all()
+            np.testing.assert_array_equal(ts, pd.to_datetime(values, utc=True).as_unit('ns').asi8)
+    
+    def test_fraction_digits(self):
+        """Test variable fraction lengths up to nanoseconds."""
+        values = np.array([
+            '2024-02-29T23:59:59.5Z',
+            '2024-02-29T23:59:59.123456789Z',
+            '2025-08-05T09:00:00Z',
+        ], dtype=object)
+        ts, ok = parse_iso_utc(values)
+        assert ok.all()
+        assert ts.tolist() == [pd.Timestamp(v).value for v in values]
+    
+    def test_rejects_other_layouts(self):
+        """Test that rows outside the fixed layout are left to the fallback."""
+        values = np.array([
+            '2025-08-05T09:00:00+00:00',
+            '2025-08-05 09:00:00Z',
+            '2025-02-29T00:00:00Z',
+            '2025-08-05T09:00:00.Z',
+            '2025-08-05T09:00:00.1234567890Z',
+            '2400-01-01T00:00:00Z',
+            'garbage',
+            None,
+            '2025-08-05T09:00:00Z',
+        ], dtype=object)
+        ts, ok = parse_iso_utc(values)
+        assert ok.tolist() == [False] * 8 + [True]
+    
+    def test_arrow_input(self):
+        """Test zero-copy parsing of Arrow string arrays."""
+        arr = pa.array(['x', '2025-08-05T09:00:00.100Z', '2025-08-05T09:00:01.200Z'])
+        ts, ok = parse_iso_utc(arr.slice(1))
+        assert ok.all()
+        assert ts.tolist() == [pd.Timestamp('2025-08-05T09:00:00.1Z').value,
+                               pd.Timestamp('2025-08-05T09:00:01.2Z').value]
+    
+    def test_normalize_time_fallback(self):
+        """Test that non-matching rows are parsed by the generic parser."""
+        df = pd.DataFrame({
+            'timestamp': ['2025-08-05T09:00:00Z', '2025-08-05T11:00:01+02:00'],
+            'bid': [1.1, 1.1], 'ask': [1.2, 1.2],
+        })
+        out = _normalize_time(df)
+        assert out['ts_ns'].tolist() == [pd.Timestamp('2025-08-05T09:00:00Z').value,
+                                         pd.Timestamp('2025-08-05T09:00:01Z').value]
+    
+    def test_normalize_time_unparsable(self):
+        """Test that unparsable rows still raise TIMEZONE_ERROR."""
+        df = pd.DataFrame({'timestamp': ['2025-08-05T09:00:00Z', 'not a time'], 'bid': [1.1, 1.1], 'ask': [1.2, 1.2]})
+        with pytest.raises(ValueError, match=E.TIMEZONE_ERROR):
+            _normalize_time(df)